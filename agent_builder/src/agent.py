@@ -5,6 +5,7 @@ import sys
 import winreg
 
 import wmi
+from protocol import PROTOCOL_VERSION, fingerprint
 
 
 def is_admin():
@@ -259,6 +260,10 @@ except Exception as e:
 
 
 # --- Save ---
+# Отпечаток позволяет серверу пропустить синхронизацию неизменившегося отчёта
+inventory["protocol_version"] = PROTOCOL_VERSION
+inventory["fingerprint"] = fingerprint(inventory["components"])
+
 filename = f"inventory_{hostname}.json"
 try:
     with open(filename, "w", encoding="utf-8") as f:
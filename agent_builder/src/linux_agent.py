@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+ITBase Inventory Agent для Linux.
+
+Читает /proc и /sys без внешних зависимостей и без прав root (серийные
+номера платы, доступные только root, при нехватке прав пропускаются).
+Источники опрашиваются параллельно, результат совпадает со схемой
+ComponentUploadRequest и подходит для запуска из cron на тысячах хостов.
+
+Примеры:
+    linux_agent.py                             # inventory_<hostname>.json
+    linux_agent.py --stdout
+    linux_agent.py --server https://itbase.local --asset-id 42 --token <JWT>
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from protocol import PROTOCOL_VERSION, build_report, fingerprint
+
+# Блочные устройства, не являющиеся физическими накопителями
+VIRTUAL_BLOCK_PREFIXES = ("loop", "ram", "zram", "dm-", "md", "sr", "fd", "nbd")
+
+# Номинальная частота в названии модели: "Intel(R) Core(TM) i5-2400 CPU @ 3.10GHz"
+MODEL_NAME_CLOCK = re.compile(r"@\s*(\d+(?:\.\d+)?)\s*GHz", re.IGNORECASE)
+PCI_VENDORS = {"0x10de": "NVIDIA", "0x1002": "AMD", "0x8086": "Intel", "0x1a03": "ASPEED", "0x15ad": "VMware"}
+
+
+def _read(root, path):
+    """Содержимое файла без завершающих пробелов или None (нет файла, нет прав)."""
+    try:
+        with open(os.path.join(root, path.lstrip("/")), encoding="utf-8", errors="replace") as f:
+            value = f.read().strip()
+    except OSError:
+        return None
+    return value or None
+
+
+def _listdir(root, path):
+    try:
+        return sorted(os.listdir(os.path.join(root, path.lstrip("/"))))
+    except OSError:
+        return []
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def collect_motherboard(root):
+    name = _read(root, "/sys/class/dmi/id/board_name")
+    vendor = _read(root, "/sys/class/dmi/id/board_vendor")
+    if not name and not vendor:
+        return []
+    return [{
+        "type": "motherboard",
+        "name": name or "Unknown Board",
+        "serial_number": _read(root, "/sys/class/dmi/id/board_serial"),
+        "manufacturer": vendor,
+    }]
+
+
+def collect_cpu(root):
+    """Один компонент на физический процессор (physical id в /proc/cpuinfo)."""
+    content = _read(root, "/proc/cpuinfo")
+    if not content:
+        return []
+
+    sockets = {}
+    for block in content.split("\n\n"):
+        fields = {}
+        for line in block.splitlines():
+            key, sep, value = line.partition(":")
+            if sep:
+                fields[key.strip()] = value.strip()
+        if "processor" not in fields:
+            continue
+        socket = sockets.setdefault(fields.get("physical id", "0"), {"fields": fields, "threads": 0})
+        socket["threads"] += 1
+
+    max_khz = _to_int(_read(root, "/sys/devices/system/cpu/cpu0/cpufreq/base_frequency")) or _to_int(
+        _read(root, "/sys/devices/system/cpu/cpu0/cpufreq/cpuinfo_max_freq")
+    )
+
+    components = []
+    for socket in sockets.values():
+        fields = socket["fields"]
+        threads = _to_int(fields.get("siblings")) or socket["threads"]
+        name = fields.get("model name") or fields.get("Model") or "Unknown CPU"
+        # "cpu MHz" - текущая частота: она меняется от запуска к запуску и сбивала бы
+        # отпечаток компонентов. Без cpufreq (часто в ВМ) - частота из названия модели
+        model_clock = MODEL_NAME_CLOCK.search(name)
+        if max_khz:
+            base_clock = max_khz // 1000
+        elif model_clock:
+            base_clock = round(float(model_clock.group(1)) * 1000)
+        else:
+            base_clock = None
+        components.append({
+            "type": "cpu",
+            "name": name,
+            "cores": _to_int(fields.get("cpu cores")) or threads,
+            "threads": threads,
+            "base_clock_mhz": base_clock,
+            "serial_number": None,
+            "manufacturer": fields.get("vendor_id"),
+        })
+    return components
+
+
+def collect_ram(root):
+    """
+    Суммарный объём памяти из /proc/meminfo. Раскладка по модулям без root
+    недоступна, поэтому отчёт содержит один компонент "System RAM".
+    """
+    content = _read(root, "/proc/meminfo")
+    if not content:
+        return []
+    total_kb = None
+    for line in content.splitlines():
+        if line.startswith("MemTotal:"):
+            total_kb = _to_int(line.split()[1])
+            break
+    if not total_kb:
+        return []
+    # MemTotal меньше установленного объёма на зарезервированную ядром память
+    size_mb = -(-total_kb // (1024 * 1024)) * 1024
+    return [{
+        "type": "ram",
+        "name": "System RAM",
+        "size_mb": size_mb,
+        "speed_mhz": None,
+        "form_factor": None,
+        "serial_number": None,
+        "manufacturer": None,
+    }]
+
+
+def collect_storage(root):
+    components = []
+    for name in _listdir(root, "/sys/block"):
+        if name.startswith(VIRTUAL_BLOCK_PREFIXES):
+            continue
+        base = "/sys/block/" + name
+        if _read(root, base + "/removable") == "1":
+            continue
+        capacity_gb = (_to_int(_read(root, base + "/size")) or 0) * 512 // (1024 ** 3)
+        if not capacity_gb:
+            continue
+
+        is_nvme = name.startswith("nvme")
+        rotational = _read(root, base + "/queue/rotational") == "1"
+        if is_nvme:
+            interface = "NVMe"
+        elif name.startswith("sd"):
+            interface = "SATA"
+        elif name.startswith("vd"):
+            interface = "VirtIO"
+        else:
+            interface = None
+
+        vendor = _read(root, base + "/device/vendor")
+        components.append({
+            "type": "storage",
+            "name": _read(root, base + "/device/model") or name,
+            "type_label": "HDD" if rotational else "SSD",
+            "capacity_gb": capacity_gb,
+            "interface": interface,
+            "serial_number": _read(root, base + "/device/serial"),
+            # У virtio вместо имени производителя - PCI ID
+            "manufacturer": None if vendor and vendor.startswith("0x") else vendor,
+        })
+    return components
+
+
+def collect_gpu(root):
+    components = []
+    for card in _listdir(root, "/sys/class/drm"):
+        # card0-HDMI-A-1 и т.п. - разъёмы, а не видеокарты
+        if not card.startswith("card") or "-" in card:
+            continue
+        base = "/sys/class/drm/" + card + "/device"
+        vendor_id = _read(root, base + "/vendor")
+        device_id = _read(root, base + "/device")
+        if not vendor_id:
+            continue
+        vendor = PCI_VENDORS.get(vendor_id, vendor_id)
+        vram = _to_int(_read(root, base + "/mem_info_vram_total"))
+        slot = None
+        uevent = _read(root, base + "/uevent") or ""
+        for line in uevent.splitlines():
+            if line.startswith("PCI_SLOT_NAME="):
+                slot = line.split("=", 1)[1]
+        pci_id = f"{vendor_id[2:]}:{(device_id or '')[2:]}"
+        components.append({
+            "type": "gpu",
+            "name": _read(root, base + "/label") or f"{vendor} GPU [{pci_id}]",
+            "memory_mb": vram // (1024 ** 2) if vram else None,
+            "serial_number": slot,
+            "manufacturer": vendor,
+        })
+    return components
+
+
+COLLECTORS = (collect_motherboard, collect_cpu, collect_ram, collect_storage, collect_gpu)
+
+
+def collect_inventory(root="/"):
+    """Опрашивает все источники параллельно и собирает отчёт."""
+    components = []
+    with ThreadPoolExecutor(max_workers=len(COLLECTORS)) as pool:
+        futures = [(collector, pool.submit(collector, root)) for collector in COLLECTORS]
+        for collector, future in futures:
+            try:
+                components.extend(future.result())
+            except Exception as e:  # один сбойный источник не должен ломать отчёт
+                print(f"[WARN] {collector.__name__}: {e}", file=sys.stderr)
+
+    return {
+        "hostname": platform.node(),
+        "components": components,
+        "protocol_version": PROTOCOL_VERSION,
+        "fingerprint": fingerprint(components),
+    }
+
+
+def send_inventory(server, asset_id, token, components, timeout=30):
+    """Отправляет отчёт по протоколу агента: только изменения, при 409 - полный набор."""
+    from urllib.error import HTTPError
+    from urllib.request import Request, urlopen
+
+    base = f"{server.rstrip('/')}/api/agent/v1/devices/{asset_id}"
+    headers = {"Authorization": "Bearer " + token, "Content-Type": "application/json"}
+
+    def call(method, url, body=None):
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        with urlopen(Request(url, data=data, headers=headers, method=method), timeout=timeout) as response:
+            return json.loads(response.read().decode("utf-8"))
+
+    state = call("GET", base + "/state")
+    report = build_report(state, components)
+    try:
+        return call("POST", base + "/report", report)
+    except HTTPError as e:
+        if e.code != 409 or "components" in report:
+            raise
+        return call("POST", base + "/report", build_report(None, components))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ITBase Inventory Agent (Linux)")
+    parser.add_argument("--output", help="Путь к JSON-отчёту (по умолчанию inventory_<hostname>.json)")
+    parser.add_argument("--stdout", action="store_true", help="Вывести отчёт в stdout")
+    parser.add_argument("--server", help="Адрес сервера ITBase для отправки отчёта")
+    parser.add_argument("--asset-id", type=int, help="ID актива на сервере")
+    parser.add_argument("--token", default=os.environ.get("ITBASE_TOKEN"), help="Bearer-токен (или ITBASE_TOKEN)")
+    parser.add_argument("--root", default="/", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    inventory = collect_inventory(args.root)
+
+    if args.server:
+        if not args.asset_id or not args.token:
+            parser.error("--server требует --asset-id и --token")
+        result = send_inventory(args.server, args.asset_id, args.token, inventory["components"])
+        print(json.dumps(result, ensure_ascii=False))
+        return 0
+
+    if args.stdout:
+        json.dump(inventory, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+        return 0
+
+    filename = args.output or f"inventory_{inventory['hostname']}.json"
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump(inventory, f, indent=2, ensure_ascii=False)
+    print(f"[SUCCESS] Saved to: {filename}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
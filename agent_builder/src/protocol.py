@@ -0,0 +1,80 @@
+"""
+Протокол обмена агента с сервером ITBase (версия 1).
+
+Модуль без внешних зависимостей: используется агентами (Windows, Linux)
+и должен давать те же отпечатки, что и сервер
+(app/services/component_service.py, ComponentService.fingerprint).
+
+Обмен:
+1. GET  /api/agent/v1/devices/{asset_id}/state
+   -> {"protocol_version", "fingerprint", "hashes": [...]}
+2. POST /api/agent/v1/devices/{asset_id}/report - одно из:
+   - {"unchanged": true, "fingerprint"}                  - отчёт не изменился;
+   - {"base_fingerprint", "fingerprint", "added", "removed"} - только изменения
+     (added - новые компоненты, removed - хэши исчезнувших);
+   - {"fingerprint", "components"}                       - полный отчёт.
+   На 409 (состояние сервера изменилось) агент повторяет полным отчётом.
+"""
+import hashlib
+import json
+from collections import Counter
+
+PROTOCOL_VERSION = 1
+
+COMMON_FIELDS = ("type", "name", "serial_number", "manufacturer")
+
+# Поля каждого типа компонента (совпадают со схемами app/schemas/component.py)
+COMPONENT_FIELDS = {
+    "cpu": ("cores", "threads", "base_clock_mhz"),
+    "ram": ("size_mb", "speed_mhz", "form_factor"),
+    "storage": ("type_label", "capacity_gb", "interface"),
+    "gpu": ("memory_mb",),
+    "motherboard": (),
+}
+
+
+def canonical_item(item):
+    """Каноническая JSON-строка компонента: все поля типа, ключи по алфавиту."""
+    fields = COMMON_FIELDS + COMPONENT_FIELDS.get(item.get("type"), ())
+    return json.dumps({field: item.get(field) for field in fields}, sort_keys=True, ensure_ascii=False)
+
+
+def item_hash(item):
+    return hashlib.sha256(canonical_item(item).encode("utf-8")).hexdigest()
+
+
+def fingerprint(items):
+    """Отпечаток набора компонентов, не зависящий от порядка."""
+    canonical = sorted(canonical_item(item) for item in items)
+    return hashlib.sha256("\n".join(canonical).encode("utf-8")).hexdigest()
+
+
+def build_report(state, components):
+    """
+    Формирует тело отчёта по состоянию сервера (ответ /state или None).
+    Без состояния или при несовместимой версии протокола - полный отчёт.
+    """
+    current = fingerprint(components)
+    report = {"protocol_version": PROTOCOL_VERSION, "fingerprint": current}
+
+    if not state or state.get("protocol_version") != PROTOCOL_VERSION or state.get("fingerprint") is None:
+        report["components"] = components
+        return report
+
+    if state["fingerprint"] == current:
+        report["unchanged"] = True
+        return report
+
+    server_hashes = Counter(state.get("hashes", []))
+    added = []
+    for item in components:
+        digest = item_hash(item)
+        if server_hashes[digest] > 0:
+            server_hashes[digest] -= 1
+        else:
+            added.append(item)
+
+    report["base_fingerprint"] = state["fingerprint"]
+    report["added"] = added
+    report["removed"] = list(server_hashes.elements())
+    return report
@@ -0,0 +1,45 @@
+"""add_inventory_counters
+
+Revision ID: 5e2b7c9d41a3
+Revises: 10160bb2b153
+Create Date: 2026-10-19 11:05:12.418230
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '5e2b7c9d41a3'
+down_revision: str | None = '10160bb2b153'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table('inventory_counters',
+    sa.Column('prefix', sa.String(length=10), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('last_value', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('prefix', 'day')
+    )
+
+    # Data Migration: продолжаем нумерацию уже выданных номеров вида PREFIX-YYYYMMDD-NNN
+    op.execute(
+        r"""
+        INSERT INTO inventory_counters (prefix, day, last_value)
+        SELECT m[1], to_date(m[2], 'YYYYMMDD'), max(m[3]::int)
+        FROM (
+            SELECT regexp_match(inventory_number, '^(.{1,10})-(\d{8})-(\d{1,9})$') AS m
+            FROM devices
+        ) parsed
+        WHERE m IS NOT NULL
+        GROUP BY m[1], m[2]
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('inventory_counters')
@@ -0,0 +1,42 @@
+"""add_hardware_query_indexes
+
+Revision ID: 7c15e0b9a3d4
+Revises: d4a9c3e71f28
+Create Date: 2026-10-19 15:21:48.044917
+
+"""
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '7c15e0b9a3d4'
+down_revision: str | None = 'd4a9c3e71f28'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_components_component_type_asset_id', 'components', ['component_type', 'asset_id'], unique=False
+    )
+    op.create_index(
+        'ix_components_component_type_name', 'components', ['component_type', 'name'], unique=False
+    )
+    op.create_index(
+        'ix_components_ram_id_size', 'components_ram', ['id'], unique=False, postgresql_include=['size_mb']
+    )
+    op.create_index(
+        'ix_components_storage_id_capacity',
+        'components_storage',
+        ['id'],
+        unique=False,
+        postgresql_include=['type_label', 'capacity_gb'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_components_storage_id_capacity', table_name='components_storage')
+    op.drop_index('ix_components_ram_id_size', table_name='components_ram')
+    op.drop_index('ix_components_component_type_name', table_name='components')
+    op.drop_index('ix_components_component_type_asset_id', table_name='components')
@@ -0,0 +1,75 @@
+"""add_dictionary_versions
+
+Revision ID: 9d3f6b2a7e15
+Revises: 3a8e5d27c914
+Create Date: 2026-10-19 21:34:08.512906
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '9d3f6b2a7e15'
+down_revision: str | None = '3a8e5d27c914'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Справочники, которые выводятся в формах и фильтрах списка активов
+DICTIONARY_TABLES = (
+    'assettypes',
+    'devicemodels',
+    'devicestatuses',
+    'departments',
+    'locations',
+    'employees',
+    'manufacturers',
+    'suppliers',
+    'tags',
+)
+
+
+def upgrade() -> None:
+    op.create_table('dictionary_versions',
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.execute('CREATE SEQUENCE dictionary_versions_seq')
+    # Строка версии обновляется один раз на изменивший таблицу SQL-оператор, а не
+    # на каждую строку: флаг в настройке транзакции хранит время текущего оператора.
+    # Операторы, не изменившие строк (ON CONFLICT DO NOTHING), версию не трогают
+    op.execute(
+        """
+        CREATE FUNCTION bump_dictionary_version() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            flag text := 'itbase.dictionary_changed_' || TG_TABLE_NAME;
+        BEGIN
+            IF coalesce(current_setting(flag, true), '') <> statement_timestamp()::text THEN
+                INSERT INTO dictionary_versions (name, version)
+                VALUES (TG_TABLE_NAME, nextval('dictionary_versions_seq'))
+                ON CONFLICT (name) DO UPDATE SET version = excluded.version;
+                PERFORM set_config(flag, statement_timestamp()::text, true);
+            END IF;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    for table in DICTIONARY_TABLES:
+        op.execute(
+            f'CREATE TRIGGER {table}_bump_dictionary_version '
+            f'AFTER INSERT OR UPDATE OR DELETE ON {table} '
+            f'FOR EACH ROW EXECUTE FUNCTION bump_dictionary_version()'
+        )
+
+
+def downgrade() -> None:
+    for table in DICTIONARY_TABLES:
+        op.execute(f'DROP TRIGGER {table}_bump_dictionary_version ON {table}')
+    op.execute('DROP FUNCTION bump_dictionary_version()')
+    op.execute('DROP SEQUENCE dictionary_versions_seq')
+    op.drop_table('dictionary_versions')
@@ -0,0 +1,36 @@
+"""compact_component_history
+
+Revision ID: d4a9c3e71f28
+Revises: b83f1d0e6a52
+Create Date: 2026-10-19 14:05:12.318402
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a9c3e71f28'
+down_revision: str | None = 'b83f1d0e6a52'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column('component_history', sa.Column('component_id', sa.Integer(), nullable=True))
+    op.create_index(
+        'ix_component_history_asset_id_id', 'component_history', ['asset_id', 'id'], unique=False
+    )
+    # Записи REMOVE старого формата уже содержат id компонента
+    op.execute(
+        "UPDATE component_history SET component_id = (component_snapshot ->> 'id')::integer "
+        "WHERE change_type = 'REMOVE' AND component_snapshot ->> 'id' ~ '^[0-9]+$'"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM component_history WHERE change_type = 'SNAPSHOT'")
+    op.drop_index('ix_component_history_asset_id_id', table_name='component_history')
+    op.drop_column('component_history', 'component_id')
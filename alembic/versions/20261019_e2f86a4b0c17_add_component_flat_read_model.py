@@ -0,0 +1,99 @@
+"""add_component_flat_read_model
+
+Revision ID: e2f86a4b0c17
+Revises: 7c15e0b9a3d4
+Create Date: 2026-10-19 16:48:03.571266
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2f86a4b0c17'
+down_revision: str | None = '7c15e0b9a3d4'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'component_flat',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('asset_id', sa.Integer(), nullable=False),
+        sa.Column('component_type', sa.String(length=50), nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.Column('serial_number', sa.String(length=255), nullable=True),
+        sa.Column('manufacturer', sa.String(length=255), nullable=True),
+        sa.Column('cores', sa.Integer(), nullable=True),
+        sa.Column('threads', sa.Integer(), nullable=True),
+        sa.Column('size_mb', sa.Integer(), nullable=True),
+        sa.Column('type_label', sa.String(length=50), nullable=True),
+        sa.Column('capacity_gb', sa.Integer(), nullable=True),
+        sa.Column('memory_mb', sa.Integer(), nullable=True),
+        sa.Column('spec', postgresql.JSONB(astext_type=sa.Text()), server_default=sa.text("'{}'::jsonb"), nullable=False),
+        sa.ForeignKeyConstraint(['asset_id'], ['devices.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['id'], ['components.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_component_flat_asset_id_type', 'component_flat', ['asset_id', 'component_type'], unique=False)
+    op.create_index('ix_component_flat_type_name', 'component_flat', ['component_type', 'name'], unique=False)
+
+    # Заполняем read-модель из таблиц joined inheritance
+    op.execute(
+        """
+        INSERT INTO component_flat (
+            id, asset_id, component_type, name, serial_number, manufacturer,
+            cores, threads, size_mb, type_label, capacity_gb, memory_mb, spec
+        )
+        SELECT
+            c.id, c.asset_id, c.component_type, c.name, c.serial_number, c.manufacturer,
+            cpu.cores, cpu.threads, ram.size_mb, st.type_label, st.capacity_gb, gpu.memory_mb,
+            CASE c.component_type
+                WHEN 'cpu' THEN jsonb_build_object(
+                    'cores', cpu.cores, 'threads', cpu.threads, 'base_clock_mhz', cpu.base_clock_mhz)
+                WHEN 'ram' THEN jsonb_build_object(
+                    'size_mb', ram.size_mb, 'speed_mhz', ram.speed_mhz, 'form_factor', ram.form_factor)
+                WHEN 'storage' THEN jsonb_build_object(
+                    'type_label', st.type_label, 'capacity_gb', st.capacity_gb, 'interface', st.interface)
+                WHEN 'gpu' THEN jsonb_build_object('memory_mb', gpu.memory_mb)
+                ELSE '{}'::jsonb
+            END
+        FROM components c
+        LEFT JOIN components_cpu cpu ON cpu.id = c.id
+        LEFT JOIN components_ram ram ON ram.id = c.id
+        LEFT JOIN components_storage st ON st.id = c.id
+        LEFT JOIN components_gpu gpu ON gpu.id = c.id
+        """
+    )
+
+    # Выборки по парку теперь читают component_flat
+    op.drop_index('ix_components_storage_id_capacity', table_name='components_storage')
+    op.drop_index('ix_components_ram_id_size', table_name='components_ram')
+    op.drop_index('ix_components_component_type_name', table_name='components')
+    op.drop_index('ix_components_component_type_asset_id', table_name='components')
+
+
+def downgrade() -> None:
+    op.create_index(
+        'ix_components_component_type_asset_id', 'components', ['component_type', 'asset_id'], unique=False
+    )
+    op.create_index(
+        'ix_components_component_type_name', 'components', ['component_type', 'name'], unique=False
+    )
+    op.create_index(
+        'ix_components_ram_id_size', 'components_ram', ['id'], unique=False, postgresql_include=['size_mb']
+    )
+    op.create_index(
+        'ix_components_storage_id_capacity',
+        'components_storage',
+        ['id'],
+        unique=False,
+        postgresql_include=['type_label', 'capacity_gb'],
+    )
+    op.drop_index('ix_component_flat_type_name', table_name='component_flat')
+    op.drop_index('ix_component_flat_asset_id_type', table_name='component_flat')
+    op.drop_table('component_flat')
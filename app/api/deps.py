@@ -1,20 +1,42 @@
 # app/api/deps.py
+from collections.abc import AsyncGenerator
 from typing import Annotated
 
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from pydantic import ValidationError
-from sqlalchemy import select
+from sqlalchemy import bindparam, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
-from app.db.database import get_db
+from app.db.database import get_db, replica_router
 from app.models.user import User
 from app.schemas.user import TokenData
 
 reusable_oauth2 = OAuth2PasswordBearer(tokenUrl='/login/access-token')
 
+# Пользователь ищется в каждом запросе: запросы с именованными параметрами
+# строятся один раз, ключ кэша компиляции у них вычисляется однократно
+USER_BY_EMAIL = select(User).where(User.email == bindparam('email'))
+USER_BY_ID = select(User).where(User.id == bindparam('user_id'))
+
+
+async def get_read_db(
+    request: Request,
+    db: Annotated[AsyncSession, Depends(get_db)],
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Сессия для обработчиков, которые только читают: реплика, если они настроены
+    и клиент недавно ничего не менял, иначе обычная сессия get_db.
+    Сессия get_db создается всегда, но соединение она берет только при первом запросе.
+    """
+    if not replica_router.use_replica(request.method, request.cookies):
+        yield db
+        return
+    async with replica_router.session() as session:
+        yield session
+
 
 async def get_current_user(
     token: Annotated[str, Depends(reusable_oauth2)],
@@ -36,7 +58,7 @@ async def get_current_user(
     except (JWTError, ValidationError):
         raise credentials_exception
 
-    result = await db.execute(select(User).filter(User.email == token_data.email))
+    result = await db.execute(USER_BY_EMAIL, {'email': token_data.email})
     user = result.scalars().first()
 
     if user is None:
@@ -90,7 +112,7 @@ async def get_current_user_from_session(
             headers={'Location': '/login'},
         )
 
-    result = await db.execute(select(User).filter(User.id == user_id))
+    result = await db.execute(USER_BY_ID, {'user_id': user_id})
     user = result.scalars().first()
 
     if not user:
@@ -7,7 +7,9 @@ from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
+from app.config import settings
 from app.db.database import get_db
+from app.db.slow_query_log import slow_query_log
 from app.flash import flash
 from app.models.user import User
 from app.schemas.dictionary import (
@@ -37,6 +39,7 @@ from app.services.manufacturer_service import manufacturer_service
 from app.services.supplier_service import supplier_service
 from app.services.tag_service import tag_service
 from app.templating import templates
+from app.tracing import tracer
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -439,3 +442,53 @@ async def delete_dictionary_item(
         url=request.url_for('manage_dictionary', dictionary_type=dictionary_type),
         status_code=303,
     )
+
+
+@router.get('/slow-queries', response_class=HTMLResponse, name='slow_queries')
+async def slow_queries_page(
+    request: Request,
+    current_user: User = Depends(deps.get_current_superuser_from_session),
+):
+    """Журнал медленных SQL-запросов этого процесса."""
+    return templates.TemplateResponse(
+        'admin/slow_queries.html',
+        {
+            'request': request,
+            'title': 'Медленные запросы',
+            'entries': slow_query_log.entries(),
+            'threshold_ms': slow_query_log.threshold_ms,
+            'explain_sample': slow_query_log.explain_sample,
+            'size': settings.SLOW_QUERY_LOG_SIZE,
+        },
+    )
+
+
+@router.get('/slow-queries.json', name='slow_queries_json')
+async def slow_queries_json(
+    current_user: User = Depends(deps.get_current_superuser_from_session),
+) -> dict:
+    return {
+        'threshold_ms': slow_query_log.threshold_ms,
+        'entries': [entry.to_dict() for entry in slow_query_log.entries()],
+    }
+
+
+@router.post('/slow-queries/clear', name='clear_slow_queries')
+async def clear_slow_queries(
+    request: Request,
+    current_user: User = Depends(deps.get_current_superuser_from_session),
+):
+    slow_query_log.clear()
+    flash(request, 'Журнал медленных запросов очищен.', 'success')
+    return RedirectResponse(url=request.url_for('slow_queries'), status_code=303)
+
+
+@router.get('/traces.json', name='traces_json')
+async def traces_json(
+    current_user: User = Depends(deps.get_current_superuser_from_session),
+) -> dict:
+    """Последние трассы запросов этого процесса (см. TRACE_SAMPLE_RATE)."""
+    return {
+        'sample_rate': tracer.sample_rate,
+        'traces': tracer.recent(),
+    }
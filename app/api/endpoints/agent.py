@@ -0,0 +1,53 @@
+# Path: app/api/endpoints/agent.py
+"""
+API протокола агента инвентаризации (версия 1).
+Агенты авторизуются bearer-токеном (/login/access-token), а не сессией.
+"""
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_current_active_superuser, get_db
+from app.models.user import User
+from app.schemas.agent import AgentComponentState, AgentReport, AgentReportResult
+from app.services.agent_protocol_service import AgentProtocolService
+from app.services.exceptions import AgentProtocolError, AgentStateConflictError, DeviceNotFoundException
+
+router = APIRouter()
+
+
+@router.get('/devices/{asset_id}/state', response_model=AgentComponentState, name='agent_device_state')
+async def agent_device_state(
+    asset_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_superuser),
+):
+    """Отпечаток и хэши компонентов устройства для построения дельты."""
+    try:
+        return await AgentProtocolService.get_state(db, asset_id)
+    except DeviceNotFoundException as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+
+@router.post('/devices/{asset_id}/report', response_model=AgentReportResult, name='agent_device_report')
+async def agent_device_report(
+    asset_id: int,
+    report: AgentReport,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_superuser),
+):
+    """
+    Принимает отчёт агента: "без изменений", дельту или полный набор.
+    409 означает, что агенту нужно повторить запрос полным отчётом.
+    """
+    try:
+        result = await AgentProtocolService.apply_report(db, asset_id, report)
+    except DeviceNotFoundException as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except AgentProtocolError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except AgentStateConflictError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+    if result.status == 'applied':
+        await db.commit()
+    return result
@@ -5,7 +5,7 @@ API endpoints для аналитики и дашборда.
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_user_from_session, get_db
+from app.api.deps import get_current_user_from_session, get_read_db
 from app.db.repositories.analytics_repo import SqlAlchemyAnalyticsRepository
 from app.models.user import User
 from app.schemas.analytics import DashboardDataDTO
@@ -15,7 +15,7 @@ router = APIRouter()
 
 @router.get("/dashboard", response_model=DashboardDataDTO, name="get_analytics_dashboard")
 async def get_analytics_dashboard(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user_from_session),
 ):
     """
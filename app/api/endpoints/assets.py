@@ -18,38 +18,50 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.deps import (
     get_current_superuser_from_session,
     get_current_user_from_session,
+    get_read_db,
 )
 from app.db.database import get_db
 from app.flash import flash, get_flashed_messages
+from app.models.device import Device
+from app.models.ingestion_job import IngestionJob
 from app.models.user import User
-from app.schemas.asset import AssetCreate, AssetResponse, AssetUpdate
-from app.schemas.component import ComponentItem
+from app.schemas.asset import (
+    AssetBulkCreate,
+    AssetBulkCreated,
+    AssetBulkCreateResult,
+    AssetCreate,
+    AssetImportReport,
+    AssetResponse,
+    AssetUpdate,
+)
+from app.schemas.component import ComponentHistoryEntry, ComponentHistoryPage, ComponentItem
+from app.schemas.ingestion import IngestionJobQueued
+from app.services.asset_import_service import AssetImportService
 from app.services.component_service import ComponentService
 from app.services.device_service import DeviceService
 from app.services.exceptions import (
+    AssetImportError,
     DeletionError,
     DeviceNotFoundException,
     DuplicateDeviceError,
     NotFoundError,
 )
+from app.services.ingestion_service import JOB_COMPONENTS, JOB_IMPORT, IngestionService
 from app.templating import templates
 from app.utils.helpers import safe_int
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Сколько последних записей истории компонентов показывать на странице редактирования
+COMPONENT_HISTORY_WINDOW = 20
+
 
 def get_device_service() -> DeviceService:
     return DeviceService()
 
 
-@router.get('/assets-list', response_class=HTMLResponse, name='read_assets')
-async def read_assets(
-    request: Request,
-    db: AsyncSession = Depends(get_db),
-    device_service: DeviceService = Depends(get_device_service),
-    page: int = Query(1, ge=1),
-    page_size: int = Query(20, ge=1, le=100),
+def asset_list_filters(
     search: str | None = Query(None),
     asset_type_id: str | None = Query(None),
     status_id: str | None = Query(None),
@@ -59,67 +71,109 @@ async def read_assets(
     employee_id: str | None = Query(None),
     supplier_id: str | None = Query(None),
     tag_id: str | None = Query(None),
-    sort_by: str | None = Query(None),
-    sort_order: str = Query('asc'),
-    current_user: User = Depends(get_current_user_from_session),
-):
-    """Отображает список активов с фильтрацией, сортировкой и пагинацией."""
-    try:
-        filters_dict = {
-            'search': search,
-            'asset_type_id': safe_int(asset_type_id),
-            'status_id': safe_int(status_id),
-            'department_id': safe_int(department_id),
-            'location_id': safe_int(location_id),
-            'manufacturer_id': safe_int(manufacturer_id),
-            'employee_id': safe_int(employee_id),
-            'supplier_id': safe_int(supplier_id),
-            'tag_id': safe_int(tag_id),
-        }
+) -> dict:
+    """Фильтры списка активов из query string (пустые и нечисловые id - без фильтра)."""
+    return {
+        'search': search,
+        'asset_type_id': safe_int(asset_type_id),
+        'status_id': safe_int(status_id),
+        'department_id': safe_int(department_id),
+        'location_id': safe_int(location_id),
+        'manufacturer_id': safe_int(manufacturer_id),
+        'employee_id': safe_int(employee_id),
+        'supplier_id': safe_int(supplier_id),
+        'tag_id': safe_int(tag_id),
+    }
 
-        (
-            paginated_devices_db,
-            total_devices,
-        ) = await device_service.get_devices_with_filters(
+
+async def _asset_list_context(
+    request: Request,
+    db: AsyncSession,
+    device_service: DeviceService,
+    filters: dict,
+    page: int,
+    page_size: int,
+    sort_by: str | None,
+    sort_order: str,
+) -> dict:
+    """Контекст таблицы и пагинации (includes/assets_results.html)."""
+    try:
+        paginated_devices_db, total_devices = await device_service.get_devices_with_filters(
             db=db,
             page=page,
             page_size=page_size,
             sort_by=sort_by,
             sort_order=sort_order,
-            **filters_dict,
+            **filters,
         )
-        paginated_devices = [
-            AssetResponse.model_validate(d, from_attributes=True)
-            for d in paginated_devices_db
-        ]
-        form_data = await device_service.get_all_dictionaries_for_form(db)
-        query_params = request.query_params._dict.copy()
-        query_params.pop('page', None)
-
-        context = {
-            'request': request,
-            'devices': paginated_devices,
-            'total_devices': total_devices,
-            'page': page,
+    except SQLAlchemyError as e:
+        logger.error(f'Ошибка при загрузке списка активов: {e}', exc_info=True)
+        raise HTTPException(
+            status_code=500, detail='Ошибка базы данных при загрузке активов.'
+        )
+    query_params = request.query_params._dict.copy()
+    query_params.pop('page', None)
+    return {
+        'request': request,
+        'devices': [AssetResponse.model_validate(d, from_attributes=True) for d in paginated_devices_db],
+        'total_devices': total_devices,
+        'page': page,
+        'page_size': page_size,
+        'total_pages': (total_devices + page_size - 1) // page_size,
+        'filters': {
+            **filters,
             'page_size': page_size,
-            'total_pages': (total_devices + page_size - 1) // page_size,
-            'title': 'Список активов',
-            **form_data,
-            'endpoint_name': 'read_assets',
-            'filters': {
-                **filters_dict,
-                'page_size': page_size,
-                'sort_by': sort_by,
-                'sort_order': sort_order,
-            },
-            'query_params': query_params,
-        }
-        return templates.TemplateResponse('assets_list.html', context)
+            'sort_by': sort_by,
+            'sort_order': sort_order,
+        },
+        'query_params': query_params,
+    }
+
+
+@router.get('/assets-list', response_class=HTMLResponse, name='read_assets')
+async def read_assets(
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
+    device_service: DeviceService = Depends(get_device_service),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    filters: dict = Depends(asset_list_filters),
+    sort_by: str | None = Query(None),
+    sort_order: str = Query('asc'),
+    current_user: User = Depends(get_current_user_from_session),
+):
+    """Отображает список активов с фильтрацией, сортировкой и пагинацией."""
+    context = await _asset_list_context(request, db, device_service, filters, page, page_size, sort_by, sort_order)
+    try:
+        form_data = await device_service.get_all_dictionaries_for_form(db)
     except SQLAlchemyError as e:
         logger.error(f'Ошибка при загрузке списка активов: {e}', exc_info=True)
         raise HTTPException(
             status_code=500, detail='Ошибка базы данных при загрузке активов.'
         )
+    context.update(form_data, title='Список активов', endpoint_name='read_assets')
+    return templates.TemplateResponse('assets_list.html', context)
+
+
+@router.get('/assets-list/results', response_class=HTMLResponse, name='read_assets_results')
+async def read_assets_results(
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
+    device_service: DeviceService = Depends(get_device_service),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    filters: dict = Depends(asset_list_filters),
+    sort_by: str | None = Query(None),
+    sort_order: str = Query('asc'),
+    current_user: User = Depends(get_current_user_from_session),
+):
+    """
+    Только таблица и пагинация списка активов для того же query string, что
+    у /assets-list: страница подменяет ими #assets-results при смене страницы,
+    сортировки и фильтров. Справочники фильтров и каркас страницы не грузятся.
+    """
+    context = await _asset_list_context(request, db, device_service, filters, page, page_size, sort_by, sort_order)
+    return templates.TemplateResponse('includes/assets_results.html', context)
 
 
 @router.get("/dashboard", response_class=HTMLResponse, name="dashboard")
@@ -138,7 +192,7 @@ async def dashboard(
 @router.get('/export/csv', name='export_assets_csv')
 async def export_assets_csv(
     request: Request,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     device_service: DeviceService = Depends(get_device_service),
     search: str | None = Query(None),
     asset_type_id: str | None = Query(None),
@@ -238,7 +292,6 @@ async def add_asset_form(
     asset = type('Asset', (), submitted_data)() if submitted_data else None
     try:
         form_data_for_selects = await device_service.get_all_dictionaries_for_form(db)
-        all_tags = await device_service.get_all_tags(db)
     except Exception as e:
         logger.error(
             f"Ошибка при загрузке данных для формы 'add_asset': {e}", exc_info=True
@@ -251,7 +304,6 @@ async def add_asset_form(
         'request': request,
         'title': 'Добавить актив',
         **form_data_for_selects,
-        'all_tags': all_tags,
         'asset': asset,
         'errors': validation_errors,
         'messages': flashed_messages,
@@ -327,32 +379,29 @@ async def create_asset(
     )
 
 
-@router.post('/import', name='import_asset_from_agent')
+@router.post(
+    '/import',
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=IngestionJobQueued,
+    name='import_asset_from_agent',
+)
 async def import_asset_from_agent(
+    request: Request,
     file: UploadFile,
     db: AsyncSession = Depends(get_db),
     device_service: DeviceService = Depends(get_device_service),
     current_user: User = Depends(get_current_superuser_from_session),
 ):
     """
-    Создает актив на основе JSON-отчета агента.
+    Принимает JSON-отчет агента и ставит создание актива в очередь.
+    Формат проверяется сразу (400), актив создает обработчик очереди.
     """
-    try:
-        new_device = await device_service.create_from_agent_data(
-            file=file, session=db, user_id=current_user.id
-        )
-        await db.commit()
-        return {
-            'status': 'success',
-            'device_id': new_device.id,
-            'redirect_url': f'/edit/{new_device.id}?tab=components',
-        }
-    except Exception as e:
-        logger.error(f'Ошибка при импорте актива: {e}', exc_info=True)
-        # Если это HTTPException, прокидываем его, иначе 500
-        if isinstance(e, HTTPException):
-            raise e
-        raise HTTPException(status_code=500, detail=f'Ошибка импорта: {e!s}')
+    dto = device_service.parse_agent_report(await file.read())
+    job = await IngestionService.enqueue(
+        db, JOB_IMPORT, dto.model_dump(mode='json'), user_id=current_user.id
+    )
+    await db.commit()
+    return _queued_response(request, job)
 
 
 @router.get('/edit/{device_id}', response_class=HTMLResponse, name='edit_asset')
@@ -375,6 +424,9 @@ async def edit_asset(
         raise HTTPException(
             status_code=500, detail='Ошибка при загрузке данных для формы.'
         )
+    component_history, history_next_before_id = await ComponentService.get_history(
+        db, device.id, limit=COMPONENT_HISTORY_WINDOW
+    )
     existing_tags_data = [{'id': tag.id, 'name': tag.name} for tag in device.tags]
     return templates.TemplateResponse(
         'edit_asset.html',
@@ -382,6 +434,8 @@ async def edit_asset(
             'request': request,
             'device': device,
             **form_data,
+            'component_history': component_history,
+            'history_next_before_id': history_next_before_id,
             'existing_tags_data': existing_tags_data,
             'title': f'Редактировать актив #{device.id}',
         },
@@ -528,6 +582,54 @@ async def bulk_update_assets(
     return RedirectResponse(referer, status_code=status.HTTP_303_SEE_OTHER)
 
 
+@router.post(
+    '/api/assets/bulk-create',
+    status_code=status.HTTP_201_CREATED,
+    response_model=AssetBulkCreateResult,
+    name='bulk_create_assets',
+)
+async def bulk_create_assets(
+    payload: AssetBulkCreate,
+    db: AsyncSession = Depends(get_db),
+    device_service: DeviceService = Depends(get_device_service),
+    current_user: User = Depends(get_current_superuser_from_session),
+):
+    """
+    Создает пакет активов (до 10 000) одной транзакцией.
+    Пакет создается целиком или не создается вовсе.
+    """
+    try:
+        created = await device_service.bulk_create_devices(db, payload.items, current_user.id)
+    except NotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except DuplicateDeviceError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return AssetBulkCreateResult(
+        created=len(created),
+        items=[AssetBulkCreated(id=device_id, inventory_number=number) for device_id, number in created],
+    )
+
+
+@router.post('/api/assets/import', response_model=AssetImportReport, name='import_assets_file')
+async def import_assets_file(
+    file: UploadFile = File(...),
+    encoding: str = Query('utf-8-sig', description='Кодировка CSV (например, cp1251)'),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_superuser_from_session),
+):
+    """
+    Импортирует активы из CSV/XLSX порциями: существующие (по инвентарному
+    номеру старой системы) обновляются, новые создаются. Ошибочные строки
+    перечисляются в отчете и не прерывают импорт.
+    """
+    try:
+        return await AssetImportService().import_file(
+            db, file.file, file.filename or '', current_user.id, encoding=encoding
+        )
+    except AssetImportError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
 def _normalize_component_data(data: dict | list) -> list[dict]:
     """Нормализует входящие данные в плоский список."""
     normalized_items = []
@@ -545,15 +647,21 @@ def _normalize_component_data(data: dict | list) -> list[dict]:
     return normalized_items
 
 
-@router.post('/{asset_id}/components/upload', name='upload_components')
+@router.post(
+    '/{asset_id}/components/upload',
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=IngestionJobQueued,
+    name='upload_components',
+)
 async def upload_components(
+    request: Request,
     asset_id: int,
     file: UploadFile = File(...),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_superuser_from_session),
 ):
     """
-    Загружает список компонентов из JSON файла.
+    Принимает список компонентов из JSON файла и ставит синхронизацию в очередь.
     """
     if not file.filename.endswith('.json'):
         raise HTTPException(status_code=400, detail='Файл должен быть JSON')
@@ -579,7 +687,65 @@ async def upload_components(
             errors.append(f"{loc}: {err['msg']}")
         raise HTTPException(status_code=422, detail=f'Ошибка валидации: {"; ".join(errors)}')
 
-    await ComponentService.sync_components(db, asset_id, items)
+    if await db.get(Device, asset_id) is None:
+        raise HTTPException(status_code=404, detail='Актив не найден')
+
+    job = await IngestionService.enqueue(
+        db,
+        JOB_COMPONENTS,
+        [item.model_dump(mode='json') for item in items],
+        user_id=current_user.id,
+        asset_id=asset_id,
+    )
     await db.commit()
+    return _queued_response(request, job)
+
 
-    return {'status': 'ok', 'count': len(items)}
+def _queued_response(request: Request, job: IngestionJob) -> IngestionJobQueued:
+    return IngestionJobQueued(
+        job_id=job.id,
+        status_url=request.url_for('ingestion_job_status', job_id=job.id).path,
+    )
+
+
+@router.get(
+    '/{asset_id}/components/history',
+    response_model=ComponentHistoryPage,
+    name='component_history',
+)
+async def component_history(
+    asset_id: int,
+    limit: int = Query(COMPONENT_HISTORY_WINDOW, ge=1, le=200),
+    before_id: int | None = Query(None),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user_from_session),
+):
+    """Постраничная история изменений компонентов (курсор before_id)."""
+    try:
+        rows, next_before_id = await ComponentService.get_history(db, asset_id, limit=limit, before_id=before_id)
+        # Существование актива проверяется, только когда страница пуста
+        if not rows:
+            await ComponentService.ensure_device(db, asset_id)
+    except DeviceNotFoundException as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    return ComponentHistoryPage(
+        items=[ComponentHistoryEntry.model_validate(row) for row in rows],
+        next_before_id=next_before_id,
+    )
+
+
+@router.get('/{asset_id}/components/at', name='components_at')
+async def components_at(
+    asset_id: int,
+    at: datetime = Query(..., description='Момент времени (ISO 8601)'),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user_from_session),
+):
+    """Набор компонентов актива на указанный момент времени."""
+    try:
+        components = await ComponentService.get_components_at(db, asset_id, at)
+        if not components:
+            await ComponentService.ensure_device(db, asset_id)
+    except DeviceNotFoundException as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    return {'asset_id': asset_id, 'at': at, 'components': components}
@@ -9,6 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.deps import (
     get_current_superuser_from_session,
     get_current_user_from_session,
+    get_read_db,
 )
 from app.db.database import get_db
 from app.models.action_log import ActionLog
@@ -25,7 +26,7 @@ router = APIRouter(tags=['Audit Logs'])
 @router.get('/audit-logs', response_class=HTMLResponse, name='view_audit_logs_page')
 async def view_audit_logs_page(
     request: Request,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user_from_session),
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=200),
@@ -8,6 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.deps import (
     get_current_superuser_from_session,
     get_current_user_from_session,
+    get_read_db,
 )
 from app.db.database import get_db
 from app.models import (
@@ -147,7 +148,7 @@ async def create_dictionary_entry(
 @router.get('/{dict_name}')
 async def get_dictionary_entries(
     dict_name: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     service: DictionaryService = Depends(get_dictionary_service),
     current_user: User = Depends(get_current_user_from_session),
 ) -> list[dict[str, Any]]:
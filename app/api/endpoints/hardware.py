@@ -0,0 +1,41 @@
+# Path: app/api/endpoints/hardware.py
+"""
+API выборок по аппаратной конфигурации парка (RAM, накопители, CPU, GPU).
+"""
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_current_user_from_session, get_read_db
+from app.db.repositories.hardware_repo import CensusKind, SqlAlchemyHardwareRepository
+from app.models.user import User
+from app.schemas.hardware import DeviceHardwarePage, HardwareCensusDTO, HardwareFilter
+
+router = APIRouter()
+
+
+@router.get('/devices', response_model=DeviceHardwarePage, name='hardware_devices')
+async def hardware_devices(
+    filters: HardwareFilter = Depends(),
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user_from_session),
+):
+    """
+    Устройства с агрегированной конфигурацией, отфильтрованные по железу.
+    Например: ?ram_mb_lt=8192 или ?hdd_only=true.
+    """
+    repo = SqlAlchemyHardwareRepository(db)
+    return await repo.find_devices(filters, limit=limit, offset=offset)
+
+
+@router.get('/census/{kind}', response_model=list[HardwareCensusDTO], name='hardware_census')
+async def hardware_census(
+    kind: CensusKind,
+    filters: HardwareFilter = Depends(),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user_from_session),
+):
+    """Перепись парка по моделям CPU, типам накопителей или объёму RAM."""
+    repo = SqlAlchemyHardwareRepository(db)
+    return await repo.census(kind, filters)
@@ -0,0 +1,25 @@
+# Path: app/api/endpoints/ingestion.py
+"""Состояние заданий очереди отчетов агентов."""
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_current_user_from_session
+from app.db.database import get_db
+from app.models.user import User
+from app.schemas.ingestion import IngestionJobStatus
+from app.services.ingestion_service import IngestionService
+
+router = APIRouter()
+
+
+@router.get('/jobs/{job_id}', response_model=IngestionJobStatus, name='ingestion_job_status')
+async def ingestion_job_status(
+    job_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user_from_session),
+):
+    """Статус задания: pending, done (с результатом) или failed (с ошибкой)."""
+    job = await IngestionService.get_job(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Задание не найдено')
+    return job
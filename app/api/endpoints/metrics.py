@@ -0,0 +1,27 @@
+# app/api/endpoints/metrics.py
+import secrets
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.db.database import get_db
+from app.metrics import INGESTION_QUEUE_DEPTH, render_metrics
+from app.services.ingestion_service import IngestionService
+
+router = APIRouter()
+
+
+@router.get('/metrics', include_in_schema=False)
+async def metrics(
+    db: AsyncSession = Depends(get_db),
+    authorization: str | None = Header(None),
+) -> Response:
+    """Метрики в формате Prometheus (все воркеры gunicorn)."""
+    if settings.METRICS_TOKEN and not secrets.compare_digest(
+        authorization or '', f'Bearer {settings.METRICS_TOKEN}'
+    ):
+        raise HTTPException(status_code=401, detail='Неверный токен метрик')
+    INGESTION_QUEUE_DEPTH.set(await IngestionService.queue_depth(db))
+    content, content_type = render_metrics()
+    return Response(content=content, media_type=content_type)
@@ -0,0 +1,89 @@
+# app/api/lazy.py
+"""
+Отложенное подключение редко используемых роутеров.
+
+Вместо include_router в приложение ставится заглушка на префикс роутера.
+Модуль роутера (со своими схемами и сервисами) импортируется при первом
+запросе к префиксу или при построении OpenAPI-схемы; заглушка заменяется
+настоящими маршрутами на своем месте в списке, и запрос маршрутизируется
+заново. Воркер стартует быстрее, а первый запрос к роутеру платит за импорт.
+
+url_for по имени маршрута такого роутера тоже подгружает его: роутеры, на которые
+ссылаются шаблоны и частые страницы, откладывать нет смысла.
+"""
+import importlib
+import logging
+import time
+from typing import Any
+
+from fastapi import FastAPI
+from starlette.datastructures import URLPath
+from starlette.routing import BaseRoute, Match, NoMatchFound, get_route_path
+from starlette.types import Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+
+class LazyRouter(BaseRoute):
+    """Заглушка роутера module.router, подключаемого с prefix и tags при первом обращении."""
+
+    def __init__(self, app: FastAPI, module: str, prefix: str, tags: list[str] | None = None):
+        self._app = app
+        self.module = module
+        self.prefix = prefix
+        self.tags = tags
+        self.loaded = False
+        self.routes: list[BaseRoute] = []
+
+    def matches(self, scope: Scope) -> tuple[Match, Scope]:
+        if scope['type'] != 'http':
+            return Match.NONE, {}
+        path = get_route_path(scope)
+        if path == self.prefix or path.startswith(self.prefix + '/'):
+            return Match.FULL, {}
+        return Match.NONE, {}
+
+    def url_path_for(self, name: str, /, **path_params: Any) -> URLPath:
+        self.load()
+        for route in self.routes:
+            try:
+                return route.url_path_for(name, **path_params)
+            except NoMatchFound:
+                pass
+        raise NoMatchFound(name, path_params)
+
+    def load(self) -> None:
+        """Импортирует модуль и ставит его маршруты на место заглушки."""
+        if self.loaded:
+            return
+        started = time.perf_counter()
+        router = importlib.import_module(self.module).router
+        routes = self._app.router.routes
+        existing = len(routes)
+        self._app.include_router(router, prefix=self.prefix, tags=self.tags)
+        added = routes[existing:]
+        del routes[existing:]
+        index = routes.index(self)
+        routes[index:index + 1] = added
+        self.routes = added
+        self.loaded = True
+        # Схема OpenAPI строится заново уже с маршрутами роутера
+        self._app.openapi_schema = None
+        logger.info(f'Роутер {self.module} подключен за {(time.perf_counter() - started) * 1000:.0f} мс')
+
+    async def handle(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.load()
+        await self._app.router.app(scope, receive, send)
+
+
+def include_lazy_routers(app: FastAPI, routers: list[LazyRouter]) -> None:
+    """Ставит заглушки и подгружает роутеры перед построением OpenAPI-схемы."""
+    app.router.routes.extend(routers)
+    build_openapi = app.openapi
+
+    def openapi() -> dict:
+        for router in routers:
+            router.load()
+        return build_openapi()
+
+    app.openapi = openapi
@@ -21,6 +21,44 @@ class Settings(BaseSettings):
         ..., env='POSTGRES_PASSWORD', description='Пароль для PostgreSQL (обязательный)'
     )
     POSTGRES_DB: str = Field(default='itbase', env='POSTGRES_DB')
+    POSTGRES_REPLICA_URLS: str = Field(
+        default='',
+        env='POSTGRES_REPLICA_URLS',
+        description='Реплики только для чтения через запятую, postgresql+asyncpg://... (пусто - без реплик)',
+    )
+    REPLICA_STICKY_SECONDS: int = Field(
+        default=10,
+        env='REPLICA_STICKY_SECONDS',
+        description='Сколько секунд после изменения клиент читает из основной базы',
+    )
+
+    # --- ПУЛ СОЕДИНЕНИЙ ---
+    WEB_CONCURRENCY: int = Field(
+        default=1, env='WEB_CONCURRENCY', description='Число воркеров gunicorn (его же читает gunicorn)'
+    )
+    DB_POOL_SIZE: int = Field(default=5, env='DB_POOL_SIZE', description='Постоянных соединений в пуле воркера')
+    DB_MAX_OVERFLOW: int = Field(
+        default=10, env='DB_MAX_OVERFLOW', description='Временных соединений сверх DB_POOL_SIZE при пиках'
+    )
+    DB_POOL_TIMEOUT: float = Field(
+        default=10, env='DB_POOL_TIMEOUT', description='Ожидание свободного соединения, сек'
+    )
+    DB_POOL_RECYCLE: int = Field(
+        default=1800, env='DB_POOL_RECYCLE', description='Пересоздавать соединения старше, сек (-1 - никогда)'
+    )
+    DB_CONNECT_TIMEOUT: float = Field(
+        default=10, env='DB_CONNECT_TIMEOUT', description='Таймаут открытия соединения, сек'
+    )
+    DB_MAX_CONNECTIONS: int = Field(
+        default=0,
+        env='DB_MAX_CONNECTIONS',
+        description='Бюджет соединений с базой на все воркеры; делится между ними (0 - пул из DB_POOL_SIZE)',
+    )
+    DB_PGBOUNCER: bool = Field(
+        default=False,
+        env='DB_PGBOUNCER',
+        description='Подключение через PgBouncer в режиме transaction: без кэша подготовленных выражений',
+    )
 
     # --- REDIS ---
     REDIS_HOST: str = Field(default='redis', env='REDIS_HOST')
@@ -37,14 +75,81 @@ class Settings(BaseSettings):
         default=30, env='ACCESS_TOKEN_EXPIRE_MINUTES'
     )
 
+    # --- ОЧЕРЕДЬ ОТЧЕТОВ АГЕНТОВ ---
+    INGESTION_WORKERS: int = Field(
+        default=2, env='INGESTION_WORKERS', description='Число фоновых обработчиков очереди (0 - выключено)'
+    )
+    INGESTION_BATCH_SIZE: int = Field(
+        default=20, env='INGESTION_BATCH_SIZE', description='Заданий в одной транзакции обработчика'
+    )
+    INGESTION_POLL_INTERVAL: float = Field(
+        default=1.0, env='INGESTION_POLL_INTERVAL', description='Пауза опроса пустой очереди, сек'
+    )
+
+    # --- ДИАГНОСТИКА SQL ---
+    SQL_SERVER_TIMING: bool = Field(
+        default=False, env='SQL_SERVER_TIMING', description='Заголовок Server-Timing с числом и временем SQL-запросов'
+    )
+    SQL_SLOWEST_STATEMENTS: int = Field(
+        default=5, env='SQL_SLOWEST_STATEMENTS', description='Сколько самых медленных запросов хранить в request.state'
+    )
+    SLOW_QUERY_THRESHOLD_MS: float = Field(
+        default=500, env='SLOW_QUERY_THRESHOLD_MS', description='Порог журнала медленных запросов, мс (0 - выключен)'
+    )
+    SLOW_QUERY_LOG_SIZE: int = Field(
+        default=200, env='SLOW_QUERY_LOG_SIZE', description='Записей в журнале медленных запросов на процесс'
+    )
+    SLOW_QUERY_EXPLAIN_SAMPLE: float = Field(
+        default=0.0,
+        env='SLOW_QUERY_EXPLAIN_SAMPLE',
+        description='Доля медленных SELECT, для которых снимается EXPLAIN ANALYZE (0 - никогда)',
+    )
+
+    # --- ТРАССИРОВКА ---
+    TRACE_SAMPLE_RATE: float = Field(
+        default=0.0, env='TRACE_SAMPLE_RATE', description='Доля трассируемых HTTP-запросов (0 - выключено)'
+    )
+    TRACE_BUFFER_SIZE: int = Field(
+        default=50, env='TRACE_BUFFER_SIZE', description='Последних трасс в памяти процесса (/admin/traces.json)'
+    )
+    TRACE_OTLP_ENDPOINT: str = Field(
+        default='',
+        env='TRACE_OTLP_ENDPOINT',
+        description='OTLP/HTTP приемник трасс, например http://localhost:4318/v1/traces (пусто - не отправлять)',
+    )
+
+    # --- МЕТРИКИ ---
+    METRICS_TOKEN: str = Field(
+        default='', env='METRICS_TOKEN', description='Bearer-токен для /metrics (пусто - без проверки)'
+    )
+
     # --- ПУТИ ---
     TEMPLATES_DIR: Path = BASE_DIR / 'templates'
 
+    # --- ШАБЛОНЫ ---
+    TEMPLATE_AUTO_RELOAD: bool = Field(
+        default=True,
+        env='TEMPLATE_AUTO_RELOAD',
+        description='Перечитывать измененные файлы шаблонов (в production выключить)',
+    )
+    TEMPLATE_CACHE_DIR: str = Field(
+        default='',
+        env='TEMPLATE_CACHE_DIR',
+        description='Каталог байт-кода шаблонов, общий для воркеров (пусто - без кэша)',
+    )
+    TEMPLATE_PRECOMPILE: bool = Field(
+        default=False, env='TEMPLATE_PRECOMPILE', description='Компилировать все шаблоны при старте воркера'
+    )
+
     # --- URL для БД ---
     @property
     def DATABASE_URL_ASYNC(self) -> str:
         return f'postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}'
 
+    @property
+    def DATABASE_REPLICA_URLS(self) -> list[str]:
+        return [url.strip() for url in self.POSTGRES_REPLICA_URLS.split(',') if url.strip()]
+
     @property
     def DATABASE_URL_SYNC(self) -> str:
         return f'postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}'
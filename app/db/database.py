@@ -5,23 +5,38 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
 
 from app.config import settings
+from app.db.pool import engine_options, worker_pool_config
+from app.db.replicas import ReplicaRouter
+from app.db.slow_query_log import slow_query_log
+from app.metrics import InstrumentedPool, instrument_engine
 
 
 class Base(DeclarativeBase):
     pass
 
 
+# Пул воркера: из DB_POOL_SIZE/DB_MAX_OVERFLOW или из общего бюджета DB_MAX_CONNECTIONS
+pool_config = worker_pool_config(
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    timeout=settings.DB_POOL_TIMEOUT,
+    recycle=settings.DB_POOL_RECYCLE,
+    total_budget=settings.DB_MAX_CONNECTIONS,
+    workers=settings.WEB_CONCURRENCY,
+    reserved=settings.INGESTION_WORKERS,
+)
+_engine_options = engine_options(pool_config, settings.DB_CONNECT_TIMEOUT, pgbouncer=settings.DB_PGBOUNCER)
+
 # Создание асинхронного движка SQLAlchemy
 async_engine = create_async_engine(
     settings.DATABASE_URL_ASYNC,
     echo=False,
     future=True,
-    pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=10,
-    pool_timeout=10,
-    connect_args={'timeout': 10},
+    poolclass=InstrumentedPool,
+    **_engine_options,
 )
+instrument_engine(async_engine)
+slow_query_log.install(async_engine)
 
 # Создание фабрики сессий
 # sessionmaker теперь возвращает фабрику AsyncSession
@@ -33,6 +48,15 @@ AsyncSessionFactory = sessionmaker(
     autocommit=False,
 )
 
+# Реплики только для чтения (POSTGRES_REPLICA_URLS); сессии выдает get_read_db
+replica_engines = [
+    create_async_engine(url, poolclass=InstrumentedPool, **_engine_options) for url in settings.DATABASE_REPLICA_URLS
+]
+for number, replica_engine in enumerate(replica_engines):
+    instrument_engine(replica_engine, f'replica{number}')
+    slow_query_log.install(replica_engine)
+replica_router = ReplicaRouter(replica_engines, settings.REPLICA_STICKY_SECONDS)
+
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
@@ -0,0 +1,114 @@
+# app/db/instrumentation.py
+"""
+Учет SQL-запросов в пределах HTTP-запроса или участка кода: число запросов,
+суммарное время в БД, самые медленные запросы, повторы одинакового SQL
+(типичный признак N+1) и попадания в кэш компиляции SQLAlchemy.
+
+Слушатели висят на классе Engine и видят все движки, включая тестовые;
+вне track_queries() они ничего не считают.
+"""
+import heapq
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.interfaces import CacheStats
+
+# Управление транзакцией (в тестах - SAVEPOINT на каждый commit) не считается запросом
+TRANSACTION_STATEMENTS = ('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT')
+SLOWEST_LIMIT = 5
+
+_current_stats: ContextVar['QueryStats | None'] = ContextVar('query_stats', default=None)
+
+
+@dataclass
+class QueryStats:
+    """Статистика SQL-запросов; вложенный учет пишет и в родительский."""
+
+    slowest_limit: int = SLOWEST_LIMIT
+    parent: 'QueryStats | None' = None
+    # Чьи это запросы, например 'GET /assets-list'
+    label: str | None = None
+    count: int = 0
+    total_ms: float = 0.0
+    # Запросы, SQL которых взят из кэша компиляции движка
+    cache_hits: int = 0
+    statements: Counter[str] = field(default_factory=Counter)
+    # Min-куча (мс, SQL) из slowest_limit самых долгих запросов
+    _slowest: list[tuple[float, str]] = field(default_factory=list, repr=False)
+
+    def record(self, statement: str, duration_ms: float, cache_hit: bool = False) -> None:
+        stats = self
+        while stats is not None:
+            stats._add(statement, duration_ms, cache_hit)
+            stats = stats.parent
+
+    def _add(self, statement: str, duration_ms: float, cache_hit: bool) -> None:
+        self.count += 1
+        self.total_ms += duration_ms
+        self.cache_hits += cache_hit
+        self.statements[statement] += 1
+        if len(self._slowest) < self.slowest_limit:
+            heapq.heappush(self._slowest, (duration_ms, statement))
+        elif self._slowest and duration_ms > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, (duration_ms, statement))
+
+    @property
+    def slowest(self) -> list[tuple[float, str]]:
+        """Самые медленные запросы, от долгого к быстрому."""
+        return sorted(self._slowest, reverse=True)
+
+    @property
+    def cache_hit_ratio(self) -> float:
+        return self.cache_hits / self.count if self.count else 0.0
+
+    def repeated(self, min_count: int = 2) -> dict[str, int]:
+        """Одинаковый SQL, выполненный не меньше min_count раз."""
+        return {statement: count for statement, count in self.statements.items() if count >= min_count}
+
+    def server_timing(self) -> str:
+        """Значение заголовка Server-Timing (видно во вкладке Network браузера)."""
+        return f'db;dur={self.total_ms:.1f};desc="{self.count} SQL"'
+
+
+@contextmanager
+def track_queries(slowest_limit: int = SLOWEST_LIMIT, label: str | None = None) -> Iterator[QueryStats]:
+    """with track_queries() as stats: ... - учет запросов внутри блока (и порожденных им задач)."""
+    stats = QueryStats(slowest_limit=slowest_limit, parent=_current_stats.get(), label=label)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def current_label() -> str | None:
+    """Метка ближайшего track_queries() с меткой (HTTP-запрос) или None."""
+    stats = _current_stats.get()
+    while stats is not None:
+        if stats.label:
+            return stats.label
+        stats = stats.parent
+    return None
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _current_stats.get() is not None:
+        # Запросы одного соединения выполняются последовательно
+        conn.info['query_started'] = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = _current_stats.get()
+    started = conn.info.pop('query_started', None)
+    if stats is None or started is None or statement.startswith(TRANSACTION_STATEMENTS):
+        return
+    cache_hit = context is not None and context.cache_hit is CacheStats.CACHE_HIT
+    stats.record(statement, (time.perf_counter() - started) * 1000, cache_hit)
@@ -0,0 +1,120 @@
+# app/db/pool.py
+"""
+Параметры пула соединений и движков SQLAlchemy.
+
+Без DB_MAX_CONNECTIONS каждый воркер получает пул DB_POOL_SIZE + DB_MAX_OVERFLOW.
+С ним общий бюджет соединений с одной базой делится между WEB_CONCURRENCY
+воркерами: воркер держит до DB_POOL_SIZE постоянных соединений, остаток его
+доли уходит в overflow. Бюджет считается для каждой базы отдельно (основная
+и каждая реплика).
+
+В режиме DB_PGBOUNCER (PgBouncer с pool_mode=transaction) подготовленные
+выражения не переживают транзакцию: кэши выражений asyncpg и SQLAlchemy
+выключаются, а имена выражений делаются уникальными.
+"""
+import logging
+from dataclasses import dataclass
+from typing import Any
+from uuid import uuid4
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PoolConfig:
+    """Пул одного движка в одном воркере."""
+
+    pool_size: int
+    max_overflow: int
+    timeout: float
+    recycle: int
+
+    @property
+    def max_connections(self) -> int:
+        return self.pool_size + self.max_overflow
+
+
+def worker_pool_config(
+    pool_size: int,
+    max_overflow: int,
+    timeout: float,
+    recycle: int,
+    total_budget: int = 0,
+    workers: int = 1,
+    reserved: int = 0,
+) -> PoolConfig:
+    """
+    Пул воркера с учетом общего бюджета соединений.
+
+    Args:
+        total_budget: Соединений с базой на все воркеры (0 - без бюджета).
+        workers: Число воркеров (WEB_CONCURRENCY).
+        reserved: Соединения воркера, постоянно занятые фоновыми задачами
+            (обработчики очереди отчетов); пул под HTTP-запросы должен быть больше.
+    """
+    if total_budget > 0:
+        per_worker = total_budget // workers
+        if per_worker < 1:
+            raise ValueError(
+                f'DB_MAX_CONNECTIONS={total_budget} не хватает на {workers} воркеров: нужно хотя бы по одному'
+            )
+        pool_size = min(pool_size, per_worker)
+        max_overflow = per_worker - pool_size
+    config = PoolConfig(pool_size=pool_size, max_overflow=max_overflow, timeout=timeout, recycle=recycle)
+    if config.max_connections <= reserved:
+        logger.warning(
+            f'Пул воркера ({config.max_connections} соединений) не больше числа обработчиков очереди '
+            f'({reserved}): HTTP-запросы будут ждать соединения до {timeout} с'
+        )
+    return config
+
+
+def engine_options(config: PoolConfig, connect_timeout: float, pgbouncer: bool = False) -> dict[str, Any]:
+    """Аргументы create_async_engine для пула config."""
+    connect_args: dict[str, Any] = {'timeout': connect_timeout}
+    if pgbouncer:
+        # Кэш asyncpg и кэш диалекта SQLAlchemy; уникальные имена - чтобы
+        # не столкнуться с выражением другого клиента на том же соединении сервера
+        connect_args.update(
+            statement_cache_size=0,
+            prepared_statement_cache_size=0,
+            prepared_statement_name_func=lambda: f'__asyncpg_{uuid4()}__',
+        )
+    return {
+        'pool_pre_ping': True,
+        'pool_size': config.pool_size,
+        'max_overflow': config.max_overflow,
+        'pool_timeout': config.timeout,
+        'pool_recycle': config.recycle,
+        'connect_args': connect_args,
+    }
+
+
+async def server_connection_limit(engine: AsyncEngine) -> int:
+    """Соединения, доступные приложению на сервере: max_connections без резерва суперпользователя."""
+    async with engine.connect() as conn:
+        max_connections = int((await conn.execute(text('SHOW max_connections'))).scalar_one())
+        reserved = int((await conn.execute(text('SHOW superuser_reserved_connections'))).scalar_one())
+    return max_connections - reserved
+
+
+async def check_connection_budget(engine: AsyncEngine, config: PoolConfig, workers: int) -> int | None:
+    """
+    Сравнивает пулы всех воркеров с лимитом сервера и предупреждает о превышении.
+    Returns: лимит сервера или None, если его не удалось узнать.
+    """
+    try:
+        limit = await server_connection_limit(engine)
+    except Exception as e:
+        logger.warning(f'Не удалось узнать max_connections: {e}')
+        return None
+    demand = config.max_connections * workers
+    if demand > limit:
+        logger.warning(
+            f'Пулы {workers} воркеров открывают до {demand} соединений при лимите сервера {limit}: '
+            f'задайте DB_MAX_CONNECTIONS не больше {limit} (с запасом на миграции и админ-доступ)'
+        )
+    return limit
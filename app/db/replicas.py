@@ -0,0 +1,51 @@
+# app/db/replicas.py
+"""
+Маршрутизация чтения на реплики.
+
+GET-обработчики списков, выгрузок, аналитики и журнала аудита получают сессию
+реплики (get_read_db), реплики выбираются по кругу. После успешного изменяющего
+запроса клиент получает cookie: пока она не истекла, его чтения идут в основную
+базу и он видит собственные изменения, даже если реплика отстает.
+"""
+import itertools
+import time
+from collections.abc import Mapping, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+STICKY_COOKIE = 'db_primary_until'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class ReplicaRouter:
+    """Выбор реплики для чтения и окно read-your-writes после изменений."""
+
+    def __init__(self, engines: Sequence[AsyncEngine], sticky_seconds: int):
+        self.sticky_seconds = sticky_seconds
+        self._factories = [
+            async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+            for engine in engines
+        ]
+        self._next_factory = itertools.cycle(self._factories)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._factories)
+
+    def use_replica(self, method: str, cookies: Mapping[str, str]) -> bool:
+        """Читать ли запросу с реплики: только безопасные методы вне окна после записи."""
+        if not self._factories or method not in SAFE_METHODS:
+            return False
+        try:
+            primary_until = int(cookies.get(STICKY_COOKIE, 0))
+        except ValueError:
+            primary_until = 0
+        return primary_until <= time.time()
+
+    def session(self) -> AsyncSession:
+        """Сессия следующей по кругу реплики."""
+        return next(self._next_factory)()
+
+    def sticky_cookie(self) -> tuple[str, str]:
+        """Имя и значение cookie, закрепляющей чтения клиента за основной базой."""
+        return STICKY_COOKIE, str(int(time.time()) + self.sticky_seconds)
@@ -0,0 +1,177 @@
+# Path: app/db/repositories/hardware_repo.py
+"""
+Репозиторий запросов к аппаратной конфигурации всего парка.
+
+Читает плоскую read-модель component_flat: конфигурация всех устройств
+агрегируется одной группировкой по asset_id (агрегаты с FILTER по типу),
+затем присоединяется к devices. Фильтры и постраничность применяются
+в том же запросе - выборка по всему парку выполняется одним SQL.
+"""
+from typing import Literal
+
+from sqlalchemy import Select, false, func, literal, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.component import ComponentFlat
+from app.models.device import Device
+from app.schemas.hardware import (
+    DeviceHardwareDTO,
+    DeviceHardwarePage,
+    HardwareCensusDTO,
+    HardwareFilter,
+)
+
+# Метки накопителей (ComponentStorage.type_label)
+SOLID_STATE_LABELS = ('SSD', 'NVMe')
+HDD_LABEL = 'HDD'
+
+CensusKind = Literal['cpu', 'storage', 'ram']
+
+
+class SqlAlchemyHardwareRepository:
+    """Репозиторий аппаратных выборок и переписей с SQL-агрегацией."""
+
+    def __init__(self, session: AsyncSession):
+        self._session = session
+
+    @staticmethod
+    def _aggregate():
+        """Подзапрос с агрегированной конфигурацией каждого устройства."""
+        flat = ComponentFlat
+        is_ram = flat.component_type == 'ram'
+        is_storage = flat.component_type == 'storage'
+        is_cpu = flat.component_type == 'cpu'
+        return (
+            select(
+                flat.asset_id,
+                func.sum(flat.size_mb).filter(is_ram).label('ram_total_mb'),
+                func.count().filter(is_ram).label('ram_modules'),
+                func.sum(flat.capacity_gb).filter(is_storage).label('storage_total_gb'),
+                func.bool_or(flat.type_label.in_(SOLID_STATE_LABELS)).filter(is_storage).label('has_ssd'),
+                func.bool_or(flat.type_label == HDD_LABEL).filter(is_storage).label('has_hdd'),
+                func.min(flat.name).filter(is_cpu).label('cpu_name'),
+                func.sum(flat.cores).filter(is_cpu).label('cpu_cores'),
+                func.count().filter(flat.component_type == 'gpu').label('gpu_count'),
+            )
+            .group_by(flat.asset_id)
+            .subquery('hw_agg')
+        )
+
+    def _device_hardware_query(self, filters: HardwareFilter) -> Select:
+        """SELECT устройств с агрегированной конфигурацией и применёнными фильтрами."""
+        agg = self._aggregate()
+
+        ram_total_mb = func.coalesce(agg.c.ram_total_mb, 0)
+        storage_total_gb = func.coalesce(agg.c.storage_total_gb, 0)
+        has_ssd = func.coalesce(agg.c.has_ssd, false())
+        has_hdd = func.coalesce(agg.c.has_hdd, false())
+        cpu_cores = func.coalesce(agg.c.cpu_cores, 0)
+        gpu_count = func.coalesce(agg.c.gpu_count, 0)
+
+        stmt = select(
+            Device.id,
+            Device.name,
+            Device.inventory_number,
+            ram_total_mb.label('ram_total_mb'),
+            func.coalesce(agg.c.ram_modules, 0).label('ram_modules'),
+            storage_total_gb.label('storage_total_gb'),
+            has_ssd.label('has_ssd'),
+            has_hdd.label('has_hdd'),
+            agg.c.cpu_name,
+            cpu_cores.label('cpu_cores'),
+            gpu_count.label('gpu_count'),
+        ).outerjoin(agg, agg.c.asset_id == Device.id)
+
+        if filters.ram_mb_lt is not None:
+            stmt = stmt.where(ram_total_mb < filters.ram_mb_lt)
+        if filters.ram_mb_gte is not None:
+            stmt = stmt.where(ram_total_mb >= filters.ram_mb_gte)
+        if filters.storage_gb_lt is not None:
+            stmt = stmt.where(storage_total_gb < filters.storage_gb_lt)
+        if filters.has_ssd is not None:
+            stmt = stmt.where(has_ssd.is_(true() if filters.has_ssd else false()))
+        if filters.has_hdd is not None:
+            stmt = stmt.where(has_hdd.is_(true() if filters.has_hdd else false()))
+        if filters.hdd_only:
+            stmt = stmt.where(has_hdd.is_(true()), has_ssd.is_(false()))
+        if filters.cpu_name:
+            stmt = stmt.where(agg.c.cpu_name.ilike(f'%{filters.cpu_name}%'))
+        if filters.cores_lt is not None:
+            stmt = stmt.where(cpu_cores < filters.cores_lt)
+        if filters.has_gpu is not None:
+            stmt = stmt.where(gpu_count > 0 if filters.has_gpu else gpu_count == 0)
+
+        for field in ('asset_type_id', 'status_id', 'department_id', 'location_id'):
+            value = getattr(filters, field)
+            if value is not None:
+                stmt = stmt.where(getattr(Device, field) == value)
+        return stmt
+
+    async def find_devices(
+        self, filters: HardwareFilter, limit: int = 100, offset: int = 0
+    ) -> DeviceHardwarePage:
+        """
+        Устройства, подходящие под фильтр, с агрегированной конфигурацией.
+        Страница и общее число строк возвращаются одним запросом (COUNT(*) OVER());
+        для пустой страницы за последней строкой число считается отдельно.
+        """
+        base = self._device_hardware_query(filters).subquery('hw')
+        stmt = (
+            select(base, func.count().over().label('total'))
+            .order_by(base.c.id)
+            .limit(limit)
+            .offset(offset)
+        )
+        rows = (await self._session.execute(stmt)).mappings().all()
+        if rows:
+            total = rows[0]['total']
+        elif offset > 0:
+            total = await self._session.scalar(select(func.count()).select_from(base))
+        else:
+            total = 0
+        return DeviceHardwarePage(
+            items=[DeviceHardwareDTO.model_validate(dict(row)) for row in rows],
+            total=total,
+        )
+
+    async def census(
+        self, kind: CensusKind, filters: HardwareFilter | None = None
+    ) -> list[HardwareCensusDTO]:
+        """
+        Перепись парка: модели CPU, типы накопителей или суммарный объём RAM
+        с числом устройств на каждое значение.
+        """
+        filtered_ids = None
+        if filters is not None and filters.model_dump(exclude_defaults=True):
+            filtered_ids = self._device_hardware_query(filters).with_only_columns(Device.id)
+
+        if kind == 'ram':
+            ram_total_mb = (
+                select(ComponentFlat.asset_id, func.sum(ComponentFlat.size_mb).label('total'))
+                .where(ComponentFlat.component_type == 'ram')
+                .group_by(ComponentFlat.asset_id)
+                .subquery('ram_total')
+            )
+            label = func.concat(ram_total_mb.c.total // 1024, literal(' GB'))
+            asset_id = ram_total_mb.c.asset_id
+            stmt = (
+                select(label.label('label'), func.count().label('devices'))
+                .group_by(ram_total_mb.c.total)
+                .order_by(ram_total_mb.c.total)
+            )
+        else:
+            label = ComponentFlat.name if kind == 'cpu' else ComponentFlat.type_label
+            asset_id = ComponentFlat.asset_id
+            devices = func.count(asset_id.distinct())
+            stmt = (
+                select(label.label('label'), devices.label('devices'))
+                .where(ComponentFlat.component_type == kind)
+                .group_by(label)
+                .order_by(devices.desc(), label)
+            )
+
+        if filtered_ids is not None:
+            stmt = stmt.where(asset_id.in_(filtered_ids))
+
+        rows = (await self._session.execute(stmt)).all()
+        return [HardwareCensusDTO(label=str(row.label), devices=row.devices) for row in rows]
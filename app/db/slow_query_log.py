@@ -0,0 +1,153 @@
+# app/db/slow_query_log.py
+"""
+Журнал медленных SQL-запросов.
+
+Запросы дольше порога попадают в кольцевой буфер процесса: SQL, параметры
+(строки скрыты - в них бывают email, токены, содержимое отчетов), время
+и HTTP-запрос, из которого они выполнены. Для доли медленных SELECT план
+EXPLAIN (ANALYZE, BUFFERS) снимается повторным выполнением на отдельном
+соединении в READ ONLY транзакции, которая затем откатывается.
+
+Буфер у каждого воркера свой: страница администратора показывает запросы
+обслужившего её процесса.
+"""
+import asyncio
+import contextvars
+import logging
+import random
+import time
+from collections import deque
+from collections.abc import Sequence
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import settings
+from app.db.instrumentation import TRANSACTION_STATEMENTS, current_label
+
+logger = logging.getLogger(__name__)
+
+REDACTED = '***'
+# Повторное выполнение ради плана не должно само стать долгой нагрузкой
+EXPLAIN_TIMEOUT_MS = 10_000
+EXPLAIN_PREFIXES = ('SELECT', 'WITH')
+
+# Запросы самого EXPLAIN в журнал не попадают
+_explaining: contextvars.ContextVar[bool] = contextvars.ContextVar('slow_query_explaining', default=False)
+
+
+def redact_parameters(parameters: Any) -> Any:
+    """Оставляет числа, даты и NULL (они нужны для разбора плана), скрывает строки и байты."""
+    if isinstance(parameters, dict):
+        return {key: redact_parameters(value) for key, value in parameters.items()}
+    if isinstance(parameters, list | tuple):
+        return [redact_parameters(value) for value in parameters]
+    if parameters is None or isinstance(parameters, bool | int | float):
+        return parameters
+    if isinstance(parameters, str | bytes):
+        return REDACTED
+    # Даты, Decimal, UUID - как строка
+    return str(parameters)
+
+
+@dataclass
+class SlowQuery:
+    id: int
+    recorded_at: datetime
+    duration_ms: float
+    statement: str
+    parameters: Any
+    source: str | None = None
+    plan: str | None = None
+    plan_error: str | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        data['recorded_at'] = self.recorded_at.isoformat()
+        return data
+
+
+class SlowQueryLog:
+    """Кольцевой буфер медленных запросов и слушатели движка, которые его заполняют."""
+
+    def __init__(self, threshold_ms: float, size: int, explain_sample: float = 0.0):
+        self.threshold_ms = threshold_ms
+        self.explain_sample = explain_sample
+        self._entries: deque[SlowQuery] = deque(maxlen=size)
+        self._next_id = 1
+        # Одновременно снимается не больше одного плана
+        self._explain_task: asyncio.Task | None = None
+
+    def install(self, engine: AsyncEngine) -> None:
+        """Подписывается на запросы движка; порог <= 0 выключает журнал."""
+        if self.threshold_ms <= 0:
+            return
+        sync_engine = engine.sync_engine
+
+        @event.listens_for(sync_engine, 'before_cursor_execute')
+        def _before(conn, cursor, statement, parameters, context, executemany) -> None:
+            conn.info['slow_query_started'] = time.perf_counter()
+
+        @event.listens_for(sync_engine, 'after_cursor_execute')
+        def _after(conn, cursor, statement, parameters, context, executemany) -> None:
+            started = conn.info.pop('slow_query_started', None)
+            if started is None or _explaining.get():
+                return
+            duration_ms = (time.perf_counter() - started) * 1000
+            if duration_ms >= self.threshold_ms and not statement.startswith(TRANSACTION_STATEMENTS):
+                entry = self.record(statement, parameters, duration_ms)
+                if not executemany and self._should_explain(statement):
+                    # Пустой контекст: запросы EXPLAIN не относятся к текущему HTTP-запросу
+                    self._explain_task = asyncio.get_running_loop().create_task(
+                        self._explain(engine, entry, statement, parameters), context=contextvars.Context()
+                    )
+
+    def record(self, statement: str, parameters: Any, duration_ms: float) -> SlowQuery:
+        entry = SlowQuery(
+            id=self._next_id,
+            recorded_at=datetime.now(UTC),
+            duration_ms=round(duration_ms, 1),
+            statement=statement,
+            parameters=redact_parameters(parameters),
+            source=current_label(),
+        )
+        self._next_id += 1
+        self._entries.append(entry)
+        logger.warning(f'Медленный запрос {entry.duration_ms} мс ({entry.source or "вне HTTP"}): {statement[:200]}')
+        return entry
+
+    def entries(self) -> list[SlowQuery]:
+        """Записи от новых к старым."""
+        return list(reversed(self._entries))
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def _should_explain(self, statement: str) -> bool:
+        if self.explain_sample <= 0 or (self._explain_task is not None and not self._explain_task.done()):
+            return False
+        return statement.lstrip().upper().startswith(EXPLAIN_PREFIXES) and random.random() < self.explain_sample
+
+    async def _explain(self, engine: AsyncEngine, entry: SlowQuery, statement: str, parameters: Sequence) -> None:
+        _explaining.set(True)
+        try:
+            async with engine.connect() as conn:
+                # Транзакция откатывается при выходе из блока: даже при ANALYZE ничего не меняется
+                await conn.exec_driver_sql('SET TRANSACTION READ ONLY')
+                await conn.exec_driver_sql(f'SET LOCAL statement_timeout = {EXPLAIN_TIMEOUT_MS}')
+                result = await conn.exec_driver_sql(
+                    f'EXPLAIN (ANALYZE, BUFFERS) {statement}', tuple(parameters or ())
+                )
+                entry.plan = '\n'.join(row[0] for row in result)
+        except Exception as e:
+            entry.plan_error = str(e).splitlines()[0]
+
+
+slow_query_log = SlowQueryLog(
+    threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+    size=settings.SLOW_QUERY_LOG_SIZE,
+    explain_sample=settings.SLOW_QUERY_EXPLAIN_SAMPLE,
+)
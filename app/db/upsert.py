@@ -0,0 +1,247 @@
+# app/db/upsert.py
+"""
+Конкурентно-безопасные get-or-create операции на базе
+`INSERT ... ON CONFLICT DO NOTHING RETURNING`.
+
+Вместо цепочки SELECT -> INSERT -> flush каждый промах кэша выполняется
+одним запросом: data-modifying CTE пытается вставить строку, а UNION ALL
+возвращает уже существующую, если вставка упёрлась в уникальный индекс.
+Параллельные импорты одной и той же модели больше не падают
+на нарушениях уникальности.
+
+Найденные значения кэшируются в памяти процесса (read-through кэш).
+Значения, полученные внутри транзакции, попадают в общий кэш только после
+успешного COMMIT, а при ROLLBACK отбрасываются, поэтому кэш никогда
+не ссылается на откатившиеся строки.
+
+Запись кэша помечается версией таблицы из dictionary_versions (её повышает
+триггер при любом изменении справочника, в том числе из другого воркера).
+Версии читаются одним запросом на транзакцию до первого обращения к общему
+кэшу; запись с другой версией считается промахом. TTL остаётся страховкой
+для таблиц без версии.
+"""
+
+import time
+from collections.abc import Mapping, Sequence
+from typing import Any
+
+from sqlalchemy import and_, event, func, literal_column, or_, select, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db.database import Base
+from app.metrics import cache_hit
+from app.models.dictionary_version import DictionaryVersion
+
+# Ключ для отложенных (ещё не закоммиченных) значений в Session.info
+_PENDING_KEY = '_upsert_pending'
+# Ключ для версий справочников, прочитанных в текущей транзакции
+_VERSIONS_KEY = '_upsert_versions'
+
+# Время жизни записи кэша. Ограничивает "устаревание" между воркерами
+# для таблиц, изменения которых не отражаются в dictionary_versions.
+DEFAULT_TTL_SECONDS = 300.0
+
+CacheKey = tuple[str, tuple[tuple[str, Any], ...], tuple[str, ...]]
+
+
+class ResolvedIdCache:
+    """Кэш разрешённых идентификаторов справочников в пределах процесса."""
+
+    def __init__(self, ttl: float = DEFAULT_TTL_SECONDS):
+        self.ttl = ttl
+        self._data: dict[CacheKey, tuple[float, int | None, tuple]] = {}
+        self._watched: set[type] = set()
+
+    def get(self, key: CacheKey, version: int | None = None) -> tuple | None:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        stored_at, stored_version, value = entry
+        if stored_version != version or time.monotonic() - stored_at > self.ttl:
+            self._data.pop(key, None)
+            return None
+        return value
+
+    def put(self, key: CacheKey, value: tuple, version: int | None = None) -> None:
+        self._data[key] = (time.monotonic(), version, value)
+
+    def invalidate(self, table_name: str | None = None) -> None:
+        """Сбрасывает кэш целиком или только для одной таблицы."""
+        if table_name is None:
+            self._data.clear()
+            return
+        for key in [k for k in self._data if k[0] == table_name]:
+            del self._data[key]
+
+    def watch(self, model: type[Base]) -> None:
+        """Подписывается на ORM-удаление записей модели для инвалидации."""
+        if model in self._watched:
+            return
+        table_name = model.__tablename__
+
+        @event.listens_for(model, 'after_delete')
+        def _on_delete(mapper, connection, target) -> None:
+            self.invalidate(table_name)
+
+        self._watched.add(model)
+
+
+resolved_id_cache = ResolvedIdCache()
+
+
+@event.listens_for(Session, 'after_commit')
+def _promote_pending(session: Session) -> None:
+    versions = session.info.pop(_VERSIONS_KEY, None) or {}
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        # Версия - из снимка, прочитанного до разрешения значений: изменение
+        # справочника, зафиксированное позже, даст промах, а не устаревший id
+        for key, value in pending.items():
+            resolved_id_cache.put(key, value, versions.get(key[0]))
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+    session.info.pop(_VERSIONS_KEY, None)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_pending_savepoint(session: Session, previous_transaction) -> None:
+    # Откат SAVEPOINT (например, одного задания в пакете очереди) не вызывает
+    # after_rollback, но строки, созданные внутри него, тоже исчезли
+    if previous_transaction.nested:
+        session.info.pop(_PENDING_KEY, None)
+
+
+def _cache_key(
+    model: type[Base], lookup: Mapping[str, Any], columns: Sequence[str]
+) -> CacheKey:
+    return (model.__tablename__, tuple(sorted(lookup.items())), tuple(columns))
+
+
+async def _dictionary_versions(session: AsyncSession) -> dict[str, int]:
+    """Версии справочников, прочитанные один раз за транзакцию."""
+    versions = session.info.get(_VERSIONS_KEY)
+    if versions is None:
+        stmt = select(DictionaryVersion.name, DictionaryVersion.version)
+        versions = dict((await session.execute(stmt)).tuples().all())
+        session.info[_VERSIONS_KEY] = versions
+    return versions
+
+
+async def get_or_create(
+    session: AsyncSession,
+    model: type[Base],
+    lookup: Mapping[str, Any],
+    defaults: Mapping[str, Any] | None = None,
+    columns: Sequence[str] = ('id',),
+) -> tuple | None:
+    """
+    Возвращает значения `columns` строки, найденной по `lookup`,
+    создавая её при отсутствии.
+
+    Args:
+        session: Сессия БД (транзакцией управляет вызывающий код)
+        model: ORM-модель справочника
+        lookup: Поля, однозначно определяющие запись (уникальный ключ)
+        defaults: Дополнительные поля, используемые только при вставке
+        columns: Какие колонки вернуть
+
+    Returns:
+        Кортеж значений `columns` или None, если вставка конфликтует
+        по другому уникальному ограничению, а запись по `lookup` не найдена.
+    """
+    key = _cache_key(model, lookup, columns)
+    pending: dict = session.info.setdefault(_PENDING_KEY, {})
+    cached = pending.get(key)
+    if cached is None:
+        versions = await _dictionary_versions(session)
+        cached = resolved_id_cache.get(key, versions.get(key[0]))
+    cache_hit('resolved_ids', cached is not None)
+    if cached is not None:
+        return cached
+
+    table = model.__table__
+    returning = [table.c[name] for name in columns]
+    condition = and_(*(table.c[name] == value for name, value in lookup.items()))
+
+    inserted = (
+        pg_insert(table)
+        .values({**(defaults or {}), **lookup})
+        .on_conflict_do_nothing()
+        .returning(*returning)
+        .cte('inserted')
+    )
+    stmt = union_all(
+        select(*(inserted.c[name] for name in columns)),
+        select(*returning).where(condition),
+    ).limit(1)
+    row = (await session.execute(stmt)).first()
+
+    if row is None:
+        # Конфликт со строкой, закоммиченной параллельной транзакцией уже после
+        # снимка нашего запроса: перечитываем с новым снимком.
+        row = (await session.execute(select(*returning).where(condition))).first()
+        if row is None:
+            return None
+
+    value = tuple(row)
+    resolved_id_cache.watch(model)
+    pending[key] = value
+    return value
+
+
+async def get_or_create_id(
+    session: AsyncSession,
+    model: type[Base],
+    lookup: Mapping[str, Any],
+    defaults: Mapping[str, Any] | None = None,
+) -> int | None:
+    """Упрощённая форма `get_or_create`, возвращающая только первичный ключ."""
+    row = await get_or_create(session, model, lookup, defaults)
+    return row[0] if row else None
+
+
+async def bulk_upsert(
+    session: AsyncSession,
+    model: type[Base],
+    rows: Sequence[Mapping[str, Any]],
+    index_elements: Sequence[str],
+    update_columns: Sequence[str],
+) -> tuple[int, int]:
+    """
+    Вставляет или обновляет набор строк одним запросом
+    `INSERT ... ON CONFLICT (index_elements) DO UPDATE`.
+
+    Обновляются только строки, у которых реально изменилось хотя бы одно
+    из `update_columns`; пустые (NULL) значения не затирают существующие.
+
+    Returns:
+        Кортеж (количество вставленных, количество обновлённых строк).
+    """
+    if not rows:
+        return 0, 0
+
+    table = model.__table__
+    stmt = pg_insert(table).values([dict(row) for row in rows])
+    new_values = {
+        name: func.coalesce(stmt.excluded[name], table.c[name])
+        for name in update_columns
+    }
+    changed = or_(
+        *(table.c[name].is_distinct_from(value) for name, value in new_values.items())
+    )
+    if 'updated_at' in table.c:
+        new_values['updated_at'] = func.timezone('utc', func.now())
+
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(index_elements), set_=new_values, where=changed
+    ).returning(literal_column('xmax = 0').label('inserted'))
+
+    flags = (await session.execute(stmt)).scalars().all()
+    inserted = sum(1 for flag in flags if flag)
+    resolved_id_cache.invalidate(table.name)
+    return inserted, len(flags) - inserted
@@ -0,0 +1,89 @@
+# app/fragment_cache.py
+"""
+Кэш фрагментов шаблонов, зависящих от справочников.
+
+    {% filter mark_selected(filters.employee_id) %}
+    {% cache 'employees' %}{% for item in employees %}<option value="{{ item.id }}">...{% endfor %}{% endcache %}
+    {% endfilter %}
+
+Блок {% cache %} рендерится один раз на версию перечисленных справочников
+(имена таблиц) и дальше берется из памяти процесса. Версии читаются из
+dictionary_versions (их повышает триггер при любом изменении таблицы) вместе
+со справочниками формы (DeviceService.get_all_dictionaries_for_form) и приходят
+в шаблон переменной dictionary_versions; без нее блок рендерится как обычно.
+Внутри блока не должно быть данных запроса: выбранное значение отмечается
+фильтром mark_selected уже на готовой разметке.
+"""
+import threading
+from collections.abc import Mapping
+from typing import ClassVar
+from uuid import uuid4
+
+from jinja2 import nodes
+from jinja2.ext import Extension
+from jinja2.parser import Parser
+from markupsafe import Markup, escape
+
+from app.metrics import cache_hit
+
+
+class FragmentCache:
+    """Последняя отрендеренная версия каждого фрагмента."""
+
+    def __init__(self):
+        self._data: dict[str, tuple[tuple[int, ...], Markup]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str, version: tuple[int, ...]) -> Markup | None:
+        entry = self._data.get(key)
+        if entry is None or entry[0] != version:
+            return None
+        return entry[1]
+
+    def put(self, key: str, version: tuple[int, ...], markup: Markup) -> None:
+        # Фрагмент прошлой версии вытесняется: размер кэша - число блоков в шаблонах
+        with self._lock:
+            self._data[key] = (version, markup)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+fragment_cache = FragmentCache()
+
+
+class FragmentCacheExtension(Extension):
+    """Тег {% cache 'table', ... %}...{% endcache %}."""
+
+    tags: ClassVar[set[str]] = {'cache'}
+
+    def parse(self, parser: Parser) -> nodes.Node:
+        lineno = next(parser.stream).lineno
+        tables = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            tables.append(parser.parse_expression())
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        # Ключ уникален для каждой компиляции: после правки шаблона старая разметка не подхватится
+        key = nodes.Const(f'{parser.name}:{lineno}:{uuid4().hex}')
+        call = self.call_method('_render', [key, nodes.List(tables), nodes.Name('dictionary_versions', 'load')])
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _render(self, key: str, tables: list[str], versions, caller) -> Markup:
+        if not isinstance(versions, Mapping):
+            return caller()
+        version = tuple(versions.get(table, 0) for table in tables)
+        markup = fragment_cache.get(key, version)
+        cache_hit('template_fragments', markup is not None)
+        if markup is None:
+            markup = caller()
+            fragment_cache.put(key, version, markup)
+        return markup
+
+
+def mark_selected(markup: str, value) -> Markup:
+    """Отмечает selected у <option> со значением value в готовой разметке."""
+    if value is None or value == '':
+        return Markup(markup)
+    option = f'<option value="{escape(value)}"'
+    return Markup(str(markup).replace(option, f'{option} selected', 1))
@@ -3,8 +3,9 @@
 import logging
 import os
 import secrets
-
-import yaml
+import time
+from contextlib import asynccontextmanager
+from functools import cache
 
 # Условный импорт для разработки
 if os.getenv('APP_MODE') == 'dev':
@@ -38,24 +39,26 @@ from app.api.endpoints import (
     audit_logs,
     dictionaries,
     health,
+    metrics,
     tags,
 )
-from app.config import BASE_DIR
+from app.api.lazy import LazyRouter, include_lazy_routers
+from app.config import BASE_DIR, settings
+from app.db.database import async_engine, pool_config, replica_engines, replica_router
+from app.db.instrumentation import track_queries
+from app.db.pool import check_connection_budget
+from app.db.replicas import SAFE_METHODS
 from app.flash import flash
 from app.logging_config import EndpointFilter
+from app.metrics import DB_SERVER_CONNECTION_LIMIT, REQUEST_LATENCY, REQUESTS_IN_PROGRESS, route_label
+from app.services.ingestion_service import IngestionWorkerPool
+from app.templating import precompile_templates, templates
+from app.tracing import tracer
 
 # --- Custom Swagger UI for Assets API ---
 OPENAPI_ASSETS_SPEC_PATH = os.path.join(
     os.path.dirname(__file__), '..', 'openapi-assets.yaml'
 )
-try:
-    with open(OPENAPI_ASSETS_SPEC_PATH, encoding='utf-8') as f:
-        openapi_assets_spec = yaml.safe_load(f)
-except FileNotFoundError:
-    print(
-        f'Warning: {OPENAPI_ASSETS_SPEC_PATH} not found. Assets API docs will not be available.'
-    )
-    openapi_assets_spec = {}
 
 # --- Настройка логирования ---
 # Исключаем логи для эндпоинта /health
@@ -112,6 +115,7 @@ def _configure_routers(app: FastAPI):
     app.include_router(
         analytics.router, prefix='/api/analytics', tags=['analytics']
     )
+    app.include_router(metrics.router)
 
     from app.api.endpoints import auth, users, web_auth
     app.include_router(auth.router, tags=['login'])
@@ -119,6 +123,18 @@ def _configure_routers(app: FastAPI):
     app.include_router(web_auth.router)
 
 
+def _configure_lazy_routers(app: FastAPI):
+    # Роутеры агентов и инвентаризации импортируются при первом запросе к ним.
+    # Заглушки стоят последними: url_for доходит до них, только если имя
+    # не нашлось среди загруженных маршрутов
+    include_lazy_routers(app, [
+        # Первым: на статус задачи ссылается импорт активов через url_for
+        LazyRouter(app, 'app.api.endpoints.ingestion', '/ingestion', ['ingestion']),
+        LazyRouter(app, 'app.api.endpoints.hardware', '/api/hardware', ['hardware']),
+        LazyRouter(app, 'app.api.endpoints.agent', '/api/agent/v1', ['agent']),
+    ])
+
+
 def _configure_exception_handlers(app: FastAPI):
     @app.exception_handler(StarletteHTTPException)
     async def http_exception_handler(request: Request, exc: StarletteHTTPException):
@@ -150,6 +166,20 @@ def _configure_exception_handlers(app: FastAPI):
         return RedirectResponse(request.url_for('dashboard'), status_code=303)
 
 
+@cache
+def load_openapi_assets_spec() -> dict:
+    """Спецификация Assets API: YAML разбирается при первом открытии документации."""
+    import yaml
+
+    loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    try:
+        with open(OPENAPI_ASSETS_SPEC_PATH, encoding='utf-8') as f:
+            return yaml.load(f, Loader=loader)
+    except FileNotFoundError:
+        logger.warning(f'{OPENAPI_ASSETS_SPEC_PATH} not found. Assets API docs will not be available.')
+        return {}
+
+
 def _configure_swagger_ui(app: FastAPI):
     @app.get('/docs/assets', include_in_schema=False)
     async def custom_swagger_ui_assets(request: Request):
@@ -159,7 +189,7 @@ def _configure_swagger_ui(app: FastAPI):
 
     @app.get('/openapi-assets.json', include_in_schema=False)
     async def get_assets_openapi():
-        return openapi_assets_spec
+        return load_openapi_assets_spec()
 
 
 def _configure_auth_middleware(app: FastAPI):
@@ -171,7 +201,7 @@ def _configure_auth_middleware(app: FastAPI):
 
         public_paths = [
             '/login', '/register', '/logout', '/health', '/ready',
-            '/static', '/api', '/docs', '/openapi', '/users',
+            '/static', '/api', '/docs', '/openapi', '/users', '/metrics',
         ]
 
         # Check if path is public
@@ -187,6 +217,107 @@ def _configure_auth_middleware(app: FastAPI):
         return await call_next(request)
 
 
+def _configure_query_stats_middleware(app: FastAPI):
+    @app.middleware('http')
+    async def query_stats_middleware(request: Request, call_next):
+        """
+        SQL-запросы обработчика: request.state.query_stats и, если включено,
+        заголовок Server-Timing. Запросы во время отдачи StreamingResponse
+        в заголовок не попадают - он уже отправлен.
+        """
+        label = f'{request.method} {request.url.path}'
+        with track_queries(settings.SQL_SLOWEST_STATEMENTS, label=label) as stats:
+            request.state.query_stats = stats
+            response = await call_next(request)
+        if settings.SQL_SERVER_TIMING:
+            response.headers.append('Server-Timing', stats.server_timing())
+        return response
+
+
+def _configure_replica_middleware(app: FastAPI):
+    @app.middleware('http')
+    async def replica_stickiness_middleware(request: Request, call_next):
+        """После успешного изменения чтения клиента на время идут в основную базу (read-your-writes)."""
+        response = await call_next(request)
+        if replica_router.enabled and request.method not in SAFE_METHODS and response.status_code < 400:
+            name, value = replica_router.sticky_cookie()
+            response.set_cookie(
+                name, value, max_age=replica_router.sticky_seconds, httponly=True, samesite='lax'
+            )
+        return response
+
+
+def _configure_metrics_middleware(app: FastAPI):
+    @app.middleware('http')
+    async def metrics_middleware(request: Request, call_next):
+        """Латентность по шаблону маршрута (/edit/{device_id}) и запросы в обработке."""
+        in_progress = REQUESTS_IN_PROGRESS.labels(method=request.method)
+        in_progress.inc()
+        started = time.perf_counter()
+        status_code = 500
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            return response
+        finally:
+            in_progress.dec()
+            REQUEST_LATENCY.labels(
+                method=request.method,
+                route=route_label(request.scope),
+                status=status_code,
+            ).observe(time.perf_counter() - started)
+
+
+def _configure_tracing_middleware(app: FastAPI):
+    @app.middleware('http')
+    async def tracing_middleware(request: Request, call_next):
+        """Трасса для доли TRACE_SAMPLE_RATE запросов; её id - в заголовке X-Trace-Id."""
+        if not tracer.should_sample():
+            return await call_next(request)
+        with tracer.start_trace(f'{request.method} {request.url.path}', **{'http.target': request.url.path}) as trace:
+            response = await call_next(request)
+            trace.root.name = f'{request.method} {route_label(request.scope)}'
+            trace.root.attributes['http.status_code'] = response.status_code
+        response.headers['X-Trace-Id'] = trace.trace_id
+        return response
+
+
+async def _check_connection_budgets() -> None:
+    """Предупреждает, если пулы всех воркеров не помещаются в max_connections сервера."""
+    if settings.DB_PGBOUNCER:
+        # Лимит сервера стоит за PgBouncer: пулы воркеров упираются в его max_client_conn
+        return
+    engines = {'primary': async_engine, **{f'replica{n}': engine for n, engine in enumerate(replica_engines)}}
+    for name, engine in engines.items():
+        limit = await check_connection_budget(engine, pool_config, settings.WEB_CONCURRENCY)
+        if limit is not None:
+            DB_SERVER_CONNECTION_LIMIT.labels(pool=name).set(limit)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Проверяет бюджет соединений, компилирует шаблоны (TEMPLATE_PRECOMPILE)
+    и запускает обработчики очереди отчетов агентов на время жизни процесса.
+    """
+    await _check_connection_budgets()
+    if settings.TEMPLATE_PRECOMPILE:
+        precompile_templates(templates.env)
+    pool = None
+    if settings.INGESTION_WORKERS > 0:
+        pool = IngestionWorkerPool(
+            workers=settings.INGESTION_WORKERS,
+            batch_size=settings.INGESTION_BATCH_SIZE,
+            poll_interval=settings.INGESTION_POLL_INTERVAL,
+        )
+        pool.start()
+    try:
+        yield
+    finally:
+        if pool is not None:
+            await pool.stop()
+
+
 def create_app() -> FastAPI:
     app = FastAPI(
         title='ITBase',
@@ -194,6 +325,7 @@ def create_app() -> FastAPI:
         version='1.0.0',
         docs_url=None,
         redoc_url=None,
+        lifespan=lifespan,
     )
 
     _configure_static_files(app)
@@ -202,6 +334,7 @@ def create_app() -> FastAPI:
     _configure_routers(app)
     _configure_exception_handlers(app)
     _configure_swagger_ui(app)
+    _configure_lazy_routers(app)
 
     # Middleware Configuration
     # Note: Middleware is added LIFO (Last Added, First Executed for request).
@@ -228,6 +361,18 @@ def create_app() -> FastAPI:
         allow_headers=['*'],
     )
 
+    # 4. Реплики: cookie read-your-writes после изменяющих запросов
+    _configure_replica_middleware(app)
+
+    # 5. SQL-статистика: учитывает запросы всех слоев
+    _configure_query_stats_middleware(app)
+
+    # 6. Трассировка: корневой span охватывает SQL-статистику и обработчик
+    _configure_tracing_middleware(app)
+
+    # 7. Метрики Prometheus (Outermost): полное время обработки запроса
+    _configure_metrics_middleware(app)
+
     @app.get('/', status_code=302, include_in_schema=False)
     async def root_redirect(request: Request):
         try:
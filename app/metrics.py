@@ -0,0 +1,164 @@
+# app/metrics.py
+"""
+Метрики Prometheus: латентность маршрутов, запросы в обработке, пулы
+соединений основной базы и реплик (загрузка, ожидание, таймауты), время
+рендера шаблонов, попадания в кэши и глубина очереди отчетов агентов.
+
+Под gunicorn каждый воркер пишет значения в файлы PROMETHEUS_MULTIPROC_DIR
+(multiprocess-режим, каталог готовит gunicorn.conf.py), и /metrics суммирует
+все воркеры. Без этой переменной метрики хранятся в памяти процесса
+(uvicorn, тесты).
+"""
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+MULTIPROC_DIR_ENV = 'PROMETHEUS_MULTIPROC_DIR'
+# Метка маршрута для запросов, не попавших ни в один маршрут (404):
+# произвольные пути взорвали бы число временных рядов
+UNMATCHED_ROUTE = '<unmatched>'
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds',
+    'Время обработки HTTP-запроса до начала ответа',
+    ['method', 'route', 'status'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    'http_requests_in_progress',
+    'HTTP-запросы в обработке',
+    ['method'],
+    multiprocess_mode='livesum',
+)
+
+# Метка pool: primary или replica<N> (POSTGRES_REPLICA_URLS)
+DB_POOL_SIZE = Gauge(
+    'db_pool_size', 'Постоянные соединения пула (сумма по воркерам)', ['pool'], multiprocess_mode='livesum'
+)
+DB_POOL_MAX = Gauge(
+    'db_pool_max', 'Предел соединений пула: pool_size + max_overflow', ['pool'], multiprocess_mode='livesum'
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    'db_pool_checked_out', 'Соединения, выданные из пула', ['pool'], multiprocess_mode='livesum'
+)
+DB_POOL_OVERFLOW = Gauge(
+    'db_pool_overflow', 'Выданные соединения сверх pool_size (из max_overflow)', ['pool'], multiprocess_mode='livesum'
+)
+DB_POOL_CHECKOUTS = Counter('db_pool_checkouts', 'Выдачи соединений из пула', ['pool'])
+DB_POOL_TIMEOUTS = Counter('db_pool_timeouts', 'Соединение не получено за pool_timeout', ['pool'])
+DB_POOL_WAIT = Histogram(
+    'db_pool_wait_seconds',
+    'Ожидание соединения из пула, включая открытие нового',
+    ['pool'],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+# Лимит сервера (max_connections без резерва), проверяется при старте
+DB_SERVER_CONNECTION_LIMIT = Gauge(
+    'db_server_connection_limit', 'Соединения, доступные приложению на сервере БД', ['pool'], multiprocess_mode='max'
+)
+
+# Метка template - шаблон страницы; вложенные через include/extends входят в его время
+TEMPLATE_RENDER_SECONDS = Histogram(
+    'template_render_seconds',
+    'Время рендера шаблона',
+    ['template'],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+
+CACHE_REQUESTS = Counter('cache_requests', 'Обращения к кэшам', ['cache', 'result'])
+
+# Считается при каждом сборе метрик: берется значение последнего опроса
+INGESTION_QUEUE_DEPTH = Gauge(
+    'ingestion_queue_depth', 'Отчеты агентов, ожидающие обработки', multiprocess_mode='mostrecent'
+)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Пул соединений, замеряющий ожидание свободного соединения и таймауты."""
+
+    # Метка pool в метриках; задается instrument_engine
+    metrics_name = 'primary'
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            DB_POOL_TIMEOUTS.labels(pool=self.metrics_name).inc()
+            raise
+        finally:
+            DB_POOL_WAIT.labels(pool=self.metrics_name).observe(time.perf_counter() - started)
+
+    def recreate(self) -> 'InstrumentedPool':
+        # engine.dispose() заменяет пул новым экземпляром
+        pool = super().recreate()
+        pool.metrics_name = self.metrics_name
+        return pool
+
+
+def instrument_engine(engine: AsyncEngine, name: str = 'primary') -> None:
+    """Подписывает метрики пула на события выдачи и возврата соединений."""
+    pool = engine.sync_engine.pool
+    if isinstance(pool, InstrumentedPool):
+        pool.metrics_name = name
+    size = pool.size()
+    DB_POOL_SIZE.labels(pool=name).set(size)
+    DB_POOL_MAX.labels(pool=name).set(size + pool._max_overflow)
+    checked_out_gauge = DB_POOL_CHECKED_OUT.labels(pool=name)
+    overflow_gauge = DB_POOL_OVERFLOW.labels(pool=name)
+    checkouts = DB_POOL_CHECKOUTS.labels(pool=name)
+    # Ряды ожидания и таймаутов видны с нуля, до первого события
+    DB_POOL_WAIT.labels(pool=name)
+    DB_POOL_TIMEOUTS.labels(pool=name)
+    checked_out = 0
+
+    def update_gauges(delta: int) -> None:
+        nonlocal checked_out
+        checked_out += delta
+        checked_out_gauge.set(checked_out)
+        overflow_gauge.set(max(checked_out - size, 0))
+
+    @event.listens_for(pool, 'checkout')
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+        checkouts.inc()
+        update_gauges(1)
+
+    @event.listens_for(pool, 'checkin')
+    def _on_checkin(dbapi_connection, connection_record) -> None:
+        update_gauges(-1)
+
+
+def route_label(scope: dict) -> str:
+    """Шаблон маршрута (/edit/{device_id}) или путь смонтированного приложения (/static)."""
+    route = scope.get('route')
+    if route is not None:
+        return route.path
+    # Mount дописывает свой путь к root_path
+    return scope.get('root_path') or UNMATCHED_ROUTE
+
+
+def cache_hit(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.labels(cache=cache, result='hit' if hit else 'miss').inc()
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Текст для Prometheus и его Content-Type."""
+    if MULTIPROC_DIR_ENV in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
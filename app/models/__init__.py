@@ -12,6 +12,7 @@ from .base import BaseMixin
 from .component import (
     Component,
     ComponentCPU,
+    ComponentFlat,
     ComponentGPU,
     ComponentHistory,
     ComponentMotherboard,
@@ -22,7 +23,10 @@ from .department import Department
 from .device import Device
 from .device_model import DeviceModel
 from .device_status import DeviceStatus
+from .dictionary_version import DictionaryVersion
 from .employee import Employee
+from .ingestion_job import IngestionJob
+from .inventory_counter import InventoryCounter
 from .location import Location
 from .manufacturer import Manufacturer
 from .network import NetworkSettings
@@ -53,4 +57,8 @@ __all__ = [
     'ComponentGPU',
     'ComponentMotherboard',
     'ComponentHistory',
+    'ComponentFlat',
+    'InventoryCounter',
+    'IngestionJob',
+    'DictionaryVersion',
 ]
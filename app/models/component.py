@@ -5,9 +5,12 @@ from typing import Any, ClassVar
 from sqlalchemy import (
     JSON,
     ForeignKey,
+    Index,
     Integer,
     String,
+    text,
 )
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from ..db.database import Base
@@ -106,6 +109,46 @@ class ComponentMotherboard(Component):
     }
 
 
+class ComponentFlat(Base):
+    """
+    Денормализованная read-модель компонентов: одна строка на компонент
+    без JOIN по таблицам подтипов. Поддерживается ComponentService при каждой
+    синхронизации; строки удаляются каскадом вместе с компонентом.
+    """
+    __tablename__ = 'component_flat'
+
+    id: Mapped[int] = mapped_column(
+        Integer, ForeignKey('components.id', ondelete='CASCADE'), primary_key=True
+    )
+    asset_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey('devices.id', ondelete='CASCADE'), nullable=False
+    )
+    component_type: Mapped[str] = mapped_column(String(50), nullable=False)
+    name: Mapped[str] = mapped_column(String(255), nullable=False)
+    serial_number: Mapped[str | None] = mapped_column(String(255))
+    manufacturer: Mapped[str | None] = mapped_column(String(255))
+
+    # Типизированные колонки для выборок и агрегаций по парку
+    cores: Mapped[int | None] = mapped_column(Integer)
+    threads: Mapped[int | None] = mapped_column(Integer)
+    size_mb: Mapped[int | None] = mapped_column(Integer)
+    type_label: Mapped[str | None] = mapped_column(String(50))
+    capacity_gb: Mapped[int | None] = mapped_column(Integer)
+    memory_mb: Mapped[int | None] = mapped_column(Integer)
+
+    # Все поля подтипа (в т.ч. не вынесенные в колонки)
+    spec: Mapped[dict[str, Any]] = mapped_column(
+        JSONB, nullable=False, server_default=text("'{}'::jsonb")
+    )
+
+    __table_args__ = (
+        # Компоненты устройства - один index scan
+        Index('ix_component_flat_asset_id_type', 'asset_id', 'component_type'),
+        # Переписи по моделям (app/db/repositories/hardware_repo.py)
+        Index('ix_component_flat_type_name', 'component_type', 'name'),
+    )
+
+
 class ComponentHistory(BaseMixin, Base):
     __tablename__ = 'component_history'
 
@@ -113,7 +156,16 @@ class ComponentHistory(BaseMixin, Base):
     asset_id: Mapped[int] = mapped_column(
         Integer, ForeignKey('devices.id', ondelete='CASCADE'), nullable=False, index=True
     )
-    change_type: Mapped[str] = mapped_column(String(50), nullable=False)  # ADD, REMOVE, UPDATE
+    change_type: Mapped[str] = mapped_column(String(50), nullable=False)  # ADD, REMOVE, UPDATE, SNAPSHOT
+    # Без внешнего ключа: запись истории переживает удалённый компонент
+    component_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # ADD - полные данные компонента, UPDATE - только изменённые поля,
+    # REMOVE - идентификация компонента, SNAPSHOT - полный набор компонентов
     component_snapshot: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False)
 
+    __table_args__ = (
+        # Постраничная выдача истории актива от новых записей к старым
+        Index('ix_component_history_asset_id_id', 'asset_id', 'id'),
+    )
+
     device = relationship('Device', back_populates='component_history')
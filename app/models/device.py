@@ -23,7 +23,7 @@ from .base import BaseMixin
 if TYPE_CHECKING:
     from .asset_type import AssetType
     from .attachment import Attachment
-    from .component import Component, ComponentHistory
+    from .component import Component, ComponentFlat, ComponentHistory
     from .department import Department
     from .device_model import DeviceModel
     from .device_status import DeviceStatus
@@ -87,6 +87,11 @@ class Device(BaseMixin, Base):
     expected_lifespan_years: Mapped[int | None] = mapped_column(Integer)
     current_wear_percentage: Mapped[float | None] = mapped_column(Numeric(5, 2))
     attributes: Mapped[dict[str, Any] | None] = mapped_column(JSON)
+    components_fingerprint: Mapped[str | None] = mapped_column(
+        String(64),
+        nullable=True,
+        comment="SHA-256 последнего синхронизированного набора компонентов",
+    )
 
     # Оставляем только одно определение для network_settings
     network_settings: Mapped[Optional['NetworkSettings']] = relationship(
@@ -154,6 +159,16 @@ class Device(BaseMixin, Base):
         'Component', back_populates='device', cascade='all, delete-orphan'
     )
 
+    # Плоская read-модель компонентов для отображения (без JOIN по подтипам)
+    components_flat: Mapped[list['ComponentFlat']] = relationship(
+        'ComponentFlat', viewonly=True, order_by='ComponentFlat.id'
+    )
+
     component_history: Mapped[list['ComponentHistory']] = relationship(
-        'ComponentHistory', back_populates='device', cascade='all, delete-orphan'
+        'ComponentHistory',
+        back_populates='device',
+        cascade='all, delete-orphan',
+        # История может быть очень длинной: удаляет её ondelete='CASCADE' в БД,
+        # а не загрузка всей коллекции в сессию
+        passive_deletes=True,
     )
@@ -0,0 +1,24 @@
+# Path: app/models/dictionary_version.py
+
+from sqlalchemy import BigInteger, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..db.database import Base
+
+
+class DictionaryVersion(Base):
+    """
+    Версия данных справочника (по имени таблицы). Повышается триггером
+    bump_dictionary_version после каждого SQL-оператора, изменившего строки
+    таблицы; значения берутся из последовательности и не повторяются даже
+    после отката.
+    Ключ кэша фрагментов шаблонов (app/fragment_cache.py).
+    """
+
+    __tablename__ = 'dictionary_versions'
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<DictionaryVersion(name='{self.name}', version={self.version})>"
@@ -0,0 +1,45 @@
+# Path: app/models/ingestion_job.py
+
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Text, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..db.database import Base
+from .base import BaseMixin
+
+
+class IngestionJob(BaseMixin, Base):
+    """
+    Отчёт агента в очереди фоновой обработки.
+    Воркеры забирают задания через SELECT ... FOR UPDATE SKIP LOCKED.
+    """
+
+    __tablename__ = 'ingestion_jobs'
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    kind: Mapped[str] = mapped_column(String(20), nullable=False)  # import, components
+    status: Mapped[str] = mapped_column(
+        String(20), nullable=False, default='pending', server_default='pending'
+    )  # pending, done, failed
+    asset_id: Mapped[int | None] = mapped_column(
+        Integer, ForeignKey('devices.id', ondelete='CASCADE'), nullable=True
+    )
+    user_id: Mapped[int | None] = mapped_column(
+        Integer, ForeignKey('users.id', ondelete='SET NULL'), nullable=True
+    )
+    payload: Mapped[Any] = mapped_column(JSONB, nullable=False)
+    result: Mapped[dict[str, Any] | None] = mapped_column(JSONB, nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default='0')
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # Очередь: воркеры читают только ожидающие задания в порядке поступления
+        Index('ix_ingestion_jobs_pending', 'id', postgresql_where=text("status = 'pending'")),
+    )
+
+    def __repr__(self) -> str:
+        return f"<IngestionJob(id={self.id}, kind='{self.kind}', status='{self.status}')>"
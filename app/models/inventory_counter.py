@@ -0,0 +1,24 @@
+# Path: app/models/inventory_counter.py
+
+from datetime import date
+
+from sqlalchemy import Date, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..db.database import Base
+
+
+class InventoryCounter(Base):
+    """
+    Счётчик инвентарных номеров для пары (префикс типа актива, день).
+    Номер выделяется атомарным UPSERT ... RETURNING, без сканирования devices.
+    """
+
+    __tablename__ = 'inventory_counters'
+
+    prefix: Mapped[str] = mapped_column(String(10), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    last_value: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return f"<InventoryCounter(prefix='{self.prefix}', day={self.day}, last_value={self.last_value})>"
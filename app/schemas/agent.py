@@ -0,0 +1,39 @@
+# Path: app/schemas/agent.py
+"""
+Схемы протокола агента инвентаризации (версия 1).
+Описание обмена - в agent_builder/src/protocol.py.
+"""
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+from app.schemas.component import ComponentItem
+
+
+class AgentComponentState(BaseModel):
+    """Состояние компонентов устройства, известное серверу."""
+
+    protocol_version: int
+    asset_id: int
+    fingerprint: str | None = Field(None, description='Отпечаток последнего синхронизированного набора')
+    hashes: list[str] = Field(default_factory=list, description='SHA-256 каждого компонента')
+
+
+class AgentReport(BaseModel):
+    """Отчёт агента: без изменений, дельта или полный набор компонентов."""
+
+    protocol_version: int
+    fingerprint: str
+    unchanged: bool = False
+    base_fingerprint: str | None = None
+    added: list[ComponentItem] = Field(default_factory=list)
+    removed: list[str] = Field(default_factory=list)
+    components: list[ComponentItem] | None = None
+
+
+class AgentReportResult(BaseModel):
+    status: Literal['unchanged', 'applied']
+    fingerprint: str
+    added: int = 0
+    updated: int = 0
+    removed: int = 0
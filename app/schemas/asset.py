@@ -86,6 +86,43 @@ class AssetCreate(
     )
 
 
+# --- Схемы пакетного создания ---
+MAX_BULK_CREATE = 10_000
+
+
+class AssetBulkCreate(BaseModel):
+    """Пакет активов для создания в одной транзакции."""
+
+    items: list[AssetCreate] = Field(min_length=1, max_length=MAX_BULK_CREATE)
+
+
+class AssetBulkCreated(BaseModel):
+    id: int
+    inventory_number: str
+
+
+class AssetBulkCreateResult(BaseModel):
+    created: int
+    items: list[AssetBulkCreated]
+
+
+# --- Схемы импорта из файла ---
+class AssetImportRowError(BaseModel):
+    row: int = Field(description='Номер строки файла (заголовок - строка 1)')
+    message: str
+
+
+class AssetImportReport(BaseModel):
+    """Итог импорта: ошибочные строки не прерывают обработку файла."""
+
+    total_rows: int = 0
+    created: int = 0
+    updated: int = 0
+    failed: int = 0
+    errors: list[AssetImportRowError] = Field(default_factory=list)
+    errors_truncated: bool = False
+
+
 # --- Схема для обновления Актива ---
 class AssetUpdate(BaseFormModel):
     """
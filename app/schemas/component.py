@@ -1,6 +1,7 @@
-from typing import Annotated, Literal
+from datetime import datetime
+from typing import Annotated, Any, Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class ComponentBase(BaseModel):
@@ -49,3 +50,28 @@ class ComponentUploadRequest(BaseModel):
     hostname: str
     components: list[ComponentItem]
 
+
+
+class ComponentSyncResult(BaseModel):
+    """Итог синхронизации компонентов: только реально изменившиеся элементы."""
+
+    fingerprint: str
+    unchanged: bool = False
+    added: list[dict] = Field(default_factory=list)
+    updated: list[dict] = Field(default_factory=list)
+    removed: list[dict] = Field(default_factory=list)
+
+
+class ComponentHistoryEntry(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    change_type: str
+    component_id: int | None = None
+    component_snapshot: dict[str, Any]
+    created_at: datetime
+
+
+class ComponentHistoryPage(BaseModel):
+    items: list[ComponentHistoryEntry]
+    next_before_id: int | None = None
@@ -0,0 +1,56 @@
+# Path: app/schemas/hardware.py
+"""
+Схемы запросов к аппаратной конфигурации парка.
+Фильтры комбинируются через AND и компилируются в один SQL-запрос.
+"""
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class HardwareFilter(BaseModel):
+    """Составной фильтр по агрегированной конфигурации устройства."""
+
+    ram_mb_lt: int | None = Field(None, ge=0, description='Суммарный объём RAM меньше, МБ')
+    ram_mb_gte: int | None = Field(None, ge=0, description='Суммарный объём RAM не меньше, МБ')
+    storage_gb_lt: int | None = Field(None, ge=0, description='Суммарный объём накопителей меньше, ГБ')
+    has_ssd: bool | None = Field(None, description='Есть (true) или нет (false) SSD/NVMe')
+    has_hdd: bool | None = Field(None, description='Есть (true) или нет (false) HDD')
+    hdd_only: bool = Field(False, description='Только HDD, без твердотельных накопителей')
+    cpu_name: str | None = Field(None, description='Подстрока в названии процессора')
+    cores_lt: int | None = Field(None, ge=0, description='Суммарное число ядер меньше')
+    has_gpu: bool | None = Field(None, description='Есть (true) или нет (false) дискретная видеокарта')
+    asset_type_id: int | None = None
+    status_id: int | None = None
+    department_id: int | None = None
+    location_id: int | None = None
+
+
+class DeviceHardwareDTO(BaseModel):
+    """Агрегированная конфигурация одного устройства."""
+
+    id: int
+    name: str
+    inventory_number: str
+    ram_total_mb: int = 0
+    ram_modules: int = 0
+    storage_total_gb: int = 0
+    has_ssd: bool = False
+    has_hdd: bool = False
+    cpu_name: str | None = None
+    cpu_cores: int = 0
+    gpu_count: int = 0
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class DeviceHardwarePage(BaseModel):
+    items: list[DeviceHardwareDTO]
+    total: int
+
+
+class HardwareCensusDTO(BaseModel):
+    """Строка переписи: значение признака и число устройств с ним."""
+
+    label: str
+    devices: int
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,30 @@
+# Path: app/schemas/ingestion.py
+"""Схемы очереди фоновой обработки отчетов агентов."""
+from datetime import datetime
+from typing import Any, Literal
+
+from pydantic import BaseModel, ConfigDict
+
+
+class IngestionJobQueued(BaseModel):
+    """Ответ 202: отчет принят в очередь."""
+
+    status: Literal['queued'] = 'queued'
+    job_id: int
+    status_url: str
+
+
+class IngestionJobStatus(BaseModel):
+    """Состояние задания очереди."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    kind: str
+    status: Literal['pending', 'done', 'failed']
+    asset_id: int | None = None
+    attempts: int
+    result: dict[str, Any] | None = None
+    error: str | None = None
+    created_at: datetime
+    finished_at: datetime | None = None
@@ -0,0 +1,120 @@
+# app/services/agent_protocol_service.py
+
+from collections import Counter
+
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.device import Device
+from app.schemas.agent import AgentComponentState, AgentReport, AgentReportResult
+from app.schemas.component import ComponentItem, ComponentSyncResult
+from app.services.component_service import ComponentService
+from app.services.exceptions import AgentProtocolError, AgentStateConflictError, DeviceNotFoundException
+
+PROTOCOL_VERSION = 1
+
+_items_adapter = TypeAdapter(list[ComponentItem])
+
+
+class AgentProtocolService:
+    """
+    Серверная сторона протокола агента.
+
+    Агент запрашивает отпечаток и хэши компонентов устройства и присылает
+    только изменения. Неизменившийся отчёт обрабатывается одним запросом
+    к devices, дельта - применяется к набору из плоской read-модели.
+    """
+
+    @staticmethod
+    async def get_state(session: AsyncSession, asset_id: int) -> AgentComponentState:
+        fingerprint = await AgentProtocolService._stored_fingerprint(session, asset_id)
+        hashes = []
+        if fingerprint is not None:
+            rows = await ComponentService.load_existing(session, asset_id)
+            hashes = [ComponentService.item_hash(AgentProtocolService._item_data(row)) for row in rows]
+        return AgentComponentState(
+            protocol_version=PROTOCOL_VERSION,
+            asset_id=asset_id,
+            fingerprint=fingerprint,
+            hashes=hashes,
+        )
+
+    @staticmethod
+    async def apply_report(session: AsyncSession, asset_id: int, report: AgentReport) -> AgentReportResult:
+        """
+        Применяет отчёт агента.
+
+        Raises:
+            AgentProtocolError: неподдерживаемая версия или пустой отчёт
+            AgentStateConflictError: дельта или "без изменений" не совпадает
+                с состоянием сервера - агент должен прислать полный отчёт
+            DeviceNotFoundException: устройства нет
+        """
+        if report.protocol_version != PROTOCOL_VERSION:
+            raise AgentProtocolError(f'Неподдерживаемая версия протокола: {report.protocol_version}')
+
+        stored = await AgentProtocolService._stored_fingerprint(session, asset_id)
+
+        if report.components is not None:
+            items = report.components
+            existing_rows = None
+        elif report.unchanged:
+            if stored != report.fingerprint:
+                raise AgentStateConflictError('Отпечаток на сервере отличается от отчёта')
+            return AgentReportResult(status='unchanged', fingerprint=stored)
+        else:
+            if report.base_fingerprint is None:
+                raise AgentProtocolError('Отчёт не содержит ни компонентов, ни дельты')
+            if stored != report.base_fingerprint:
+                raise AgentStateConflictError('Дельта построена от устаревшего состояния')
+            existing_rows = await ComponentService.load_existing(session, asset_id)
+            items = AgentProtocolService._apply_delta(existing_rows, report)
+
+        if ComponentService.fingerprint(items) != report.fingerprint:
+            raise AgentStateConflictError('Отпечаток набора после применения отчёта не совпадает')
+
+        result = await ComponentService.sync_components(session, asset_id, items, existing_rows=existing_rows)
+        return AgentProtocolService._result(result)
+
+    @staticmethod
+    def _apply_delta(existing_rows: list[dict], report: AgentReport) -> list[ComponentItem]:
+        """Текущий набор минус удалённые хэши плюс добавленные компоненты."""
+        to_remove = Counter(report.removed)
+        kept = []
+        for row in existing_rows:
+            data = AgentProtocolService._item_data(row)
+            digest = ComponentService.item_hash(data)
+            if to_remove[digest] > 0:
+                to_remove[digest] -= 1
+            else:
+                kept.append(data)
+        if +to_remove:
+            raise AgentStateConflictError('Удаляемые компоненты не найдены на сервере')
+        return _items_adapter.validate_python(kept) + list(report.added)
+
+    @staticmethod
+    def _item_data(row: dict) -> dict:
+        """Строка read-модели в виде item.model_dump()."""
+        entry = ComponentService.state_entry(row)
+        entry.pop('id')
+        return entry
+
+    @staticmethod
+    async def _stored_fingerprint(session: AsyncSession, asset_id: int) -> str | None:
+        row = (
+            await session.execute(select(Device.components_fingerprint).where(Device.id == asset_id))
+        ).first()
+        if row is None:
+            raise DeviceNotFoundException(f'Устройство {asset_id} не найдено')
+        return row.components_fingerprint
+
+    @staticmethod
+    def _result(result: ComponentSyncResult) -> AgentReportResult:
+        return AgentReportResult(
+            status='unchanged' if result.unchanged else 'applied',
+            fingerprint=result.fingerprint,
+            added=len(result.added),
+            updated=len(result.updated),
+            removed=len(result.removed),
+        )
@@ -0,0 +1,569 @@
+# app/services/asset_import_service.py
+"""
+Потоковый импорт активов из CSV/XLSX (миграция из старой системы учета).
+
+Файл читается построчно и обрабатывается порциями по CHUNK_SIZE строк:
+строка переводится в AssetCreate (названия справочников разрешаются
+по словарям, загруженным один раз на импорт), порция записывается
+пакетно и фиксируется отдельной транзакцией. Память не зависит от
+размера файла: в ней одновременно находится только одна порция и не более
+MAX_REPORTED_ERRORS описаний ошибок.
+
+Активы сопоставляются по legacy_inventory_number ("Инвентарный номер"
+старой системы): у найденных обновляются поля колонок, которые есть
+в файле, остальные создаются с новым инвентарным номером ITBase. Номер
+старой системы не уникален; если им помечены несколько активов,
+обновляется самый новый (с наибольшим id). Ошибочная строка попадает
+в отчет и не прерывает импорт остальных.
+"""
+import codecs
+import csv
+import io
+import logging
+import re
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, BinaryIO
+
+from pydantic import ValidationError
+from sqlalchemy import bindparam, insert, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import (
+    ActionLog,
+    AssetType,
+    Department,
+    Device,
+    DeviceModel,
+    DeviceStatus,
+    Employee,
+    Location,
+    Manufacturer,
+    Supplier,
+    Tag,
+)
+from app.models.device import device_tags_table
+from app.schemas.asset import AssetCreate, AssetImportReport, AssetImportRowError
+from app.services.device_service import DeviceService
+from app.services.exceptions import AssetImportError
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+
+# Заголовок колонки (без учета регистра) -> поле импорта.
+# Русские заголовки совпадают с выгрузкой /export/csv.
+COLUMN_ALIASES = {
+    'name': 'name',
+    'название': 'name',
+    'наименование': 'name',
+    'legacy_inventory_number': 'legacy_inventory_number',
+    'инвентарный номер': 'legacy_inventory_number',
+    'serial_number': 'serial_number',
+    'серийный номер': 'serial_number',
+    'mac_address': 'mac_address',
+    'mac-адрес': 'mac_address',
+    'ip_address': 'ip_address',
+    'ip-адрес': 'ip_address',
+    'notes': 'notes',
+    'примечания': 'notes',
+    'purchase_date': 'purchase_date',
+    'дата покупки': 'purchase_date',
+    'warranty_end_date': 'warranty_end_date',
+    'окончание гарантии': 'warranty_end_date',
+    'price': 'price',
+    'цена': 'price',
+    'стоимость': 'price',
+    'asset_type': 'asset_type',
+    'тип': 'asset_type',
+    'manufacturer': 'manufacturer',
+    'производитель': 'manufacturer',
+    'device_model': 'device_model',
+    'модель': 'device_model',
+    'status': 'status',
+    'статус': 'status',
+    'department': 'department',
+    'отдел': 'department',
+    'location': 'location',
+    'локация': 'location',
+    'employee': 'employee',
+    'сотрудник': 'employee',
+    'supplier': 'supplier',
+    'поставщик': 'supplier',
+    'tags': 'tags',
+    'теги': 'tags',
+}
+REQUIRED_COLUMNS = ('asset_type', 'device_model', 'status')
+
+# Колонка импорта -> поле devices, которое она перезаписывает у найденного актива.
+# Обновляются только поля колонок, которые есть в файле: остальные (и source)
+# сохраняют прежние значения
+UPDATE_FIELDS = {
+    'name': 'name',
+    'serial_number': 'serial_number',
+    'mac_address': 'mac_address',
+    'ip_address': 'ip_address',
+    'notes': 'notes',
+    'purchase_date': 'purchase_date',
+    'warranty_end_date': 'warranty_end_date',
+    'price': 'price',
+    'supplier': 'supplier_id',
+    'asset_type': 'asset_type_id',
+    'device_model': 'device_model_id',
+    'status': 'status_id',
+    'department': 'department_id',
+    'location': 'location_id',
+    'employee': 'employee_id',
+}
+
+IMPORT_SOURCE = 'import'
+
+_RU_DATE = re.compile(r'^(\d{1,2})\.(\d{1,2})\.(\d{4})$')
+_AMBIGUOUS = -1
+
+
+def _key(value: str) -> str:
+    return ' '.join(value.split()).casefold()
+
+
+@dataclass
+class DictionaryMap:
+    """Справочники в памяти: нормализованное название -> id."""
+
+    asset_types: dict[str, int] = field(default_factory=dict)
+    statuses: dict[str, int] = field(default_factory=dict)
+    departments: dict[str, int] = field(default_factory=dict)
+    locations: dict[str, int] = field(default_factory=dict)
+    suppliers: dict[str, int] = field(default_factory=dict)
+    manufacturers: dict[str, int] = field(default_factory=dict)
+    tags: dict[str, int] = field(default_factory=dict)
+    employees: dict[str, int] = field(default_factory=dict)
+    # (manufacturer_id, название) и просто название (_AMBIGUOUS, если моделей несколько)
+    models: dict[tuple[int, str], int] = field(default_factory=dict)
+    models_by_name: dict[str, int] = field(default_factory=dict)
+
+    @classmethod
+    async def load(cls, session: AsyncSession) -> 'DictionaryMap':
+        maps = cls()
+        simple = (
+            (maps.statuses, DeviceStatus),
+            (maps.departments, Department),
+            (maps.locations, Location),
+            (maps.suppliers, Supplier),
+            (maps.manufacturers, Manufacturer),
+            (maps.tags, Tag),
+        )
+        for target, model in simple:
+            for row_id, name in await session.execute(select(model.id, model.name)):
+                target[_key(name)] = row_id
+
+        # Тип актива можно указать названием или префиксом
+        for row_id, name, prefix in await session.execute(
+            select(AssetType.id, AssetType.name, AssetType.prefix)
+        ):
+            maps.asset_types[_key(name)] = row_id
+            maps.asset_types.setdefault(_key(prefix), row_id)
+
+        for row_id, name, manufacturer_id in await session.execute(
+            select(DeviceModel.id, DeviceModel.name, DeviceModel.manufacturer_id)
+        ):
+            maps.models[(manufacturer_id, _key(name))] = row_id
+            maps.models_by_name[_key(name)] = (
+                _AMBIGUOUS if _key(name) in maps.models_by_name else row_id
+            )
+
+        # Сотрудник: "Фамилия Имя" (как в выгрузке) или "Фамилия Имя Отчество"
+        for row_id, last_name, first_name, patronymic in await session.execute(
+            select(Employee.id, Employee.last_name, Employee.first_name, Employee.patronymic)
+        ):
+            maps.employees.setdefault(_key(f'{last_name} {first_name}'), row_id)
+            if patronymic:
+                maps.employees[_key(f'{last_name} {first_name} {patronymic}')] = row_id
+        return maps
+
+
+@dataclass
+class ParsedRow:
+    row_number: int
+    asset: AssetCreate
+    legacy_inventory_number: str | None
+
+
+class AssetImportService:
+    """Импорт активов из табличного файла порциями с отчетом по строкам."""
+
+    def __init__(self, chunk_size: int = CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self._device_service = DeviceService()
+
+    async def import_file(
+        self,
+        session: AsyncSession,
+        file: BinaryIO,
+        filename: str,
+        user_id: int,
+        encoding: str = 'utf-8-sig',
+    ) -> AssetImportReport:
+        """
+        Импортирует CSV или XLSX (по расширению имени файла).
+
+        Raises:
+            AssetImportError: формат не поддерживается, файл не читается
+                или нет обязательных колонок
+        """
+        rows = self._iter_rows(file, filename, encoding)
+        header = next(rows, None)
+        if header is None:
+            raise AssetImportError('Файл пуст.')
+        columns = [COLUMN_ALIASES.get(_key(str(name or ''))) for name in header[1]]
+        missing = [name for name in REQUIRED_COLUMNS if name not in columns]
+        if missing:
+            raise AssetImportError(f'Нет обязательных колонок: {", ".join(missing)}.')
+
+        update_fields = tuple(name for column, name in UPDATE_FIELDS.items() if column in columns)
+        maps = await DictionaryMap.load(session)
+        report = AssetImportReport()
+
+        chunk: list[tuple[int, dict[str, Any]]] = []
+        row_number = 1
+        try:
+            for row_number, values in rows:
+                if not any(value not in (None, '') for value in values):
+                    continue
+                chunk.append((row_number, {
+                    column: value for column, value in zip(columns, values, strict=False) if column
+                }))
+                if len(chunk) >= self.chunk_size:
+                    await self._process_chunk(session, chunk, maps, update_fields, user_id, report)
+                    chunk = []
+        except (UnicodeDecodeError, csv.Error) as e:
+            # Предыдущие порции уже зафиксированы - сообщаем, где остановились
+            raise AssetImportError(f'Не удалось прочитать файл после строки {row_number}: {e}')
+        if chunk:
+            await self._process_chunk(session, chunk, maps, update_fields, user_id, report)
+        return report
+
+    # --- Чтение файла ---
+
+    def _iter_rows(self, file: BinaryIO, filename: str, encoding: str) -> Iterator[tuple[int, list[Any]]]:
+        """(номер строки файла, значения) - первая строка содержит заголовки."""
+        extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+        if extension == 'csv':
+            return self._iter_csv(file, encoding)
+        if extension == 'xlsx':
+            return self._iter_xlsx(file)
+        raise AssetImportError('Поддерживаются файлы .csv и .xlsx.')
+
+    @staticmethod
+    def _iter_csv(file: BinaryIO, encoding: str) -> Iterator[tuple[int, list[Any]]]:
+        try:
+            codecs.lookup(encoding)
+        except LookupError:
+            raise AssetImportError(f'Неизвестная кодировка: {encoding}.')
+        text = io.TextIOWrapper(file, encoding=encoding, newline='')
+        sample = text.read(64 * 1024)
+        text.seek(0)
+        try:
+            # Выгрузки из Excel с русской локалью разделены ';'
+            dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+        except csv.Error:
+            dialect = csv.excel
+        try:
+            yield from enumerate(csv.reader(text, dialect), start=1)
+        finally:
+            # Файл закрывает владелец (UploadFile), а не обертка
+            text.detach()
+
+    @staticmethod
+    def _iter_xlsx(file: BinaryIO) -> Iterator[tuple[int, list[Any]]]:
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise AssetImportError('Импорт XLSX требует пакет openpyxl.')
+        try:
+            # read_only: листы читаются потоково, без загрузки всей книги
+            workbook = load_workbook(file, read_only=True, data_only=True)
+        except Exception as e:
+            raise AssetImportError(f'Не удалось открыть XLSX: {e}')
+        try:
+            sheet = workbook.active
+            for index, values in enumerate(sheet.iter_rows(values_only=True), start=1):
+                yield index, list(values)
+        finally:
+            workbook.close()
+
+    # --- Разбор строк ---
+
+    def _parse_row(self, values: dict[str, Any], maps: DictionaryMap) -> tuple[AssetCreate, str | None]:
+        """Строка файла -> AssetCreate; ValueError/ValidationError - ошибка строки."""
+        def text(column: str) -> str | None:
+            value = values.get(column)
+            if value is None:
+                return None
+            value = str(value).strip()
+            return value or None
+
+        def lookup(column: str, mapping: dict[str, int], label: str, required: bool = False) -> int | None:
+            value = text(column)
+            if value is None:
+                if required:
+                    raise ValueError(f'не указано поле "{label}"')
+                return None
+            found = mapping.get(_key(value))
+            if found is None:
+                raise ValueError(f'{label} "{value}" не найден в справочнике')
+            return found
+
+        manufacturer_id = lookup('manufacturer', maps.manufacturers, 'производитель')
+        model_name = text('device_model')
+        if model_name is None:
+            raise ValueError('не указано поле "модель"')
+        if manufacturer_id is not None:
+            device_model_id = maps.models.get((manufacturer_id, _key(model_name)))
+        else:
+            device_model_id = maps.models_by_name.get(_key(model_name))
+            if device_model_id == _AMBIGUOUS:
+                raise ValueError(f'модель "{model_name}" есть у нескольких производителей - укажите производителя')
+        if device_model_id is None:
+            raise ValueError(f'модель "{model_name}" не найдена в справочнике')
+
+        tag_ids = []
+        for tag in re.split(r'[,;]', text('tags') or ''):
+            if tag.strip():
+                tag_id = maps.tags.get(_key(tag))
+                if tag_id is None:
+                    raise ValueError(f'тег "{tag.strip()}" не найден в справочнике')
+                tag_ids.append(tag_id)
+
+        asset = AssetCreate(
+            # В выгрузке ITBase нет названия - используем модель
+            name=text('name') or model_name,
+            serial_number=text('serial_number'),
+            mac_address=text('mac_address'),
+            ip_address=text('ip_address'),
+            notes=text('notes'),
+            source=IMPORT_SOURCE,
+            purchase_date=self._parse_date(values.get('purchase_date')),
+            warranty_end_date=self._parse_date(values.get('warranty_end_date')),
+            price=self._parse_number(values.get('price')),
+            asset_type_id=lookup('asset_type', maps.asset_types, 'тип актива', required=True),
+            device_model_id=device_model_id,
+            status_id=lookup('status', maps.statuses, 'статус', required=True),
+            department_id=lookup('department', maps.departments, 'отдел'),
+            location_id=lookup('location', maps.locations, 'локация'),
+            employee_id=lookup('employee', maps.employees, 'сотрудник'),
+            supplier_id=lookup('supplier', maps.suppliers, 'поставщик'),
+            tag_ids=tag_ids,
+        )
+        return asset, text('legacy_inventory_number')
+
+    @staticmethod
+    def _parse_date(value: Any) -> date | str | None:
+        if isinstance(value, datetime):
+            return value.date()
+        if value is None or isinstance(value, date):
+            return value
+        value = str(value).strip()
+        match = _RU_DATE.match(value)
+        if match:
+            day, month, year = (int(part) for part in match.groups())
+            return date(year, month, day)
+        # ISO-формат разбирает сама схема
+        return value or None
+
+    @staticmethod
+    def _parse_number(value: Any) -> float | str | None:
+        if value is None or isinstance(value, (int, float)):
+            return value
+        value = str(value).strip().replace('\xa0', '').replace(' ', '').replace(',', '.')
+        return value or None
+
+    # --- Запись порции ---
+
+    async def _process_chunk(
+        self,
+        session: AsyncSession,
+        chunk: list[tuple[int, dict[str, Any]]],
+        maps: DictionaryMap,
+        update_fields: tuple[str, ...],
+        user_id: int,
+        report: AssetImportReport,
+    ) -> None:
+        report.total_rows += len(chunk)
+        parsed = self._validate_chunk(chunk, maps, report)
+        if not parsed:
+            return
+
+        # Активы, уже импортированные ранее (по номеру старой системы).
+        # При повторах номера dict оставляет последнюю пару - самый новый актив
+        legacy_numbers = {row.legacy_inventory_number for row in parsed if row.legacy_inventory_number}
+        existing: dict[str, int] = {}
+        if legacy_numbers:
+            stmt = (
+                select(Device.legacy_inventory_number, Device.id)
+                .where(Device.legacy_inventory_number.in_(legacy_numbers))
+                .order_by(Device.id.asc())
+            )
+            existing = dict((await session.execute(stmt)).all())
+
+        parsed = await self._drop_unique_conflicts(session, parsed, existing, report)
+        to_update = [row for row in parsed if row.legacy_inventory_number in existing]
+        to_insert = [row for row in parsed if row.legacy_inventory_number not in existing]
+
+        try:
+            async with session.begin_nested():
+                if to_insert:
+                    await self._device_service.insert_devices(
+                        session,
+                        [row.asset for row in to_insert],
+                        user_id,
+                        source=IMPORT_SOURCE,
+                        extra=[{'legacy_inventory_number': row.legacy_inventory_number} for row in to_insert],
+                    )
+                if to_update:
+                    await self._update_devices(session, to_update, existing, update_fields, user_id)
+            await session.commit()
+        except SQLAlchemyError as e:
+            # Порция откатывается целиком, но импорт продолжается со следующей
+            logger.warning(f'Порция импорта активов отклонена: {e}')
+            error_info = str(getattr(e, 'orig', None) or e)
+            for row in to_insert + to_update:
+                self._add_error(report, row.row_number, f'ошибка записи порции: {error_info}')
+            return
+
+        report.created += len(to_insert)
+        report.updated += len(to_update)
+
+    def _validate_chunk(
+        self, chunk: list[tuple[int, dict[str, Any]]], maps: DictionaryMap, report: AssetImportReport
+    ) -> list[ParsedRow]:
+        parsed: list[ParsedRow] = []
+        seen: dict[tuple[str, str], int] = {}
+        for row_number, values in chunk:
+            try:
+                asset, legacy = self._parse_row(values, maps)
+            except ValidationError as e:
+                message = '; '.join(
+                    f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in e.errors()
+                )
+                self._add_error(report, row_number, message)
+                continue
+            except ValueError as e:
+                self._add_error(report, row_number, str(e))
+                continue
+
+            # Повторы уникальных полей внутри порции
+            duplicate = None
+            keys = [
+                ('инвентарный номер', legacy),
+                ('серийный номер', asset.serial_number),
+                ('MAC-адрес', asset.mac_address),
+            ]
+            for label, value in keys:
+                if value is not None and (label, value) in seen:
+                    duplicate = f'{label} "{value}" уже встречается в строке {seen[(label, value)]}'
+                    break
+            if duplicate:
+                self._add_error(report, row_number, duplicate)
+                continue
+            for label, value in keys:
+                if value is not None:
+                    seen[(label, value)] = row_number
+            parsed.append(ParsedRow(row_number, asset, legacy))
+        return parsed
+
+    async def _drop_unique_conflicts(
+        self,
+        session: AsyncSession,
+        parsed: list[ParsedRow],
+        existing: dict[str, int],
+        report: AssetImportReport,
+    ) -> list[ParsedRow]:
+        """Отбрасывает строки, чей серийный номер или MAC занят другим активом."""
+        serials = {row.asset.serial_number for row in parsed if row.asset.serial_number}
+        macs = {row.asset.mac_address for row in parsed if row.asset.mac_address}
+        if not serials and not macs:
+            return parsed
+
+        # Пустой IN в OR лишает планировщик индексов - добавляем только непустые
+        conditions = []
+        if serials:
+            conditions.append(Device.serial_number.in_(serials))
+        if macs:
+            conditions.append(Device.mac_address.in_(macs))
+        stmt = select(Device.id, Device.serial_number, Device.mac_address).where(or_(*conditions))
+        owners: dict[tuple[str, str], int] = {}
+        for device_id, serial_number, mac_address in await session.execute(stmt):
+            if serial_number in serials:
+                owners[('серийный номер', serial_number)] = device_id
+            if mac_address in macs:
+                owners[('MAC-адрес', mac_address)] = device_id
+
+        accepted = []
+        for row in parsed:
+            own_id = existing.get(row.legacy_inventory_number)
+            conflict = None
+            for label, value in (('серийный номер', row.asset.serial_number), ('MAC-адрес', row.asset.mac_address)):
+                owner = owners.get((label, value))
+                if owner is not None and owner != own_id:
+                    conflict = f'{label} "{value}" уже принадлежит активу id={owner}'
+                    break
+            if conflict:
+                self._add_error(report, row.row_number, conflict)
+            else:
+                accepted.append(row)
+        return accepted
+
+    @staticmethod
+    async def _update_devices(
+        session: AsyncSession,
+        rows: list[ParsedRow],
+        existing: dict[str, int],
+        update_fields: tuple[str, ...],
+        user_id: int,
+    ) -> None:
+        """Обновляет найденные активы одним executemany UPDATE (только поля колонок файла)."""
+        table = Device.__table__
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam('device_id'))
+            .values({name: bindparam(name) for name in update_fields})
+        )
+        params = []
+        tag_rows = []
+        for row in rows:
+            device_id = existing[row.legacy_inventory_number]
+            values = row.asset.model_dump(include=set(update_fields))
+            values['device_id'] = device_id
+            params.append(values)
+            tag_rows.extend({'device_id': device_id, 'tag_id': tag_id} for tag_id in dict.fromkeys(row.asset.tag_ids))
+        await session.execute(stmt, params)
+
+        if tag_rows:
+            await session.execute(pg_insert(device_tags_table).on_conflict_do_nothing(), tag_rows)
+
+        await session.execute(insert(ActionLog.__table__), [
+            {
+                'user_id': user_id,
+                'action_type': 'update',
+                'entity_type': 'Device',
+                'entity_id': existing[row.legacy_inventory_number],
+                'details': {
+                    'legacy_inventory_number': row.legacy_inventory_number,
+                    'source': IMPORT_SOURCE,
+                },
+            }
+            for row in rows
+        ])
+
+    @staticmethod
+    def _add_error(report: AssetImportReport, row_number: int, message: str) -> None:
+        report.failed += 1
+        if len(report.errors) < MAX_REPORTED_ERRORS:
+            report.errors.append(AssetImportRowError(row=row_number, message=message))
+        else:
+            report.errors_truncated = True
@@ -1,220 +1,427 @@
 # app/services/component_service.py
 
-from sqlalchemy import select
+import hashlib
+import json
+from collections import defaultdict
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import with_polymorphic
 
 from app.models.component import (
     Component,
     ComponentCPU,
+    ComponentFlat,
     ComponentGPU,
     ComponentHistory,
     ComponentMotherboard,
     ComponentRAM,
     ComponentStorage,
 )
-from app.schemas.component import ComponentItem
+from app.models.device import Device
+from app.schemas.component import ComponentItem, ComponentSyncResult
+from app.services.exceptions import DeviceNotFoundException
+from app.tracing import traced
+
+# Тип компонента -> (ORM-подкласс, специфичные поля подтипа)
+COMPONENT_TYPES: dict[str, tuple[type[Component], tuple[str, ...]]] = {
+    'cpu': (ComponentCPU, ('cores', 'threads', 'base_clock_mhz')),
+    'ram': (ComponentRAM, ('size_mb', 'speed_mhz', 'form_factor')),
+    'storage': (ComponentStorage, ('type_label', 'capacity_gb', 'interface')),
+    'gpu': (ComponentGPU, ('memory_mb',)),
+    'motherboard': (ComponentMotherboard, ()),
+}
+
+# Общие поля, изменение которых считается обновлением компонента
+COMMON_FIELDS = ('manufacturer',)
+
+# Поля подтипов, вынесенные в типизированные колонки ComponentFlat
+FLAT_COLUMNS = ('cores', 'threads', 'size_mb', 'type_label', 'capacity_gb', 'memory_mb')
+
+# Через сколько записей-дельт в истории пишется полный снимок набора компонентов.
+# Восстановление состояния на дату читает не больше одного снимка и этого числа дельт.
+SNAPSHOT_INTERVAL = 50
 
 
 class ComponentService:
     @staticmethod
+    def canonical(data: dict) -> str:
+        """
+        Каноническая JSON-строка компонента (вид item.model_dump()).
+        Тот же алгоритм реализован в agent_builder/src/protocol.py.
+        """
+        return json.dumps(data, sort_keys=True, ensure_ascii=False)
+
+    @staticmethod
+    def item_hash(data: dict) -> str:
+        """SHA-256 одного компонента - идентификатор в дельтах протокола агента."""
+        return hashlib.sha256(ComponentService.canonical(data).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def fingerprint(items: list[ComponentItem]) -> str:
+        """
+        Канонический SHA-256 нормализованного списка компонентов.
+        Не зависит от порядка компонентов в отчёте и порядка ключей.
+        """
+        canonical = sorted(ComponentService.canonical(item.model_dump()) for item in items)
+        return hashlib.sha256('\n'.join(canonical).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    @traced()
     async def sync_components(
-        session: AsyncSession, asset_id: int, items: list[ComponentItem]
-    ) -> None:
+        session: AsyncSession,
+        asset_id: int,
+        items: list[ComponentItem],
+        existing_rows: list[dict] | None = None,
+    ) -> ComponentSyncResult:
         """
         Синхронизирует список компонентов для актива.
         Реализует логику Smart Sync:
-        1. Загружает текущие компоненты.
-        2. Сравнивает с новыми.
-        3. Выполняет INSERT/UPDATE/DELETE.
-        4. Записывает историю изменений.
-        """
-        # 1. Загружаем текущие компоненты
-        poly = with_polymorphic(
-            Component, [ComponentCPU, ComponentRAM, ComponentStorage, ComponentGPU, ComponentMotherboard]
+        0. Сверяет отпечаток отчёта с сохранённым: идентичный отчёт
+           завершается без единого запроса к таблицам компонентов.
+        1. Загружает текущие компоненты одним запросом.
+        2. Сравнивает с новыми в памяти.
+        3. Выполняет пакетные INSERT/UPDATE (по одному на подтип) и один DELETE.
+        4. Записывает историю одним пакетным INSERT: компактные дельты
+           (UPDATE хранит только изменённые поля) и раз в SNAPSHOT_INTERVAL
+           записей - полный снимок набора для восстановления на дату.
+        """
+        # 0. Отчёт не изменился с прошлой синхронизации
+        fingerprint = ComponentService.fingerprint(items)
+        stored = await session.scalar(
+            select(Device.components_fingerprint).where(Device.id == asset_id)
         )
-        stmt = select(poly).where(Component.asset_id == asset_id)
-        result = await session.execute(stmt)
-        existing_components = result.scalars().all()
+        if stored == fingerprint:
+            return ComponentSyncResult(fingerprint=fingerprint, unchanged=True)
 
-        # Создаем мапу существующих компонентов
-        existing_map = {
-            (c.component_type, c.name, c.serial_number): c for c in existing_components
-        }
+        # 1. Загружаем текущие компоненты (если вызывающий код их ещё не прочитал)
+        if existing_rows is None:
+            existing_rows = await ComponentService.load_existing(session, asset_id)
+
+        # Одинаковые компоненты без серийного номера (например, две планки RAM)
+        # сопоставляются попарно, поэтому храним список на каждый ключ.
+        existing_map: dict[tuple, list[dict]] = defaultdict(list)
+        for row in existing_rows:
+            existing_map[(row['component_type'], row['name'], row['serial_number'])].append(row)
 
-        # 2. Обрабатываем входящие данные
-        processed_keys = set()
+        # 2. Считаем diff
+        to_insert: dict[str, list[dict]] = defaultdict(list)
+        to_update: dict[str, list[dict]] = defaultdict(list)
+        history: list[dict] = []
+        changed_ids: set[int] = set()
+        result = ComponentSyncResult(fingerprint=fingerprint)
 
         for item in items:
-            key = (item.type, item.name, item.serial_number)
-            processed_keys.add(key)
+            candidates = existing_map.get((item.type, item.name, item.serial_number))
+            if candidates:
+                existing = candidates.pop(0)
+                changes = ComponentService._diff_fields(existing, item)
+                if changes:
+                    existing.update(changes)
+                    changed_ids.add(existing['id'])
+                    to_update[item.type].append({'id': existing['id'], **changes})
+                    history.append(
+                        ComponentService._history_row(
+                            asset_id,
+                            'UPDATE',
+                            {
+                                'type': item.type,
+                                'name': item.name,
+                                'serial_number': item.serial_number,
+                                'changes': changes,
+                            },
+                            component_id=existing['id'],
+                        )
+                    )
+                    result.updated.append(item.model_dump())
+            elif item.type in COMPONENT_TYPES:
+                to_insert[item.type].append(ComponentService._insert_row(asset_id, item))
+                result.added.append(item.model_dump())
 
-            existing = existing_map.get(key)
+        to_delete = [row for rows in existing_map.values() for row in rows]
+        deleted_ids = {row['id'] for row in to_delete}
+        for row in to_delete:
+            snapshot = {
+                'type': row['component_type'],
+                'name': row['name'],
+                'serial_number': row['serial_number'],
+                'id': row['id'],
+            }
+            history.append(ComponentService._history_row(asset_id, 'REMOVE', snapshot, component_id=row['id']))
+            result.removed.append(snapshot)
 
-            if existing:
-                if ComponentService._update_component(existing, item):
-                    session.add(existing)
-                    await ComponentService._log_history(
-                        session, asset_id, 'UPDATE', item.model_dump()
-                    )
-            else:
-                new_component = ComponentService._create_component(asset_id, item)
-                if new_component:
-                    session.add(new_component)
-                    await ComponentService._log_history(
-                        session, asset_id, 'ADD', item.model_dump()
+        # 3. Пакетная запись: ORM bulk INSERT/UPDATE сам раскладывает поля
+        # по базовой таблице и таблице подтипа (joined inheritance)
+        state = [
+            ComponentService.state_entry(row) for row in existing_rows if row['id'] not in deleted_ids
+        ]
+        for component_type, rows in to_insert.items():
+            model, _ = COMPONENT_TYPES[component_type]
+            new_ids = (
+                await session.execute(insert(model).returning(model.id, sort_by_parameter_order=True), rows)
+            ).scalars().all()
+            for component_id, row in zip(new_ids, rows, strict=True):
+                entry = ComponentService.state_entry({**row, 'id': component_id})
+                state.append(entry)
+                changed_ids.add(component_id)
+                history.append(
+                    ComponentService._history_row(
+                        asset_id, 'ADD', {k: v for k, v in entry.items() if k != 'id'}, component_id=component_id
                     )
+                )
+
+        for component_type, rows in to_update.items():
+            model, _ = COMPONENT_TYPES[component_type]
+            await session.execute(update(model), rows)
 
-        # 3. DELETE logic
-        for key, component in existing_map.items():
-            if key not in processed_keys:
-                await session.delete(component)
-                snapshot = {
-                    'type': component.component_type,
-                    'name': component.name,
-                    'serial_number': component.serial_number,
-                    'id': component.id
-                }
-                await ComponentService._log_history(
-                    session, asset_id, 'REMOVE', snapshot
+        if to_delete:
+            # Строки подтипов удаляются каскадом (ondelete='CASCADE')
+            await session.execute(delete(Component).where(Component.id.in_(deleted_ids)))
+
+        # Плоская read-модель: upsert добавленных и изменённых компонентов,
+        # удалённые уходят каскадом вместе со строкой components
+        if changed_ids:
+            await ComponentService._upsert_flat(
+                session, asset_id, [entry for entry in state if entry['id'] in changed_ids]
+            )
+
+        # 4. История одним запросом: дельты и, при необходимости, полный снимок
+        if history:
+            if await ComponentService._snapshot_due(session, asset_id, len(history)):
+                history.append(
+                    ComponentService._history_row(
+                        asset_id, 'SNAPSHOT', {'components': sorted(state, key=lambda e: e['id'])}
+                    )
                 )
+            # Core INSERT: ORM разбил бы строки с component_id=None в отдельный запрос
+            await session.execute(insert(ComponentHistory.__table__), history)
 
-    @staticmethod
-    def _update_component(existing: Component, item: ComponentItem) -> bool:
-        updated = False
-
-        # Общие поля
-        if existing.manufacturer != item.manufacturer:
-            existing.manufacturer = item.manufacturer
-            updated = True
-
-        # Специфичные поля
-        if item.type == 'cpu' and isinstance(existing, ComponentCPU):
-            if ComponentService._update_cpu(existing, item):
-                updated = True
-        elif item.type == 'ram' and isinstance(existing, ComponentRAM):
-            if ComponentService._update_ram(existing, item):
-                updated = True
-        elif item.type == 'storage' and isinstance(existing, ComponentStorage):
-            if ComponentService._update_storage(existing, item):
-                updated = True
-        elif item.type == 'gpu' and isinstance(existing, ComponentGPU):
-            if ComponentService._update_gpu(existing, item):
-                updated = True
-
-        return updated
+        await session.execute(
+            update(Device).where(Device.id == asset_id).values(components_fingerprint=fingerprint)
+        )
+        return result
 
     @staticmethod
-    def _update_cpu(existing: ComponentCPU, item: ComponentItem) -> bool:
-        updated = False
-        if existing.cores != item.cores:
-            existing.cores = item.cores
-            updated = True
-        if existing.threads != item.threads:
-            existing.threads = item.threads
-            updated = True
-        if existing.base_clock_mhz != item.base_clock_mhz:
-            existing.base_clock_mhz = item.base_clock_mhz
-            updated = True
-        return updated
+    async def ensure_device(session: AsyncSession, asset_id: int) -> None:
+        """
+        Проверяет, что устройство существует: пустая история или пустой набор
+        компонентов иначе неотличимы от несуществующего устройства.
 
-    @staticmethod
-    def _update_ram(existing: ComponentRAM, item: ComponentItem) -> bool:
-        updated = False
-        if existing.size_mb != item.size_mb:
-            existing.size_mb = item.size_mb
-            updated = True
-        if existing.speed_mhz != item.speed_mhz:
-            existing.speed_mhz = item.speed_mhz
-            updated = True
-        if existing.form_factor != item.form_factor:
-            existing.form_factor = item.form_factor
-            updated = True
-        return updated
+        Raises:
+            DeviceNotFoundException: устройства нет
+        """
+        if await session.scalar(select(Device.id).where(Device.id == asset_id)) is None:
+            raise DeviceNotFoundException(f'Устройство {asset_id} не найдено')
 
     @staticmethod
-    def _update_storage(existing: ComponentStorage, item: ComponentItem) -> bool:
-        updated = False
-        if existing.type_label != item.type_label:
-            existing.type_label = item.type_label
-            updated = True
-        if existing.capacity_gb != item.capacity_gb:
-            existing.capacity_gb = item.capacity_gb
-            updated = True
-        if existing.interface != item.interface:
-            existing.interface = item.interface
-            updated = True
-        return updated
+    @traced()
+    async def get_history(
+        session: AsyncSession, asset_id: int, limit: int = 20, before_id: int | None = None
+    ) -> tuple[list[ComponentHistory], int | None]:
+        """
+        Страница истории изменений компонентов, от новых записей к старым.
+        Служебные снимки в выдачу не попадают.
 
-    @staticmethod
-    def _update_gpu(existing: ComponentGPU, item: ComponentItem) -> bool:
-        updated = False
-        if existing.memory_mb != item.memory_mb:
-            existing.memory_mb = item.memory_mb
-            updated = True
-        return updated
+        Returns:
+            Записи страницы и курсор `before_id` для следующей страницы
+            (None, если записей больше нет).
+        """
+        stmt = (
+            select(ComponentHistory)
+            .where(
+                ComponentHistory.asset_id == asset_id,
+                ComponentHistory.change_type != 'SNAPSHOT',
+            )
+            .order_by(ComponentHistory.id.desc())
+            .limit(limit + 1)
+        )
+        if before_id is not None:
+            stmt = stmt.where(ComponentHistory.id < before_id)
+
+        rows = list((await session.execute(stmt)).scalars().all())
+        if len(rows) > limit:
+            return rows[:limit], rows[limit - 1].id
+        return rows, None
 
     @staticmethod
-    def _create_component(asset_id: int, item: ComponentItem) -> Component | None:
-        if item.type == 'cpu':
-            return ComponentCPU(
-                asset_id=asset_id,
-                component_type='cpu',
-                name=item.name,
-                serial_number=item.serial_number,
-                manufacturer=item.manufacturer,
-                cores=item.cores,
-                threads=item.threads,
-                base_clock_mhz=item.base_clock_mhz,
-            )
-        elif item.type == 'ram':
-            return ComponentRAM(
-                asset_id=asset_id,
-                component_type='ram',
-                name=item.name,
-                serial_number=item.serial_number,
-                manufacturer=item.manufacturer,
-                size_mb=item.size_mb,
-                speed_mhz=item.speed_mhz,
-                form_factor=item.form_factor,
+    @traced()
+    async def get_components_at(session: AsyncSession, asset_id: int, at: datetime) -> list[dict[str, Any]]:
+        """
+        Восстанавливает набор компонентов актива на момент `at`:
+        последний снимок не позже `at` плюс применённые поверх него дельты.
+        """
+        snapshot = (
+            await session.execute(
+                select(ComponentHistory.id, ComponentHistory.component_snapshot)
+                .where(
+                    ComponentHistory.asset_id == asset_id,
+                    ComponentHistory.change_type == 'SNAPSHOT',
+                    ComponentHistory.created_at <= at,
+                )
+                .order_by(ComponentHistory.id.desc())
+                .limit(1)
             )
-        elif item.type == 'storage':
-            return ComponentStorage(
-                asset_id=asset_id,
-                component_type='storage',
-                name=item.name,
-                serial_number=item.serial_number,
-                manufacturer=item.manufacturer,
-                type_label=item.type_label,
-                capacity_gb=item.capacity_gb,
-                interface=item.interface,
+        ).first()
+
+        state: dict[Any, dict] = {}
+        deltas_stmt = (
+            select(
+                ComponentHistory.change_type,
+                ComponentHistory.component_id,
+                ComponentHistory.component_snapshot,
             )
-        elif item.type == 'gpu':
-            return ComponentGPU(
-                asset_id=asset_id,
-                component_type='gpu',
-                name=item.name,
-                serial_number=item.serial_number,
-                manufacturer=item.manufacturer,
-                memory_mb=item.memory_mb,
+            .where(
+                ComponentHistory.asset_id == asset_id,
+                ComponentHistory.change_type != 'SNAPSHOT',
+                ComponentHistory.created_at <= at,
             )
-        elif item.type == 'motherboard':
-            return ComponentMotherboard(
-                asset_id=asset_id,
-                component_type='motherboard',
-                name=item.name,
-                serial_number=item.serial_number,
-                manufacturer=item.manufacturer,
+            .order_by(ComponentHistory.id)
+        )
+        if snapshot is not None:
+            state = {entry['id']: dict(entry) for entry in snapshot.component_snapshot['components']}
+            deltas_stmt = deltas_stmt.where(ComponentHistory.id > snapshot.id)
+
+        for change_type, component_id, data in await session.execute(deltas_stmt):
+            ComponentService._apply_delta(state, change_type, component_id, data)
+
+        return sorted(state.values(), key=lambda e: (e['id'] is None, e['id'] or 0, e['type'], e['name']))
+
+    @staticmethod
+    def _apply_delta(state: dict[Any, dict], change_type: str, component_id: int | None, data: dict) -> None:
+        """
+        Применяет одну запись истории к восстанавливаемому набору.
+        Записи старого формата (без component_id, с полными данными)
+        сопоставляются по типу, имени и серийному номеру.
+        """
+        legacy_key = ('legacy', data.get('type'), data.get('name'), data.get('serial_number'))
+        key = component_id if component_id is not None else legacy_key
+        if key not in state and legacy_key in state:
+            key = legacy_key
+
+        if change_type == 'ADD':
+            state[key] = {**data, 'id': component_id}
+        elif change_type == 'UPDATE':
+            entry = state.setdefault(key, {'id': component_id})
+            if 'changes' in data:
+                entry.update(data['changes'])
+            else:
+                entry.update(data)
+        elif change_type == 'REMOVE':
+            state.pop(key, None)
+
+    @staticmethod
+    async def _snapshot_due(session: AsyncSession, asset_id: int, new_deltas: int) -> bool:
+        """Нужен ли полный снимок после записи `new_deltas` новых дельт."""
+        last_snapshot_id = (
+            select(func.max(ComponentHistory.id))
+            .where(
+                ComponentHistory.asset_id == asset_id,
+                ComponentHistory.change_type == 'SNAPSHOT',
             )
-        return None
+            .scalar_subquery()
+        )
+        stmt = select(last_snapshot_id, func.count()).where(
+            ComponentHistory.asset_id == asset_id,
+            ComponentHistory.id > func.coalesce(last_snapshot_id, 0),
+        )
+        snapshot_id, deltas = (await session.execute(stmt)).one()
+        return snapshot_id is None or deltas + new_deltas >= SNAPSHOT_INTERVAL
 
     @staticmethod
-    async def _log_history(
-        session: AsyncSession, asset_id: int, change_type: str, snapshot: dict
-    ) -> None:
-        history = ComponentHistory(
-            asset_id=asset_id,
-            change_type=change_type,
-            component_snapshot=snapshot
+    async def load_existing(session: AsyncSession, asset_id: int) -> list[dict]:
+        """
+        Загружает текущие компоненты актива из плоской read-модели одним
+        index scan (без ORM-объектов, чтобы пакетные UPDATE/DELETE не оставляли
+        устаревших сущностей в сессии).
+        """
+        stmt = select(
+            ComponentFlat.id,
+            ComponentFlat.component_type,
+            ComponentFlat.name,
+            ComponentFlat.serial_number,
+            ComponentFlat.manufacturer,
+            ComponentFlat.spec,
+        ).where(ComponentFlat.asset_id == asset_id)
+        rows = []
+        for row in await session.execute(stmt):
+            data = row._asdict()
+            data.update(data.pop('spec'))
+            rows.append(data)
+        return rows
+
+    @staticmethod
+    async def _upsert_flat(session: AsyncSession, asset_id: int, entries: list[dict]) -> None:
+        """Записывает строки ComponentFlat одним INSERT ... ON CONFLICT DO UPDATE."""
+        rows = []
+        for entry in entries:
+            _, spec_fields = COMPONENT_TYPES.get(entry['type'], (None, ()))
+            row = {
+                'id': entry['id'],
+                'asset_id': asset_id,
+                'component_type': entry['type'],
+                'name': entry['name'],
+                'serial_number': entry['serial_number'],
+                'manufacturer': entry['manufacturer'],
+                'spec': {field: entry.get(field) for field in spec_fields},
+            }
+            row.update({column: entry.get(column) for column in FLAT_COLUMNS})
+            rows.append(row)
+
+        stmt = pg_insert(ComponentFlat).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ComponentFlat.id],
+            set_={column: stmt.excluded[column] for column in rows[0] if column != 'id'},
         )
-        session.add(history)
+        await session.execute(stmt)
+
+    @staticmethod
+    def _diff_fields(existing: dict, item: ComponentItem) -> dict:
+        """Возвращает изменившиеся общие и специфичные поля компонента."""
+        _, spec_fields = COMPONENT_TYPES.get(item.type, (None, ()))
+        changes = {}
+        for field in COMMON_FIELDS + spec_fields:
+            new_value = getattr(item, field, None)
+            if existing.get(field) != new_value:
+                changes[field] = new_value
+        return changes
+
+    @staticmethod
+    def _insert_row(asset_id: int, item: ComponentItem) -> dict:
+        _, spec_fields = COMPONENT_TYPES[item.type]
+        row = {
+            'asset_id': asset_id,
+            'component_type': item.type,
+            'name': item.name,
+            'serial_number': item.serial_number,
+            'manufacturer': item.manufacturer,
+        }
+        row.update({field: getattr(item, field) for field in spec_fields})
+        return row
+
+    @staticmethod
+    def state_entry(row: dict) -> dict:
+        """Элемент полного снимка: общие поля и поля своего подтипа."""
+        component_type = row.get('component_type') or row.get('type')
+        _, spec_fields = COMPONENT_TYPES.get(component_type, (None, ()))
+        entry = {
+            'id': row['id'],
+            'type': component_type,
+            'name': row['name'],
+            'serial_number': row['serial_number'],
+            'manufacturer': row['manufacturer'],
+        }
+        entry.update({field: row.get(field) for field in spec_fields})
+        return entry
+
+    @staticmethod
+    def _history_row(
+        asset_id: int, change_type: str, snapshot: dict, component_id: int | None = None
+    ) -> dict:
+        return {
+            'asset_id': asset_id,
+            'change_type': change_type,
+            'component_id': component_id,
+            'component_snapshot': snapshot,
+        }
@@ -4,41 +4,91 @@ import logging
 from datetime import date, datetime
 
 from fastapi import HTTPException, UploadFile
-from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy import delete, func, insert, lambda_stmt, or_, select, update
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload, with_polymorphic
+from sqlalchemy.orm import selectinload
+from sqlalchemy.sql.lambdas import StatementLambdaElement
 
+from app.db.upsert import get_or_create, get_or_create_id
 from app.models import (
+    ActionLog,
     AssetType,
-    Component,
     Department,
     Device,
     DeviceModel,
     DeviceStatus,
+    DictionaryVersion,
     Employee,
     Location,
     Manufacturer,
     Supplier,
     Tag,
 )
-from app.models.component import (
-    ComponentCPU,
-    ComponentGPU,
-    ComponentMotherboard,
-    ComponentRAM,
-    ComponentStorage,
-)
+from app.models.device import device_tags_table
 from app.schemas.asset import AssetCreate, AssetUpdate
 from app.schemas.component import ComponentUploadRequest
 from app.services.audit_log_service import log_action
 from app.services.component_service import ComponentService
+from app.services.inventory_number_service import InventoryNumberService
+from app.tracing import traced
 
 from .exceptions import DeviceNotFoundException, DuplicateDeviceError, NotFoundError
 
 logger = logging.getLogger(__name__)
 
 
+# Сортировки списка активов и связи, которые для них присоединяются
+SORTABLE_COLUMNS = {
+    "name": Device.name,
+    "inventory_number": Device.inventory_number,
+    "asset_type": AssetType.name,
+    "device_model": DeviceModel.name,
+    "status": DeviceStatus.name,
+    "location": Location.name,
+    "updated_at": Device.updated_at,
+    "tags": func.min(Tag.name),
+    "price": Device.price,
+    "purchase_date": Device.purchase_date,
+    "employee": Employee.last_name,
+    "supplier": Supplier.name,
+}
+SORT_JOINS = {
+    "asset_type": Device.asset_type,
+    "device_model": Device.device_model,
+    "status": Device.status,
+    "location": Device.location,
+    "employee": Device.employee,
+    "supplier": Device.supplier,
+}
+
+# Справочники форм: запросы без параметров строятся один раз, ключ кэша
+# компиляции у готового запроса вычисляется однократно
+FORM_DICTIONARY_QUERIES = {
+    "asset_types": select(AssetType).order_by(AssetType.name),
+    "device_models": select(DeviceModel).order_by(DeviceModel.name),
+    "device_statuses": select(DeviceStatus).order_by(DeviceStatus.name),
+    "departments": select(Department).order_by(Department.name),
+    "locations": select(Location).order_by(Location.name),
+    "employees": select(Employee).order_by(Employee.last_name),
+    "manufacturers": select(Manufacturer).order_by(Manufacturer.name),
+    "suppliers": select(Supplier).order_by(Supplier.name),
+    "tags": select(Tag).order_by(Tag.name),
+}
+# Версии справочников - ключ кэша фрагментов шаблонов с их <option>
+DICTIONARY_VERSIONS = select(DictionaryVersion.name, DictionaryVersion.version)
+# Скалярные default колонок devices: Core INSERT отправляет None как NULL,
+# поэтому в пакетной вставке значение по умолчанию подставляется явно
+DEVICE_COLUMN_DEFAULTS = {
+    column.name: column.default.arg
+    for column in Device.__table__.columns
+    if column.default is not None and column.default.is_scalar
+}
+# SQLSTATE PostgreSQL
+UNIQUE_VIOLATION = "23505"
+FOREIGN_KEY_VIOLATION = "23503"
+
+
 def _serialize_value(value):
     if isinstance(value, (datetime, date)):
         return value.isoformat()
@@ -56,30 +106,38 @@ class DeviceService:
         """
         # 1. Парсинг и валидация JSON
         dto = await self._parse_agent_data(file)
+        return await self.create_from_report(session, dto, user_id)
+
+    @traced()
+    async def create_from_report(self, session: AsyncSession, dto: ComponentUploadRequest, user_id: int) -> Device:
+        """
+        Создает актив по уже разобранному отчету агента.
+        Используется и HTTP-импортом, и фоновой обработкой очереди (IngestionService).
+        """
         hostname = dto.hostname
 
         # 2. Извлечение ключевых данных
         mb_info, mb_manufacturer, mb_product = self._extract_mb_info(dto.components)
 
-        # 3. Работа со справочниками (Get or Create)
-        manufacturer = await self._get_or_create_manufacturer(session, mb_manufacturer)
-        asset_type = await self._get_or_create_asset_type(session)
-        device_model = await self._get_or_create_device_model(
-            session, mb_product, manufacturer.id, asset_type.id
+        # 3. Работа со справочниками (Get or Create, один upsert на промах кэша)
+        manufacturer_id = await self._get_or_create_manufacturer(session, mb_manufacturer)
+        asset_type_id, prefix = await self._get_or_create_asset_type(session)
+        device_model_id = await self._get_or_create_device_model(
+            session, mb_product, manufacturer_id, asset_type_id
         )
         status = await self._get_default_status(session)
 
         # 4. Создание Устройства
         inventory_number = await self._generate_inventory_number(
-            session, asset_type.prefix or "DEV"
+            session, prefix or "DEV"
         )
 
         new_device = Device(
             name=hostname,
             inventory_number=inventory_number,
             serial_number=mb_info.serial_number if mb_info else None,
-            asset_type_id=asset_type.id,
-            device_model_id=device_model.id,
+            asset_type_id=asset_type_id,
+            device_model_id=device_model_id,
             status_id=status.id,
             location_id=None,
             notes="Автоматически импортировано из агента",
@@ -107,7 +165,11 @@ class DeviceService:
         return new_device
 
     async def _parse_agent_data(self, file: UploadFile) -> ComponentUploadRequest:
-        content = await file.read()
+        return self.parse_agent_report(await file.read())
+
+    @staticmethod
+    def parse_agent_report(content: bytes) -> ComponentUploadRequest:
+        """Разбирает JSON-отчет агента; при ошибке - HTTPException 400."""
         try:
             raw_data = json.loads(content)
             if isinstance(raw_data, list):
@@ -123,50 +185,47 @@ class DeviceService:
         mb_product = mb_info.name if mb_info and mb_info.name else "Generic PC"
         return mb_info, mb_manufacturer, mb_product
 
-    async def _get_or_create_manufacturer(self, session: AsyncSession, name: str) -> Manufacturer:
-        stmt = select(Manufacturer).where(Manufacturer.name == name)
-        m_result = await session.execute(stmt)
-        manufacturer = m_result.scalars().first()
-        if not manufacturer:
-            manufacturer = Manufacturer(name=name)
-            session.add(manufacturer)
-            await session.flush()
-        return manufacturer
+    async def _get_or_create_manufacturer(self, session: AsyncSession, name: str) -> int:
+        manufacturer_id = await get_or_create_id(session, Manufacturer, {"name": name})
+        if manufacturer_id is None:
+            raise HTTPException(status_code=409, detail=f"Не удалось создать производителя '{name}'.")
+        return manufacturer_id
 
     async def _get_or_create_asset_type(
-        self, session: AsyncSession, name: str = "Системный блок", prefix: str = "PC"
-    ) -> AssetType:
-        stmt = select(AssetType).where(or_(AssetType.name == name, AssetType.prefix == prefix))
-        t_result = await session.execute(stmt)
-        candidates = t_result.scalars().all()
-
-        # Приоритет 1: Сопадение по имени
-        asset_type = next((x for x in candidates if x.name == name), None)
-        # Приоритет 2: Сопадение по префиксу
-        if not asset_type:
-            asset_type = next((x for x in candidates if x.prefix == prefix), None)
-
-        if not asset_type:
-            asset_type = AssetType(name=name, prefix=prefix)
-            session.add(asset_type)
-            await session.flush()
-        return asset_type
+        self,
+        session: AsyncSession,
+        name: str = "Системный блок",
+        prefix: str = "PC",
+        slug: str = "system_unit",
+    ) -> tuple[int, str]:
+        # Приоритет 1: Совпадение по имени (или создание нового типа)
+        row = await get_or_create(
+            session,
+            AssetType,
+            {"name": name},
+            defaults={"prefix": prefix, "slug": slug},
+            columns=("id", "prefix"),
+        )
+        # Приоритет 2: Совпадение по префиксу (вставка упёрлась в чужой prefix/slug)
+        if row is None:
+            stmt = select(AssetType.id, AssetType.prefix).where(AssetType.prefix == prefix)
+            row = (await session.execute(stmt)).first()
+        if row is None:
+            raise HTTPException(status_code=409, detail=f"Не удалось создать тип актива '{name}'.")
+        return row[0], row[1]
 
     async def _get_or_create_device_model(
         self, session: AsyncSession, name: str, manufacturer_id: int, asset_type_id: int
-    ) -> DeviceModel:
-        stmt = select(DeviceModel).where(
-            DeviceModel.name == name, DeviceModel.manufacturer_id == manufacturer_id
+    ) -> int:
+        device_model_id = await get_or_create_id(
+            session,
+            DeviceModel,
+            {"name": name, "manufacturer_id": manufacturer_id},
+            defaults={"asset_type_id": asset_type_id},
         )
-        dm_result = await session.execute(stmt)
-        device_model = dm_result.scalars().first()
-        if not device_model:
-            device_model = DeviceModel(
-                name=name, manufacturer_id=manufacturer_id, asset_type_id=asset_type_id
-            )
-            session.add(device_model)
-            await session.flush()
-        return device_model
+        if device_model_id is None:
+            raise HTTPException(status_code=409, detail=f"Не удалось создать модель '{name}'.")
+        return device_model_id
 
     async def _get_default_status(self, session: AsyncSession) -> DeviceStatus:
         stmt = select(DeviceStatus).where(DeviceStatus.name == "На складе")
@@ -185,24 +244,15 @@ class DeviceService:
         return status
 
     async def _generate_inventory_number(self, session: AsyncSession, prefix: str) -> str:
-        date_str = datetime.utcnow().strftime("%Y%m%d")
-        search_prefix = f"{prefix}-{date_str}-"
-        last_device_stmt = (
-            select(Device.inventory_number)
-            .where(Device.inventory_number.like(f"{search_prefix}%"))
-            .order_by(Device.inventory_number.desc())
-            .limit(1)
-        )
-        last_inv_number = (await session.execute(last_device_stmt)).scalar_one_or_none()
-        new_seq = int(last_inv_number.split("-")[-1]) + 1 if last_inv_number else 1
-        return f"{search_prefix}{new_seq:03d}"
+        return await InventoryNumberService.next_number(session, prefix)
 
     async def _save_new_device(self, session: AsyncSession, new_device: Device):
         try:
             session.add(new_device)
             await session.flush()
         except IntegrityError as e:
-            await session.rollback()
+            # Откат оставляем вызывающему коду: отчет может обрабатываться
+            # внутри SAVEPOINT пакета очереди, и полный rollback отменил бы соседние задания
             error_info = str(e.orig) if hasattr(e, 'orig') else str(e)
             if 'serial_number' in error_info:
                 raise HTTPException(
@@ -217,14 +267,10 @@ class DeviceService:
             else:
                 raise HTTPException(status_code=409, detail="Актив с такими данными уже существует.")
 
+    @traced()
     async def get_device_with_relations(self, db: AsyncSession, device_id: int) -> Device | None:
-        # Создаем полиморфную сущность для загрузки всех типов компонентов
-        poly_component = with_polymorphic(
-            Component, [ComponentCPU, ComponentRAM, ComponentStorage, ComponentGPU, ComponentMotherboard]
-        )
-
-        stmt = (
-            select(Device)
+        stmt = lambda_stmt(
+            lambda: select(Device)
             .options(
                 selectinload(Device.asset_type),
                 selectinload(Device.device_model).selectinload(DeviceModel.manufacturer),
@@ -234,18 +280,25 @@ class DeviceService:
                 selectinload(Device.employee),
                 selectinload(Device.tags),
                 selectinload(Device.supplier),
-                selectinload(Device.components.of_type(poly_component)),  # Polymorphic eager load
-                selectinload(Device.component_history),  # Eager load history
+                # Плоская read-модель: один запрос по индексу asset_id вместо
+                # LEFT OUTER JOIN по всем таблицам подтипов компонентов
+                selectinload(Device.components_flat),
+                # История компонентов не загружается целиком: см. ComponentService.get_history
             )
             .where(Device.id == device_id)
         )
         result = await db.execute(stmt)
         return result.scalar_one_or_none()
 
-    def _apply_filters(self, query, filters):
+    def _apply_filters(self, stmt: StatementLambdaElement, filters: dict) -> StatementLambdaElement:
+        """
+        Условия фильтров списка. Каждое условие - отдельная лямбда, значения
+        фильтров из замыкания становятся параметрами: ключ кэша запроса зависит
+        от набора фильтров, а не от их значений.
+        """
         if filters.get("search"):
             search_term = f"%{filters['search']}%"
-            query = query.filter(
+            stmt += lambda s: s.where(
                 or_(
                     Device.name.ilike(search_term),
                     Device.inventory_number.ilike(search_term),
@@ -254,64 +307,50 @@ class DeviceService:
                 )
             )
 
-        if filters.get("asset_type_id"):
-            query = query.filter(Device.asset_type_id == filters["asset_type_id"])
-        if filters.get("status_id"):
-            query = query.filter(Device.status_id == filters["status_id"])
-        if filters.get("department_id"):
-            query = query.filter(Device.department_id == filters["department_id"])
-        if filters.get("location_id"):
-            query = query.filter(Device.location_id == filters["location_id"])
-        if filters.get("manufacturer_id"):
-            query = query.join(Device.device_model).filter(DeviceModel.manufacturer_id == filters["manufacturer_id"])
-        if filters.get("employee_id"):
-            query = query.filter(Device.employee_id == filters["employee_id"])
-        if filters.get("supplier_id"):
-            query = query.filter(Device.supplier_id == filters["supplier_id"])
-        if filters.get("tag_id"):
-            query = query.join(Device.tags).filter(Tag.id == filters["tag_id"])
-
-        return query
-
-    def _apply_sorting(self, query, sort_by, sort_order):
-        sortable_columns = {
-            "name": Device.name,
-            "inventory_number": Device.inventory_number,
-            "asset_type": AssetType.name,
-            "device_model": DeviceModel.name,
-            "status": DeviceStatus.name,
-            "location": Location.name,
-            "updated_at": Device.updated_at,
-            "tags": func.min(Tag.name),
-            "price": Device.price,
-            "purchase_date": Device.purchase_date,
-            "employee": Employee.last_name,
-            "supplier": Supplier.name,
-        }
-
-        if sort_by and sort_by in sortable_columns:
-            column_to_sort = sortable_columns[sort_by]
-            if sort_by == "asset_type":
-                query = query.join(Device.asset_type, isouter=True)
-            elif sort_by == "device_model":
-                query = query.join(Device.device_model, isouter=True)
-            elif sort_by == "status":
-                query = query.join(Device.status, isouter=True)
-            elif sort_by == "location":
-                query = query.join(Device.location, isouter=True)
-            elif sort_by == "tags":
-                query = query.outerjoin(Device.tags).group_by(Device.id)
-            elif sort_by == "employee":
-                query = query.join(Device.employee, isouter=True)
-            elif sort_by == "supplier":
-                query = query.join(Device.supplier, isouter=True)
-
-            query = query.order_by(column_to_sort.desc() if sort_order == "desc" else column_to_sort.asc())
-        else:
-            query = query.order_by(Device.id.desc())
-
-        return query
-
+        asset_type_id = filters.get("asset_type_id")
+        if asset_type_id:
+            stmt += lambda s: s.where(Device.asset_type_id == asset_type_id)
+        status_id = filters.get("status_id")
+        if status_id:
+            stmt += lambda s: s.where(Device.status_id == status_id)
+        department_id = filters.get("department_id")
+        if department_id:
+            stmt += lambda s: s.where(Device.department_id == department_id)
+        location_id = filters.get("location_id")
+        if location_id:
+            stmt += lambda s: s.where(Device.location_id == location_id)
+        manufacturer_id = filters.get("manufacturer_id")
+        if manufacturer_id:
+            stmt += lambda s: s.join(Device.device_model).where(DeviceModel.manufacturer_id == manufacturer_id)
+        employee_id = filters.get("employee_id")
+        if employee_id:
+            stmt += lambda s: s.where(Device.employee_id == employee_id)
+        supplier_id = filters.get("supplier_id")
+        if supplier_id:
+            stmt += lambda s: s.where(Device.supplier_id == supplier_id)
+        tag_id = filters.get("tag_id")
+        if tag_id:
+            stmt += lambda s: s.join(Device.tags).where(Tag.id == tag_id)
+
+        return stmt
+
+    def _apply_sorting(
+        self, stmt: StatementLambdaElement, sort_by: str | None, sort_order: str
+    ) -> StatementLambdaElement:
+        if sort_by not in SORTABLE_COLUMNS:
+            return stmt + (lambda s: s.order_by(Device.id.desc()))
+
+        if sort_by == "tags":
+            stmt += lambda s: s.outerjoin(Device.tags).group_by(Device.id)
+        elif sort_by in SORT_JOINS:
+            relationship = SORT_JOINS[sort_by]
+            stmt += lambda s: s.outerjoin(relationship)
+
+        column = SORTABLE_COLUMNS[sort_by]
+        order = column.desc() if sort_order == "desc" else column.asc()
+        return stmt + (lambda s: s.order_by(order))
+
+    @traced()
     async def get_devices_with_filters(
         self,
         db: AsyncSession,
@@ -321,60 +360,44 @@ class DeviceService:
         sort_order: str = "asc",
         **filters,
     ):
-        query = select(Device).options(
-            selectinload(Device.asset_type),
-            selectinload(Device.device_model).options(
-                selectinload(DeviceModel.manufacturer),
-                selectinload(DeviceModel.asset_type),
-            ),
-            selectinload(Device.status),
-            selectinload(Device.department),
-            selectinload(Device.location),
-            selectinload(Device.employee),
-            selectinload(Device.tags),
-            selectinload(Device.supplier),
-        )
-
-        query = self._apply_filters(query, filters)
-
-        count_query = select(func.count()).select_from(query.subquery())
-        total_devices = (await db.execute(count_query)).scalar_one()
+        count_stmt = self._apply_filters(lambda_stmt(lambda: select(func.count()).select_from(Device)), filters)
+        total_devices = (await db.execute(count_stmt)).scalar_one()
 
-        query = self._apply_sorting(query, sort_by, sort_order)
+        stmt = lambda_stmt(
+            lambda: select(Device).options(
+                selectinload(Device.asset_type),
+                selectinload(Device.device_model).options(
+                    selectinload(DeviceModel.manufacturer),
+                    selectinload(DeviceModel.asset_type),
+                ),
+                selectinload(Device.status),
+                selectinload(Device.department),
+                selectinload(Device.location),
+                selectinload(Device.employee),
+                selectinload(Device.tags),
+                selectinload(Device.supplier),
+            )
+        )
+        stmt = self._apply_filters(stmt, filters)
+        stmt = self._apply_sorting(stmt, sort_by, sort_order)
 
-        query = query.offset((page - 1) * page_size).limit(page_size)
-        result = await db.execute(query)
+        offset = (page - 1) * page_size
+        stmt += lambda s: s.offset(offset).limit(page_size)
+        result = await db.execute(stmt)
         paginated_devices = result.scalars().all()
         return paginated_devices, total_devices
 
+    @traced()
     async def get_all_dictionaries_for_form(self, db: AsyncSession) -> dict:
-        asset_types_res = await db.execute(select(AssetType).order_by(AssetType.name))
-        device_models_res = await db.execute(select(DeviceModel).order_by(DeviceModel.name))
-        device_statuses_res = await db.execute(select(DeviceStatus).order_by(DeviceStatus.name))
-        departments_res = await db.execute(select(Department).order_by(Department.name))
-        locations_res = await db.execute(select(Location).order_by(Location.name))
-        employees_res = await db.execute(select(Employee).order_by(Employee.last_name))
-        manufacturers_res = await db.execute(select(Manufacturer).order_by(Manufacturer.name))
-        suppliers_res = await db.execute(select(Supplier).order_by(Supplier.name))
-        tags_res = await db.execute(select(Tag).order_by(Tag.name))
-
-        return {
-            "asset_types": asset_types_res.scalars().all(),
-            "device_models": device_models_res.scalars().all(),
-            "device_statuses": device_statuses_res.scalars().all(),
-            "departments": departments_res.scalars().all(),
-            "locations": locations_res.scalars().all(),
-            "employees": employees_res.scalars().all(),
-            "manufacturers": manufacturers_res.scalars().all(),
-            "suppliers": suppliers_res.scalars().all(),
-            "tags": tags_res.scalars().all(),
+        # Версии читаются до справочников: изменение, зафиксированное между запросами,
+        # попадет в кэш под старой версией и перерисуется при следующем запросе.
+        # В обратном порядке старая разметка закэшировалась бы под новой версией.
+        versions = dict((await db.execute(DICTIONARY_VERSIONS)).tuples().all())
+        dictionaries = {
+            key: (await db.execute(stmt)).scalars().all() for key, stmt in FORM_DICTIONARY_QUERIES.items()
         }
-
-    # ... остальные методы без изменений ...
-    async def get_all_tags(self, db: AsyncSession) -> list[Tag]:
-        stmt = select(Tag).order_by(Tag.name)
-        result = await db.execute(stmt)
-        return result.scalars().all()
+        dictionaries["dictionary_versions"] = versions
+        return dictionaries
 
     def _calculate_device_diff(self, db_device: Device, update_data: AssetUpdate) -> dict:
         old_data_schema = AssetUpdate.model_validate(db_device, from_attributes=True)
@@ -412,6 +435,7 @@ class DeviceService:
         for key, value in update_dict_simple_fields.items():
             setattr(db_device, key, value)
 
+    @traced()
     async def update_device_with_audit(
         self, db: AsyncSession, device_id: int, update_data: AssetUpdate, user_id: int
     ) -> Device:
@@ -463,6 +487,7 @@ class DeviceService:
 
         return await self.get_device_with_relations(db, db_device.id)
 
+    @traced()
     async def get_dashboard_stats(self, db: AsyncSession) -> dict:
         try:
             total_devices_stmt = select(func.count(Device.id))
@@ -496,24 +521,14 @@ class DeviceService:
             logger.error(f"Database error in get_dashboard_stats: {e}", exc_info=True)
             raise e
 
+    @traced()
     async def create_device(self, db: AsyncSession, asset_data: AssetCreate, user_id: int) -> Device:
         try:
             asset_type = await db.get(AssetType, asset_data.asset_type_id)
             if not asset_type:
                 raise NotFoundError(f"Тип актива с id={asset_data.asset_type_id} не найден.")
 
-            prefix = asset_type.prefix
-            date_str = datetime.utcnow().strftime("%Y%m%d")
-            search_prefix = f"{prefix}-{date_str}-"
-            last_device_stmt = (
-                select(Device.inventory_number)
-                .where(Device.inventory_number.like(f"{search_prefix}%"))
-                .order_by(Device.inventory_number.desc())
-                .limit(1)
-            )
-            last_inv_number = (await db.execute(last_device_stmt)).scalar_one_or_none()
-            new_seq = int(last_inv_number.split("-")[-1]) + 1 if last_inv_number else 1
-            inventory_number = f"{search_prefix}{new_seq:03d}"
+            inventory_number = await self._generate_inventory_number(db, asset_type.prefix)
 
             tags = []
             if asset_data.tag_ids:
@@ -560,6 +575,160 @@ class DeviceService:
 
         return await self.get_device_with_relations(db, device.id)
 
+    @traced()
+    async def bulk_create_devices(
+        self, db: AsyncSession, assets: list[AssetCreate], user_id: int
+    ) -> list[tuple[int, str]]:
+        """
+        Пакетно создает активы в одной транзакции.
+        Пакет создается целиком или не создается вовсе.
+
+        Returns:
+            Список (id, inventory_number) в порядке входного списка.
+        """
+        if not assets:
+            return []
+
+        self._check_bulk_duplicates(assets)
+        try:
+            created = await self.insert_devices(db, assets, user_id)
+            await db.commit()
+        except IntegrityError as e:
+            await db.rollback()
+            error_info = str(e.orig).lower() if e.orig else str(e).lower()
+            sqlstate = getattr(e.orig, "sqlstate", None)
+            if sqlstate == FOREIGN_KEY_VIOLATION:
+                raise NotFoundError(f"Связанная запись не найдена. Детали: {error_info}")
+            if sqlstate != UNIQUE_VIOLATION:
+                # NOT NULL, CHECK и прочее - ошибка данных, а не дубликат
+                logger.error(f"Ошибка целостности при пакетном создании устройств: {e}", exc_info=True)
+                raise
+            if 'serial_number' in error_info:
+                raise DuplicateDeviceError("Актив с таким серийным номером уже существует.")
+            elif 'mac_address' in error_info:
+                raise DuplicateDeviceError("Актив с таким MAC-адресом уже существует.")
+            elif 'inventory_number' in error_info:
+                raise DuplicateDeviceError("Актив с таким инвентарным номером уже существует.")
+            else:
+                raise DuplicateDeviceError(f"Актив с такими данными уже существует. Детали: {error_info}")
+        except SQLAlchemyError as e:
+            await db.rollback()
+            logger.error(f"Ошибка при пакетном создании устройств: {e}", exc_info=True)
+            raise e
+
+        return created
+
+    @traced()
+    async def insert_devices(
+        self,
+        db: AsyncSession,
+        assets: list[AssetCreate],
+        user_id: int,
+        source: str = "bulk_create",
+        extra: list[dict] | None = None,
+    ) -> list[tuple[int, str]]:
+        """
+        Множественная вставка активов без фиксации транзакции.
+
+        Справочники проверяются одним запросом на таблицу, инвентарные номера
+        резервируются блоком на каждый префикс (указанный в активе номер
+        сохраняется), а устройства, связи с тегами и записи аудита вставляются
+        многострочными INSERT.
+        Число запросов не зависит от размера пакета (с точностью до страниц
+        insertmanyvalues по 1000 строк).
+
+        Args:
+            source: Источник для записи аудита
+            extra: Дополнительные колонки devices для каждого актива
+                (одинаковый набор ключей, например legacy_inventory_number)
+        """
+        if not assets:
+            return []
+
+        type_ids = {asset.asset_type_id for asset in assets}
+        prefixes = dict((await db.execute(
+            select(AssetType.id, AssetType.prefix).where(AssetType.id.in_(type_ids))
+        )).all())
+        missing = type_ids - prefixes.keys()
+        if missing:
+            raise NotFoundError(f"Типы активов не найдены: {sorted(missing)}.")
+
+        # Несуществующие теги пропускаются, как и в create_device
+        tag_ids = {tag_id for asset in assets for tag_id in asset.tag_ids}
+        existing_tags = set()
+        if tag_ids:
+            existing_tags = set((await db.scalars(select(Tag.id).where(Tag.id.in_(tag_ids)))).all())
+
+        # Один диапазон номеров на префикс - для активов без своего номера
+        by_prefix: dict[str, list[int]] = {}
+        inventory_numbers: list[str] = [asset.inventory_number or "" for asset in assets]
+        for index, asset in enumerate(assets):
+            if not asset.inventory_number:
+                by_prefix.setdefault(prefixes[asset.asset_type_id], []).append(index)
+        for prefix, indexes in by_prefix.items():
+            numbers = await InventoryNumberService.reserve(db, prefix, count=len(indexes))
+            for index, number in zip(indexes, numbers, strict=True):
+                inventory_numbers[index] = number
+
+        rows = []
+        for index, (asset, number) in enumerate(zip(assets, inventory_numbers, strict=True)):
+            row = asset.model_dump(exclude={"tag_ids", "manufacturer_id"})
+            row["inventory_number"] = number
+            for column, default in DEVICE_COLUMN_DEFAULTS.items():
+                if column in row and row[column] is None:
+                    row[column] = default
+            if extra is not None:
+                row.update(extra[index])
+            rows.append(row)
+
+        stmt = insert(Device.__table__).returning(Device.__table__.c.id, sort_by_parameter_order=True)
+        device_ids = list((await db.execute(stmt, rows)).scalars())
+
+        tag_rows = [
+            {"device_id": device_id, "tag_id": tag_id}
+            for device_id, asset in zip(device_ids, assets, strict=True)
+            for tag_id in dict.fromkeys(asset.tag_ids)
+            if tag_id in existing_tags
+        ]
+        if tag_rows:
+            await db.execute(insert(device_tags_table), tag_rows)
+
+        await db.execute(insert(ActionLog.__table__), [
+            {
+                "user_id": user_id,
+                "action_type": "create",
+                "entity_type": "Device",
+                "entity_id": device_id,
+                "details": {
+                    "inventory_number": row["inventory_number"],
+                    "name": row["name"],
+                    "source": source,
+                },
+            }
+            for device_id, row in zip(device_ids, rows, strict=True)
+        ])
+
+        return list(zip(device_ids, inventory_numbers, strict=True))
+
+    @staticmethod
+    def _check_bulk_duplicates(assets: list[AssetCreate]) -> None:
+        """Повторы уникальных полей внутри пакета - до обращения к БД."""
+        for field, label in (
+            ("inventory_number", "инвентарный номер"),
+            ("serial_number", "серийный номер"),
+            ("mac_address", "MAC-адрес"),
+        ):
+            seen: dict[str, int] = {}
+            for index, asset in enumerate(assets):
+                value = getattr(asset, field)
+                if value is None:
+                    continue
+                if value in seen:
+                    raise DuplicateDeviceError(
+                        f"Повторяющийся {label} '{value}' в строках {seen[value] + 1} и {index + 1}."
+                    )
+                seen[value] = index
+
     async def bulk_delete_devices(self, db: AsyncSession, device_ids: list[int], user_id: int) -> tuple[int, list]:
         errors = []
         if not device_ids:
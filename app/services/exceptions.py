@@ -27,3 +27,15 @@ class DuplicateDeviceError(BaseServiceException):
 
 class SupplierDeletionError(DeletionError):
     """Исключение при невозможности удаления поставщика."""
+
+
+class AgentProtocolError(BaseServiceException):
+    """Исключение: неподдерживаемая версия или некорректный отчёт агента."""
+
+
+class AgentStateConflictError(BaseServiceException):
+    """Исключение: дельта агента построена от устаревшего состояния - нужен полный отчёт."""
+
+
+class AssetImportError(BaseServiceException):
+    """Исключение: файл импорта активов не читается или не содержит обязательных колонок."""
@@ -0,0 +1,538 @@
+# app/services/fleet_generator_service.py
+"""
+Генератор синтетического парка для нагрузочных тестов и проверки планов запросов.
+
+Данные строятся порциями по CHUNK_DEVICES устройств и загружаются через COPY
+(asyncpg copy_records_to_table) в обход ORM: миллион устройств с компонентами
+и журналом загружается за минуты, а память ограничена одной порцией.
+
+Результат детерминирован: каждая порция использует собственные генераторы
+random.Random, инициализированные строкой "<seed>:<порция>:<поток>". Один и тот же
+seed на той же базе справочников даёт побайтно те же строки, а потоки независимы -
+изменение числа компонентов или записей журнала не меняет сами устройства.
+Распределения (модели, статусы, теги, локации) - ранговые (закон Ципфа): несколько
+значений встречаются часто, длинный хвост - редко, как в реальном учете.
+"""
+import asyncio
+import json
+import math
+import random
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+from datetime import UTC, date, datetime, time, timedelta
+from decimal import Decimal
+from itertools import accumulate
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import (
+    ActionLog,
+    AssetType,
+    Component,
+    Department,
+    Device,
+    DeviceModel,
+    DeviceStatus,
+    Employee,
+    Location,
+    Manufacturer,
+    Supplier,
+    Tag,
+    User,
+)
+from app.services.component_service import COMPONENT_TYPES, FLAT_COLUMNS
+from app.services.exceptions import NotFoundError
+
+FLEET_SOURCE = 'synthetic'
+
+# Устройств в одной порции COPY. Входит в "формулу" данных (по ней
+# инициализируются генераторы), поэтому менять её - значит менять набор данных.
+CHUNK_DEVICES = 2000
+
+# Точка отсчета дат: не зависит от дня запуска
+BASE_DATE = date(2026, 1, 1)
+PURCHASE_SPAN_DAYS = 8 * 365
+
+# Доли статусов по slug из initial_data.yaml; прочие статусы - по STATUS_OTHER_SHARE
+STATUS_SHARES = {'in_use': 70, 'in_stock': 15, 'write_off': 10, 'repair': 5}
+STATUS_OTHER_SHARE = 2
+# Сотрудник закреплен только за устройствами в эксплуатации
+STATUS_IN_USE = 'in_use'
+
+# Число тегов на устройстве: 0, 1, 2, 3
+TAG_COUNT_WEIGHTS = (40, 35, 18, 7)
+
+# Подтип компонента (после платы и процессора) и его вес
+EXTRA_COMPONENT_WEIGHTS = {'ram': 50, 'storage': 35, 'gpu': 15}
+
+
+def zipf_weights(count: int, exponent: float) -> list[float]:
+    """Накопленные веса рангового распределения для random.choices(cum_weights=...)."""
+    return list(accumulate(1 / (rank ** exponent) for rank in range(1, count + 1)))
+
+
+MOTHERBOARDS = [
+    ('MSI', 'PRO B660M-A'),
+    ('ASUS', 'PRIME H610M-E'),
+    ('Gigabyte', 'B550M DS3H'),
+    ('ASRock', 'H510M-HDV'),
+    ('Supermicro', 'X12STH-F'),
+]
+# (производитель, модель, ядра, потоки, базовая частота)
+CPUS = [
+    ('Intel', 'Core i5-12400', 6, 12, 2500),
+    ('Intel', 'Core i3-10100', 4, 8, 3600),
+    ('AMD', 'Ryzen 5 5600G', 6, 12, 3900),
+    ('Intel', 'Core i7-12700', 12, 20, 2100),
+    ('AMD', 'Ryzen 7 5700X', 8, 16, 3400),
+    ('Intel', 'Xeon E-2336', 6, 12, 2900),
+]
+RAM_VENDORS = ['Kingston', 'Samsung', 'Crucial', 'SK Hynix']
+RAM_SIZES_MB = [8192, 16384, 4096, 32768]
+RAM_SPEEDS_MHZ = [3200, 2666, 4800]
+# (тип, интерфейс, объемы, ГБ)
+STORAGES = [
+    ('SSD', 'SATA', [512, 256, 1024]),
+    ('NVMe', 'PCIe', [512, 1024, 256, 2048]),
+    ('HDD', 'SATA', [1000, 2000, 500]),
+]
+STORAGE_VENDORS = ['Samsung', 'WD', 'Kingston', 'Seagate', 'Crucial']
+# (производитель, модель, память, МБ)
+GPUS = [
+    ('Intel', 'UHD Graphics 730', None),
+    ('NVIDIA', 'GeForce GT 1030', 2048),
+    ('NVIDIA', 'GeForce RTX 3060', 12288),
+    ('AMD', 'Radeon RX 6600', 8192),
+]
+
+_MOTHERBOARD_WEIGHTS = zipf_weights(len(MOTHERBOARDS), 1.0)
+_CPU_WEIGHTS = zipf_weights(len(CPUS), 1.0)
+_RAM_SIZE_WEIGHTS = zipf_weights(len(RAM_SIZES_MB), 1.0)
+_RAM_SPEED_WEIGHTS = zipf_weights(len(RAM_SPEEDS_MHZ), 1.0)
+_GPU_WEIGHTS = zipf_weights(len(GPUS), 1.0)
+
+# Синтетический каталог для пустых справочников моделей, тегов и сотрудников
+CATALOG_MANUFACTURERS = ['Dell', 'HP', 'Lenovo', 'Acer', 'Huawei']
+CATALOG_MODELS_PER_TYPE = 4
+CATALOG_TAGS = [
+    'Критичный', 'Удаленная работа', 'Аренда', 'Гарантия продлена', 'Лицензия Windows',
+    'VIP', 'Учебный класс', 'На списание', 'Резерв ИТ', 'Проверено',
+]
+CATALOG_EMPLOYEES = 500
+LAST_NAMES = ['Иванов', 'Смирнов', 'Кузнецов', 'Попов', 'Васильев', 'Петров', 'Соколов', 'Михайлов']
+FIRST_NAMES = ['Александр', 'Дмитрий', 'Сергей', 'Андрей', 'Алексей', 'Максим', 'Иван', 'Павел']
+
+# Поля, изменения которых пишутся в синтетический журнал
+AUDIT_FIELDS = ('status_id', 'location_id', 'employee_id')
+
+DEVICE_COLUMNS = (
+    'id', 'name', 'inventory_number', 'serial_number', 'mac_address', 'ip_address',
+    'source', 'purchase_date', 'warranty_end_date', 'price', 'expected_lifespan_years',
+    'device_model_id', 'asset_type_id', 'status_id', 'department_id', 'location_id',
+    'employee_id', 'supplier_id', 'created_at', 'updated_at',
+)
+DEVICE_TAG_COLUMNS = ('device_id', 'tag_id')
+COMPONENT_COLUMNS = (
+    'id', 'asset_id', 'component_type', 'name', 'serial_number', 'manufacturer',
+    'created_at', 'updated_at',
+)
+FLAT_TABLE_COLUMNS = (
+    'id', 'asset_id', 'component_type', 'name', 'serial_number', 'manufacturer',
+    *FLAT_COLUMNS, 'spec',
+)
+AUDIT_COLUMNS = (
+    'id', 'timestamp', 'user_id', 'action_type', 'entity_type', 'entity_id', 'details',
+    'created_at', 'updated_at',
+)
+
+
+def _json_id(value: int | None) -> str:
+    return 'null' if value is None else str(value)
+
+
+@dataclass(frozen=True)
+class FleetConfig:
+    devices: int = 10_000
+    components_per_device: float = 10
+    audit_per_device: float = 50
+    seed: int = 1
+
+
+@dataclass
+class FleetDictionaries:
+    """Идентификаторы справочников в стабильном порядке (по id)."""
+
+    models: list[tuple[int, int, str]]  # (id, asset_type_id, name)
+    statuses: list[tuple[int, str | None]]  # (id, slug)
+    locations: list[int] = field(default_factory=list)
+    departments: list[int] = field(default_factory=list)
+    employees: list[int] = field(default_factory=list)
+    suppliers: list[int] = field(default_factory=list)
+    tags: list[int] = field(default_factory=list)
+    users: list[int] = field(default_factory=list)
+
+    @classmethod
+    async def load(cls, session: AsyncSession) -> 'FleetDictionaries':
+        async def ids(model) -> list[int]:
+            return list((await session.scalars(select(model.id).order_by(model.id))).all())
+
+        models = (await session.execute(
+            select(DeviceModel.id, DeviceModel.asset_type_id, DeviceModel.name).order_by(DeviceModel.id)
+        )).all()
+        statuses = (await session.execute(
+            select(DeviceStatus.id, DeviceStatus.slug).order_by(DeviceStatus.id)
+        )).all()
+        if not models or not statuses:
+            raise NotFoundError('Справочники пусты: сначала выполните make init-data')
+        return cls(
+            models=[tuple(row) for row in models],
+            statuses=[tuple(row) for row in statuses],
+            locations=await ids(Location),
+            departments=await ids(Department),
+            employees=await ids(Employee),
+            suppliers=await ids(Supplier),
+            tags=await ids(Tag),
+            users=await ids(User),
+        )
+
+
+@dataclass
+class FleetChunk:
+    """Строки одной порции в порядке колонок соответствующих *_COLUMNS."""
+
+    devices: list[tuple] = field(default_factory=list)
+    device_tags: list[tuple] = field(default_factory=list)
+    components: list[tuple] = field(default_factory=list)
+    subtypes: dict[str, list[tuple]] = field(
+        default_factory=lambda: {component_type: [] for component_type in COMPONENT_TYPES}
+    )
+    flat: list[tuple] = field(default_factory=list)
+    audit: list[tuple] = field(default_factory=list)
+
+    def tables(self) -> list[tuple[str, Sequence[str], list[tuple]]]:
+        """(таблица, колонки, строки) в порядке загрузки с учетом внешних ключей."""
+        tables = [
+            ('devices', DEVICE_COLUMNS, self.devices),
+            ('device_tags', DEVICE_TAG_COLUMNS, self.device_tags),
+            ('components', COMPONENT_COLUMNS, self.components),
+        ]
+        for component_type, (model, spec_fields) in COMPONENT_TYPES.items():
+            tables.append((model.__tablename__, ('id', *spec_fields), self.subtypes[component_type]))
+        tables.append(('component_flat', FLAT_TABLE_COLUMNS, self.flat))
+        tables.append(('actionlog', AUDIT_COLUMNS, self.audit))
+        return tables
+
+
+@dataclass
+class FleetStats:
+    devices: int = 0
+    device_tags: int = 0
+    components: int = 0
+    audit: int = 0
+
+
+class FleetBuilder:
+    """Чистое построение строк порции: без обращений к БД, только из seed и справочников."""
+
+    def __init__(self, config: FleetConfig, dictionaries: FleetDictionaries):
+        self.config = config
+        self.dictionaries = dictionaries
+        self._model_weights = zipf_weights(len(dictionaries.models), 1.1)
+        self._status_ids = [status_id for status_id, _ in dictionaries.statuses]
+        self._status_weights = list(accumulate(
+            STATUS_SHARES.get(slug, STATUS_OTHER_SHARE) for _, slug in dictionaries.statuses
+        ))
+        self._in_use = {status_id for status_id, slug in dictionaries.statuses if slug == STATUS_IN_USE}
+        self._location_weights = zipf_weights(len(dictionaries.locations), 0.8)
+        self._department_weights = zipf_weights(len(dictionaries.departments), 0.8)
+        self._tag_weights = zipf_weights(len(dictionaries.tags), 1.2)
+        self._user_weights = zipf_weights(len(dictionaries.users), 1.5)
+
+    def _rng(self, chunk: int, stream: str) -> random.Random:
+        return random.Random(f'{self.config.seed}:{chunk}:{stream}')
+
+    @staticmethod
+    def _pick(rng: random.Random, values: list, weights: list[float], empty_share: float = 0.0):
+        if not values or (empty_share and rng.random() < empty_share):
+            return None
+        return rng.choices(values, cum_weights=weights)[0]
+
+    @staticmethod
+    def _count(rng: random.Random, mean: float) -> int:
+        """Количество со средним mean: равномерно на [0, 2*mean]."""
+        return rng.randint(0, round(2 * mean)) if mean > 0 else 0
+
+    def build_chunk(self, chunk: int, first_device_id: int, count: int,
+                    first_component_id: int, first_audit_id: int) -> FleetChunk:
+        rows = FleetChunk()
+        purchases = self._build_devices(rows, chunk, first_device_id, count)
+        self._build_components(rows, chunk, purchases, first_component_id)
+        self._build_audit(rows, chunk, purchases, first_audit_id)
+        return rows
+
+    def _build_devices(self, rows: FleetChunk, chunk: int, first_id: int, count: int) -> list[tuple]:
+        rng = self._rng(chunk, 'devices')
+        d = self.dictionaries
+        seed = self.config.seed
+        purchases = []
+        for device_id in range(first_id, first_id + count):
+            model_id, asset_type_id, model_name = rng.choices(d.models, cum_weights=self._model_weights)[0]
+            purchase_date = BASE_DATE - timedelta(days=rng.randint(1, PURCHASE_SPAN_DAYS))
+            created_at = datetime.combine(purchase_date, time(9), tzinfo=UTC)
+            price = min(rng.lognormvariate(math.log(40_000), 0.8), 9_999_999)
+            status_id = rng.choices(self._status_ids, cum_weights=self._status_weights)[0]
+            location_id = self._pick(rng, d.locations, self._location_weights, 0.05)
+            in_use = status_id in self._in_use
+            employee_id = rng.choice(d.employees) if d.employees and in_use and rng.random() < 0.9 else None
+            rows.devices.append((
+                device_id,
+                f'{model_name} {device_id}',
+                f'SYN-{seed}-{device_id:08d}',
+                f'SYN{seed}S{device_id:09d}',
+                '02:' + ':'.join(f'{(device_id >> shift) & 0xFF:02x}' for shift in (32, 24, 16, 8, 0)),
+                f'10.{(device_id >> 16) & 0xFF}.{(device_id >> 8) & 0xFF}.{device_id & 0xFF}',
+                FLEET_SOURCE,
+                purchase_date,
+                purchase_date + timedelta(days=365 * rng.randint(1, 3)),
+                Decimal(f'{price:.2f}'),
+                rng.randint(3, 7),
+                model_id,
+                asset_type_id,
+                status_id,
+                self._pick(rng, d.departments, self._department_weights, 0.1),
+                location_id,
+                employee_id,
+                rng.choice(d.suppliers) if d.suppliers and rng.random() < 0.8 else None,
+                created_at,
+                created_at,
+            ))
+            if d.tags:
+                tag_count = rng.choices(range(len(TAG_COUNT_WEIGHTS)), weights=TAG_COUNT_WEIGHTS)[0]
+                picked = rng.choices(d.tags, cum_weights=self._tag_weights, k=tag_count)
+                rows.device_tags.extend((device_id, tag_id) for tag_id in sorted(set(picked)))
+            purchases.append((device_id, created_at, status_id, location_id, employee_id))
+        return purchases
+
+    def _build_components(self, rows: FleetChunk, chunk: int, purchases: list[tuple], next_id: int) -> None:
+        rng = self._rng(chunk, 'components')
+        extra_types = list(EXTRA_COMPONENT_WEIGHTS)
+        extra_weights = list(EXTRA_COMPONENT_WEIGHTS.values())
+        generators: dict[str, Callable[[random.Random], tuple[str | None, str, dict]]] = {
+            'motherboard': self._motherboard,
+            'cpu': self._cpu,
+            'ram': self._ram,
+            'storage': self._storage,
+            'gpu': self._gpu,
+        }
+        for device_id, created_at, *_ in purchases:
+            total = self._count(rng, self.config.components_per_device)
+            for index in range(total):
+                if index < 2:
+                    component_type = ('motherboard', 'cpu')[index]
+                else:
+                    component_type = rng.choices(extra_types, weights=extra_weights)[0]
+                manufacturer, name, spec = generators[component_type](rng)
+                serial = f'SYN{self.config.seed}C{next_id:010d}'
+                rows.components.append(
+                    (next_id, device_id, component_type, name, serial, manufacturer, created_at, created_at)
+                )
+                _, spec_fields = COMPONENT_TYPES[component_type]
+                rows.subtypes[component_type].append((next_id, *(spec[f] for f in spec_fields)))
+                rows.flat.append((
+                    next_id, device_id, component_type, name, serial, manufacturer,
+                    *(spec.get(column) for column in FLAT_COLUMNS),
+                    json.dumps(spec, ensure_ascii=False),
+                ))
+                next_id += 1
+
+    @staticmethod
+    def _motherboard(rng: random.Random) -> tuple[str | None, str, dict]:
+        manufacturer, name = rng.choices(MOTHERBOARDS, cum_weights=_MOTHERBOARD_WEIGHTS)[0]
+        return manufacturer, name, {}
+
+    @staticmethod
+    def _cpu(rng: random.Random) -> tuple[str | None, str, dict]:
+        manufacturer, name, cores, threads, clock = rng.choices(CPUS, cum_weights=_CPU_WEIGHTS)[0]
+        return manufacturer, name, {'cores': cores, 'threads': threads, 'base_clock_mhz': clock}
+
+    @staticmethod
+    def _ram(rng: random.Random) -> tuple[str | None, str, dict]:
+        size_mb = rng.choices(RAM_SIZES_MB, cum_weights=_RAM_SIZE_WEIGHTS)[0]
+        speed_mhz = rng.choices(RAM_SPEEDS_MHZ, cum_weights=_RAM_SPEED_WEIGHTS)[0]
+        form_factor = 'SO-DIMM' if rng.random() < 0.3 else 'DIMM'
+        name = f'DDR{5 if speed_mhz >= 4800 else 4}-{speed_mhz} {size_mb // 1024}GB'
+        spec = {'size_mb': size_mb, 'speed_mhz': speed_mhz, 'form_factor': form_factor}
+        return rng.choice(RAM_VENDORS), name, spec
+
+    @staticmethod
+    def _storage(rng: random.Random) -> tuple[str | None, str, dict]:
+        type_label, interface, sizes = rng.choices(STORAGES, weights=(45, 40, 15))[0]
+        capacity_gb = rng.choices(sizes, cum_weights=zipf_weights(len(sizes), 1.0))[0]
+        spec = {'type_label': type_label, 'capacity_gb': capacity_gb, 'interface': interface}
+        return rng.choice(STORAGE_VENDORS), f'{type_label} {capacity_gb}GB', spec
+
+    @staticmethod
+    def _gpu(rng: random.Random) -> tuple[str | None, str, dict]:
+        manufacturer, name, memory_mb = rng.choices(GPUS, cum_weights=_GPU_WEIGHTS)[0]
+        return manufacturer, name, {'memory_mb': memory_mb}
+
+    def _build_audit(self, rows: FleetChunk, chunk: int, purchases: list[tuple], next_id: int) -> None:
+        rng = self._rng(chunk, 'audit')
+        d = self.dictionaries
+        end = datetime.combine(BASE_DATE, time(), tzinfo=UTC)
+        for device_id, created_at, *current in purchases:
+            total = self._count(rng, self.config.audit_per_device)
+            if not total:
+                continue
+            state = dict(zip(AUDIT_FIELDS, current, strict=True))
+            span = int((end - created_at).total_seconds())
+            offsets = sorted(rng.randrange(span) for _ in range(total - 1))
+            # details собирается форматированием строки: json.dumps на десятках
+            # миллионов записей - основная часть времени генерации журнала
+            events = [(created_at, 'create', (
+                f'{{"inventory_number": "SYN-{self.config.seed}-{device_id:08d}", "source": "{FLEET_SOURCE}"}}'
+            ))]
+            for offset in offsets:
+                field_name = rng.choice(AUDIT_FIELDS)
+                choices = {'status_id': self._status_ids, 'location_id': d.locations,
+                           'employee_id': d.employees}[field_name]
+                old_value, new_value = state[field_name], rng.choice(choices) if choices else None
+                state[field_name] = new_value
+                details = (
+                    f'{{"changes": {{"{field_name}": '
+                    f'{{"old": {_json_id(old_value)}, "new": {_json_id(new_value)}}}}}}}'
+                )
+                events.append((created_at + timedelta(seconds=offset), 'update', details))
+            for moment, action_type, details in events:
+                user_id = self._pick(rng, d.users, self._user_weights)
+                rows.audit.append((
+                    next_id, moment.replace(tzinfo=None), user_id, action_type, 'Device', device_id,
+                    details, moment, moment,
+                ))
+                next_id += 1
+
+
+class FleetGeneratorService:
+    """Загрузка синтетического парка в БД через COPY, порция за порцией."""
+
+    # Таблицы с последовательностями id, которые заполняются явными значениями
+    SEQUENCE_TABLES = ('devices', 'components', 'actionlog')
+
+    def __init__(self, config: FleetConfig):
+        self.config = config
+
+    async def ensure_catalog(self, session: AsyncSession) -> None:
+        """
+        Дополняет пустые справочники моделей, тегов и сотрудников синтетическими
+        значениями (init-data их не создает). Типы и статусы должны уже быть.
+        """
+        asset_types = (await session.scalars(select(AssetType).order_by(AssetType.id))).all()
+        if not asset_types:
+            raise NotFoundError('Справочники пусты: сначала выполните make init-data')
+
+        if not await session.scalar(select(func.count()).select_from(DeviceModel)):
+            existing = set((await session.scalars(select(Manufacturer.name))).all())
+            session.add_all(Manufacturer(name=name) for name in CATALOG_MANUFACTURERS if name not in existing)
+            await session.flush()
+            manufacturers = (await session.scalars(
+                select(Manufacturer).where(Manufacturer.name.in_(CATALOG_MANUFACTURERS)).order_by(Manufacturer.id)
+            )).all()
+            for asset_type in asset_types:
+                for number in range(CATALOG_MODELS_PER_TYPE):
+                    manufacturer = manufacturers[number % len(manufacturers)]
+                    session.add(DeviceModel(
+                        name=f'{manufacturer.name} {asset_type.prefix}-{(number + 1) * 100}',
+                        manufacturer_id=manufacturer.id,
+                        asset_type_id=asset_type.id,
+                    ))
+
+        if not await session.scalar(select(func.count()).select_from(Tag)):
+            session.add_all(Tag(name=name) for name in CATALOG_TAGS)
+
+        if not await session.scalar(select(func.count()).select_from(Employee)):
+            rng = random.Random(f'{self.config.seed}:employees')
+            session.add_all(
+                Employee(last_name=rng.choice(LAST_NAMES), first_name=rng.choice(FIRST_NAMES))
+                for _ in range(CATALOG_EMPLOYEES)
+            )
+        await session.commit()
+
+    async def generate(
+        self,
+        session: AsyncSession,
+        progress: Callable[[FleetStats], None] | None = None,
+    ) -> FleetStats:
+        """
+        Загружает config.devices устройств. Каждая порция фиксируется отдельной
+        транзакцией; id выдаются подряд после текущего максимума таблиц.
+        """
+        await self.ensure_catalog(session)
+        builder = FleetBuilder(self.config, await FleetDictionaries.load(session))
+        device_id = await self._next_id(session, Device)
+        component_id = await self._next_id(session, Component)
+        audit_id = await self._next_id(session, ActionLog)
+        stats = FleetStats()
+
+        chunks = math.ceil(self.config.devices / CHUNK_DEVICES)
+
+        def chunk_size(chunk: int) -> int:
+            return min(CHUNK_DEVICES, self.config.devices - chunk * CHUNK_DEVICES)
+
+        rows = builder.build_chunk(0, device_id, chunk_size(0), component_id, audit_id) if chunks else None
+        for chunk in range(chunks):
+            count = chunk_size(chunk)
+            device_id += count
+            component_id += len(rows.components)
+            audit_id += len(rows.audit)
+            # Следующая порция строится в потоке, пока сервер принимает COPY текущей
+            next_rows = None
+            if chunk + 1 < chunks:
+                next_rows = asyncio.create_task(asyncio.to_thread(
+                    builder.build_chunk, chunk + 1, device_id, chunk_size(chunk + 1), component_id, audit_id
+                ))
+
+            # Соединение берется заново: после commit сессия возвращает его в пул
+            connection = await self._driver_connection(session)
+            for table, columns, records in rows.tables():
+                if records:
+                    await connection.copy_records_to_table(table, records=records, columns=columns)
+            await session.commit()
+
+            stats.devices += count
+            stats.device_tags += len(rows.device_tags)
+            stats.components += len(rows.components)
+            stats.audit += len(rows.audit)
+            if progress:
+                progress(stats)
+            if next_rows:
+                rows = await next_rows
+
+        await self._finalize(session, [table for table, _, _ in FleetChunk().tables()])
+        return stats
+
+    @staticmethod
+    async def reset(session: AsyncSession) -> None:
+        """Удаляет все активы, компоненты и журнал действий (только для стендов!)."""
+        await session.execute(text('TRUNCATE devices, actionlog RESTART IDENTITY CASCADE'))
+        await session.commit()
+
+    @staticmethod
+    async def _next_id(session: AsyncSession, model) -> int:
+        return (await session.scalar(select(func.coalesce(func.max(model.id), 0)))) + 1
+
+    @staticmethod
+    async def _driver_connection(session: AsyncSession):
+        connection = await session.connection()
+        raw = await connection.get_raw_connection()
+        return raw.driver_connection
+
+    async def _finalize(self, session: AsyncSession, tables: list[str]) -> None:
+        """Сдвигает последовательности за загруженные id и обновляет статистику планировщика."""
+        for table in self.SEQUENCE_TABLES:
+            await session.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                f"COALESCE((SELECT max(id) FROM {table}), 0) + 1, false)"
+            ))
+        await session.execute(text(f'ANALYZE {", ".join(tables)}'))
+        await session.commit()
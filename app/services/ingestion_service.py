@@ -0,0 +1,179 @@
+# app/services/ingestion_service.py
+"""
+Очередь фоновой обработки отчетов агентов.
+
+HTTP-обработчики (/import, /{asset_id}/components/upload) только проверяют
+формат отчета и кладут задание в таблицу ingestion_jobs, сразу отвечая 202.
+Обработчики очереди забирают пакет ожидающих заданий через
+SELECT ... FOR UPDATE SKIP LOCKED (несколько воркеров и процессов не мешают
+друг другу) и выполняют весь пакет в одной транзакции: каждое задание -
+в своём SAVEPOINT, поэтому ошибка одного отчета не откатывает соседние.
+"""
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime
+from typing import Any
+
+from pydantic import TypeAdapter
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.database import AsyncSessionFactory
+from app.models.ingestion_job import IngestionJob
+from app.schemas.component import ComponentItem, ComponentUploadRequest
+from app.services.component_service import ComponentService
+from app.services.device_service import DeviceService
+
+logger = logging.getLogger(__name__)
+
+JOB_IMPORT = 'import'
+JOB_COMPONENTS = 'components'
+
+_items_adapter = TypeAdapter(list[ComponentItem])
+
+JobHandler = Callable[[AsyncSession, IngestionJob], Awaitable[dict[str, Any]]]
+
+
+class IngestionService:
+    """Постановка отчетов в очередь и пакетная обработка заданий."""
+
+    @staticmethod
+    async def enqueue(
+        session: AsyncSession,
+        kind: str,
+        payload: Any,
+        user_id: int | None,
+        asset_id: int | None = None,
+    ) -> IngestionJob:
+        """Добавляет задание в очередь; фиксирует транзакцию вызывающий код."""
+        job = IngestionJob(kind=kind, payload=payload, user_id=user_id, asset_id=asset_id)
+        session.add(job)
+        await session.flush()
+        return job
+
+    @staticmethod
+    async def get_job(session: AsyncSession, job_id: int) -> IngestionJob | None:
+        return await session.get(IngestionJob, job_id)
+
+    @staticmethod
+    async def queue_depth(session: AsyncSession) -> int:
+        """Число ожидающих заданий (по частичному индексу ix_ingestion_jobs_pending)."""
+        stmt = select(func.count()).select_from(IngestionJob).where(IngestionJob.status == 'pending')
+        return await session.scalar(stmt)
+
+    @staticmethod
+    async def process_batch(session: AsyncSession, batch_size: int) -> int:
+        """
+        Обрабатывает до batch_size ожидающих заданий в одной транзакции.
+        Возвращает число взятых заданий (0 - очередь пуста).
+        """
+        stmt = (
+            select(IngestionJob)
+            .where(IngestionJob.status == 'pending')
+            .order_by(IngestionJob.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        jobs = (await session.scalars(stmt)).all()
+        for job in jobs:
+            job.attempts += 1
+        # Счетчик попыток записывается до SAVEPOINT заданий: откат обработчика его не отменит
+        await session.flush()
+
+        for job in jobs:
+            job_id, kind = job.id, job.kind
+            handler = _HANDLERS.get(kind)
+            try:
+                if handler is None:
+                    raise ValueError(f'Неизвестный тип задания: {kind}')
+                async with session.begin_nested():
+                    result = await handler(session, job)
+            except Exception as e:
+                # SAVEPOINT уже откачен: отменены только изменения этого задания
+                logger.warning(f'Задание очереди {job_id} ({kind}) завершилось ошибкой: {e}')
+                job.status = 'failed'
+                job.error = str(getattr(e, 'detail', e))
+            else:
+                job.status = 'done'
+                job.result = result
+            job.finished_at = datetime.now(UTC)
+
+        if jobs:
+            await session.commit()
+        return len(jobs)
+
+    @staticmethod
+    async def _handle_import(session: AsyncSession, job: IngestionJob) -> dict[str, Any]:
+        dto = ComponentUploadRequest.model_validate(job.payload)
+        device = await DeviceService().create_from_report(session, dto, job.user_id)
+        return {
+            'device_id': device.id,
+            'inventory_number': device.inventory_number,
+            'redirect_url': f'/edit/{device.id}?tab=components',
+        }
+
+    @staticmethod
+    async def _handle_components(session: AsyncSession, job: IngestionJob) -> dict[str, Any]:
+        items = _items_adapter.validate_python(job.payload)
+        sync_result = await ComponentService.sync_components(session, job.asset_id, items)
+        return {
+            'count': len(items),
+            'unchanged': sync_result.unchanged,
+            'fingerprint': sync_result.fingerprint,
+            'added': sync_result.added,
+            'updated': sync_result.updated,
+            'removed': sync_result.removed,
+        }
+
+
+_HANDLERS: dict[str, JobHandler] = {
+    JOB_IMPORT: IngestionService._handle_import,
+    JOB_COMPONENTS: IngestionService._handle_components,
+}
+
+
+class IngestionWorkerPool:
+    """
+    Пул обработчиков очереди внутри процесса приложения.
+    Каждый обработчик - asyncio-задача со своей сессией; пустая очередь
+    опрашивается раз в poll_interval секунд.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        batch_size: int,
+        poll_interval: float,
+        session_factory=AsyncSessionFactory,
+    ):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._session_factory = session_factory
+        self._tasks: list[asyncio.Task] = []
+
+    def start(self) -> None:
+        for number in range(self.workers):
+            self._tasks.append(asyncio.create_task(self._run(), name=f'ingestion-worker-{number}'))
+        logger.info(f'Запущено обработчиков очереди отчетов: {self.workers}')
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                async with self._session_factory() as session:
+                    processed = await IngestionService.process_batch(session, self.batch_size)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f'Ошибка обработчика очереди отчетов: {e}', exc_info=True)
+                processed = 0
+            # Полный пакет - вероятно, в очереди есть ещё задания
+            if processed < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
@@ -1,11 +1,12 @@
 import yaml
 import logging
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_
+from sqlalchemy import select, update
 from app.models.asset_type import AssetType
 from app.models.device_status import DeviceStatus
 from app.models.department import Department
 from app.models.location import Location
+from app.db.upsert import bulk_upsert
 from app.schemas.initial_data import InitialDataSchema
 
 logger = logging.getLogger(__name__)
@@ -49,45 +50,44 @@ class InitialDataService:
         """
         Generic метод для синхронизации.
         Ищет по slug. Если находит - обновляет name. Если нет - создает.
+        Вся таблица синхронизируется одним INSERT ... ON CONFLICT (slug) DO UPDATE.
         """
-        for item in items:
-            # 1. Поиск: ищем по slug (основной ключ) или по name (чтобы избежать дублей)
-            stmt = select(model_class).where(
-                or_(model_class.slug == item.slug, model_class.name == item.name)
-            )
-            result = await self.db.execute(stmt)
-            obj = result.scalars().first()
-
-            if obj:
-                # 2. UPDATE: Обновляем запись, если нашли совпадение по slug или name
-                updates = []
-                
-                # Если нашли по имени, но slug пустой или другой - обновляем slug
-                if obj.slug != item.slug:
-                    logger.info(f"Updating slug for {model_class.__tablename__}: {obj.name} -> {item.slug}")
-                    obj.slug = item.slug
-                    updates.append("slug")
+        if not items:
+            return
 
-                if obj.name != item.name:
-                    logger.info(f"Updating name for {model_class.__tablename__}: {obj.slug} -> {item.name}")
-                    obj.name = item.name
-                    updates.append("name")
+        table = model_class.__table__
 
-                if hasattr(obj, 'description') and item.description:
-                    if obj.description != item.description:
-                        obj.description = item.description
-                        updates.append("description")
+        # 1. Записи, найденные только по имени (старые данные без нужного slug):
+        # сначала переносим на них slug, чтобы upsert попал в конфликт по slug,
+        # а не нарушил уникальность имени.
+        existing = (
+            await self.db.execute(select(model_class.slug, model_class.name))
+        ).all()
+        existing_slugs = {row.slug for row in existing}
+        slug_by_name = {row.name: row.slug for row in existing}
+        for item in items:
+            old_slug = slug_by_name.get(item.name)
+            if old_slug and old_slug != item.slug and item.slug not in existing_slugs:
+                logger.info(
+                    f"Updating slug for {model_class.__tablename__}: {item.name} -> {item.slug}"
+                )
+                await self.db.execute(
+                    update(model_class)
+                    .where(model_class.slug == old_slug)
+                    .values(slug=item.slug)
+                )
+                existing_slugs.discard(old_slug)
+                existing_slugs.add(item.slug)
 
-                if hasattr(obj, 'prefix') and item.prefix:
-                    if obj.prefix != item.prefix:
-                        obj.prefix = item.prefix
-                        updates.append("prefix")
-                
-                if updates:
-                    logger.info(f"Updated fields for {item.slug}: {updates}")
-            else:
-                # 3. INSERT: Создаем новую запись
-                logger.info(f"Creating {model_class.__tablename__}: {item.slug}")
-                data_dict = item.model_dump(exclude_unset=True)
-                new_obj = model_class(**data_dict)
-                self.db.add(new_obj)
+        # 2. UPSERT: вставляем новые записи и обновляем изменившиеся
+        rows = [
+            {key: value for key, value in item.model_dump().items() if key in table.c}
+            for item in items
+        ]
+        update_columns = [c for c in ('name', 'description', 'prefix') if c in table.c]
+        inserted, updated = await bulk_upsert(
+            self.db, model_class, rows, index_elements=['slug'], update_columns=update_columns
+        )
+        logger.info(
+            f"Synced {model_class.__tablename__}: {inserted} created, {updated} updated"
+        )
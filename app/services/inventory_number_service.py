@@ -0,0 +1,65 @@
+# app/services/inventory_number_service.py
+
+from datetime import UTC, date, datetime
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.inventory_counter import InventoryCounter
+
+
+class InventoryNumberService:
+    """
+    Выдача инвентарных номеров вида PREFIX-YYYYMMDD-NNN.
+
+    Последний выданный номер хранится в inventory_counters и увеличивается
+    одним `INSERT ... ON CONFLICT DO UPDATE ... RETURNING`. Строка счётчика
+    блокируется до конца транзакции, поэтому параллельные создания
+    получают разные номера, а откат транзакции возвращает диапазон обратно.
+
+    NNN - не менее трёх цифр: после 999 номер удлиняется (-1000, -10000),
+    поэтому строковая сортировка номеров за день не совпадает с порядком
+    выдачи. Порядок определяется числом после последнего дефиса.
+    """
+
+    @staticmethod
+    def format_number(prefix: str, day: date, seq: int) -> str:
+        return f'{prefix}-{day:%Y%m%d}-{seq:03d}'
+
+    @staticmethod
+    async def reserve(
+        session: AsyncSession, prefix: str, count: int = 1, day: date | None = None
+    ) -> list[str]:
+        """
+        Резервирует `count` последовательных номеров для префикса за один запрос.
+
+        Args:
+            session: Сессия БД (транзакцией управляет вызывающий код)
+            prefix: Префикс типа актива (AssetType.prefix)
+            count: Размер диапазона (для пакетного создания)
+            day: День нумерации, по умолчанию текущая дата UTC
+
+        Returns:
+            Список инвентарных номеров по возрастанию.
+        """
+        if count < 1:
+            return []
+        day = day or datetime.now(UTC).date()
+
+        stmt = pg_insert(InventoryCounter).values(prefix=prefix, day=day, last_value=count)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[InventoryCounter.prefix, InventoryCounter.day],
+            set_={'last_value': InventoryCounter.last_value + stmt.excluded.last_value},
+        ).returning(InventoryCounter.last_value)
+        last_value = (await session.execute(stmt)).scalar_one()
+
+        first_value = last_value - count + 1
+        return [
+            InventoryNumberService.format_number(prefix, day, seq)
+            for seq in range(first_value, last_value + 1)
+        ]
+
+    @staticmethod
+    async def next_number(session: AsyncSession, prefix: str) -> str:
+        """Выдаёт один следующий инвентарный номер."""
+        return (await InventoryNumberService.reserve(session, prefix))[0]
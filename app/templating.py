@@ -1,24 +1,46 @@
+# app/templating.py
+"""
+Окружение Jinja2, фильтры шаблонов и замер рендера.
+
+В production (TEMPLATE_AUTO_RELOAD=false) шаблоны не перечитываются с диска
+при каждом рендере, скомпилированный байт-код лежит в TEMPLATE_CACHE_DIR,
+общем для воркеров, а при TEMPLATE_PRECOMPILE воркер компилирует все шаблоны
+при старте, и первый запрос к странице не платит за компиляцию.
+"""
 import json
+import logging
+import os
+import time
 from datetime import datetime
 from typing import Any
 
 from fastapi.templating import Jinja2Templates
-from jinja2 import ChainableUndefined, Environment, FileSystemLoader
+from jinja2 import ChainableUndefined, Environment, FileSystemBytecodeCache, FileSystemLoader, Template
 
 from .config import settings
 from .flash import get_flashed_messages
+from .fragment_cache import FragmentCacheExtension, mark_selected
+from .metrics import TEMPLATE_RENDER_SECONDS
+from .tracing import KIND_RENDER, current_span, span
+
+logger = logging.getLogger(__name__)
 
-# Инициализация Jinja2Templates
-# !# ИСПРАВЛЕНИЕ: Создаем кастомное окружение Jinja2, чтобы включить `attribute()`
-env = Environment(
-    # Указываем загрузчик, который ищет шаблоны в директории 'templates'
-    loader=FileSystemLoader(str(settings.TEMPLATES_DIR)),
-    # Включаем автоматическое экранирование для безопасности
-    autoescape=True,
-    # Добавляем `undefined=ChainableUndefined`, чтобы включить `attribute()` и другие полезные возможности
-    undefined=ChainableUndefined,
-)
-templates = Jinja2Templates(env=env)
+
+class TracedTemplate(Template):
+    """
+    Шаблон, время рендера которого попадает в гистограмму template_render_seconds,
+    а в трассируемом запросе - еще и в трассу отдельным span'ом.
+    """
+
+    def render(self, *args: Any, **kwargs: Any) -> str:
+        started = time.perf_counter()
+        try:
+            if current_span() is None:
+                return super().render(*args, **kwargs)
+            with span('template.render', KIND_RENDER, template=self.name):
+                return super().render(*args, **kwargs)
+        finally:
+            TEMPLATE_RENDER_SECONDS.labels(template=self.name).observe(time.perf_counter() - started)
 
 
 def to_pretty_json(value: Any) -> str:
@@ -183,8 +205,53 @@ def format_create_data(value):
     return ''.join(result)
 
 
-# Добавляем глобальные функции и фильтры в окружение Jinja2
-templates.env.globals['get_flashed_messages'] = get_flashed_messages
-templates.env.filters['to_pretty_json'] = to_pretty_json
-templates.env.filters['format_diff'] = format_diff
-templates.env.filters['format_create_data'] = format_create_data
+def create_environment(templates_dir: str, auto_reload: bool = True, cache_dir: str = '') -> Environment:
+    """
+    Окружение Jinja2 с фильтрами приложения.
+
+    Args:
+        auto_reload: Проверять при каждом рендере, не изменился ли файл шаблона.
+        cache_dir: Каталог байт-кода скомпилированных шаблонов (пусто - без кэша).
+    """
+    bytecode_cache = None
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(cache_dir)
+    environment = Environment(
+        # Указываем загрузчик, который ищет шаблоны в директории 'templates'
+        loader=FileSystemLoader(templates_dir),
+        # Включаем автоматическое экранирование для безопасности
+        autoescape=True,
+        # Добавляем `undefined=ChainableUndefined`, чтобы включить `attribute()` и другие полезные возможности
+        undefined=ChainableUndefined,
+        auto_reload=auto_reload,
+        bytecode_cache=bytecode_cache,
+        # {% cache %}: фрагменты с <option> справочников (app/fragment_cache.py)
+        extensions=[FragmentCacheExtension],
+    )
+    environment.template_class = TracedTemplate
+    # Добавляем глобальные функции и фильтры в окружение Jinja2
+    environment.globals['get_flashed_messages'] = get_flashed_messages
+    environment.filters['to_pretty_json'] = to_pretty_json
+    environment.filters['format_diff'] = format_diff
+    environment.filters['format_create_data'] = format_create_data
+    environment.filters['mark_selected'] = mark_selected
+    return environment
+
+
+def precompile_templates(environment: Environment) -> int:
+    """Компилирует все HTML-шаблоны (и пишет их байт-код в кэш). Returns: число шаблонов."""
+    started = time.perf_counter()
+    names = environment.list_templates(extensions=['html'])
+    for name in names:
+        environment.get_template(name)
+    logger.info(f'Шаблоны скомпилированы: {len(names)} за {(time.perf_counter() - started) * 1000:.0f} мс')
+    return len(names)
+
+
+env = create_environment(
+    str(settings.TEMPLATES_DIR),
+    auto_reload=settings.TEMPLATE_AUTO_RELOAD,
+    cache_dir=settings.TEMPLATE_CACHE_DIR,
+)
+templates = Jinja2Templates(env=env)
@@ -0,0 +1,265 @@
+# app/tracing.py
+"""
+Легковесная трассировка внутри процесса: на какой слой (сервис, БД, шаблон)
+уходит время HTTP-запроса.
+
+Доля TRACE_SAMPLE_RATE запросов получает трассу: дерево span'ов с
+длительностями. Span'ы создаются вручную (with span(...)), декоратором
+@traced() на методах сервисов и автоматически для SQL-запросов и рендера
+шаблонов. Готовые трассы хранятся в кольцевом буфере (/admin/traces.json)
+и, если задан TRACE_OTLP_ENDPOINT, отправляются в коллектор по OTLP/HTTP
+(JSON), например в trace_collector.py.
+
+Вне трассы span() и @traced() сводятся к одному ContextVar.get().
+"""
+import asyncio
+import functools
+import inspect
+import logging
+import os
+import random
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = 'itbase'
+KIND_INTERNAL = 'internal'
+KIND_SERVER = 'server'
+KIND_DB = 'db'
+KIND_RENDER = 'render'
+# SpanKind из OTLP: INTERNAL, SERVER, CLIENT (БД считается внешним вызовом)
+_OTLP_KINDS = {KIND_INTERNAL: 1, KIND_SERVER: 2, KIND_DB: 3, KIND_RENDER: 1}
+DB_STATEMENT_LIMIT = 500
+OTLP_TIMEOUT = 2.0
+
+_current_span: ContextVar['Span | None'] = ContextVar('trace_span', default=None)
+
+
+def _new_id(size: int) -> str:
+    return os.urandom(size).hex()
+
+
+@dataclass
+class Span:
+    trace: 'Trace'
+    name: str
+    kind: str
+    parent_id: str | None
+    attributes: dict[str, Any]
+    span_id: str = field(default_factory=lambda: _new_id(8))
+    start_ns: int = field(default_factory=time.time_ns)
+    duration_ns: int | None = None
+    _started: int = field(default_factory=time.perf_counter_ns, repr=False)
+
+    def finish(self) -> None:
+        self.duration_ns = time.perf_counter_ns() - self._started
+
+
+@dataclass
+class Trace:
+    trace_id: str = field(default_factory=lambda: _new_id(16))
+    spans: list[Span] = field(default_factory=list)
+
+    def start_span(self, name: str, kind: str, parent: Span | None, attributes: dict[str, Any]) -> Span:
+        span = Span(self, name, kind, parent.span_id if parent else None, attributes)
+        self.spans.append(span)
+        return span
+
+    @property
+    def root(self) -> Span:
+        return self.spans[0]
+
+    def to_dict(self) -> dict[str, Any]:
+        """Дерево span'ов с длительностями в мс и суммой по слоям."""
+        nodes = {
+            span.span_id: {
+                'name': span.name,
+                'kind': span.kind,
+                'duration_ms': round((span.duration_ns or 0) / 1e6, 3),
+                'attributes': span.attributes,
+                'children': [],
+            }
+            for span in self.spans
+        }
+        by_kind: dict[str, float] = {}
+        for span in self.spans:
+            if span.parent_id in nodes:
+                nodes[span.parent_id]['children'].append(nodes[span.span_id])
+            if span.kind in (KIND_DB, KIND_RENDER):
+                by_kind[span.kind] = by_kind.get(span.kind, 0) + (span.duration_ns or 0) / 1e6
+        return {
+            'trace_id': self.trace_id,
+            'name': self.root.name,
+            'duration_ms': nodes[self.root.span_id]['duration_ms'],
+            'by_kind_ms': {kind: round(total, 3) for kind, total in by_kind.items()},
+            'root': nodes[self.root.span_id],
+        }
+
+    def to_otlp(self) -> dict[str, Any]:
+        """Тело запроса OTLP/HTTP JSON (ExportTraceServiceRequest)."""
+        spans = []
+        for span in self.spans:
+            otlp_span = {
+                'traceId': self.trace_id,
+                'spanId': span.span_id,
+                'name': span.name,
+                'kind': _OTLP_KINDS[span.kind],
+                'startTimeUnixNano': str(span.start_ns),
+                'endTimeUnixNano': str(span.start_ns + (span.duration_ns or 0)),
+                'attributes': [
+                    {'key': key, 'value': _otlp_value(value)}
+                    for key, value in {'itbase.kind': span.kind, **span.attributes}.items()
+                ],
+            }
+            if span.parent_id:
+                otlp_span['parentSpanId'] = span.parent_id
+            spans.append(otlp_span)
+        return {
+            'resourceSpans': [{
+                'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': SERVICE_NAME}}]},
+                'scopeSpans': [{'scope': {'name': __name__}, 'spans': spans}],
+            }]
+        }
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def current_span() -> Span | None:
+    return _current_span.get()
+
+
+@contextmanager
+def span(name: str, kind: str = KIND_INTERNAL, **attributes: Any) -> Iterator[Span | None]:
+    """with span('import.parse', rows=10): ... - дочерний span; вне трассы ничего не делает."""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    child = parent.trace.start_span(name, kind, parent, attributes)
+    token = _current_span.set(child)
+    try:
+        yield child
+    finally:
+        child.finish()
+        _current_span.reset(token)
+
+
+def traced(name: str | None = None) -> Callable[[Callable], Callable]:
+    """Декоратор метода сервиса: span с именем Class.method (или name)."""
+
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if _current_span.get() is None:
+                    return await func(*args, **kwargs)
+                with span(span_name):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current_span.get() is None:
+                return func(*args, **kwargs)
+            with span(span_name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class Tracer:
+    """Выборка запросов для трассировки, буфер готовых трасс и экспорт в OTLP."""
+
+    def __init__(self, sample_rate: float, buffer_size: int, otlp_endpoint: str = ''):
+        self.sample_rate = sample_rate
+        self.otlp_endpoint = otlp_endpoint
+        self.traces: deque[Trace] = deque(maxlen=buffer_size)
+        self._exports: set[asyncio.Task] = set()
+
+    def should_sample(self) -> bool:
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    @contextmanager
+    def start_trace(self, name: str, **attributes: Any) -> Iterator[Trace]:
+        """Корневой span новой трассы; по завершении трасса сохраняется и экспортируется."""
+        trace = Trace()
+        root = trace.start_span(name, KIND_SERVER, None, attributes)
+        token = _current_span.set(root)
+        try:
+            yield trace
+        finally:
+            root.finish()
+            _current_span.reset(token)
+            self.traces.append(trace)
+            if self.otlp_endpoint:
+                task = asyncio.get_running_loop().create_task(self.export_otlp(trace))
+                self._exports.add(task)
+                task.add_done_callback(self._exports.discard)
+
+    def recent(self) -> list[dict[str, Any]]:
+        """Трассы от новых к старым."""
+        return [trace.to_dict() for trace in reversed(self.traces)]
+
+    async def export_otlp(self, trace: Trace) -> None:
+        try:
+            async with httpx.AsyncClient(timeout=OTLP_TIMEOUT) as client:
+                response = await client.post(self.otlp_endpoint, json=trace.to_otlp())
+                response.raise_for_status()
+        except httpx.HTTPError as e:
+            logger.warning(f'Не удалось отправить трассу {trace.trace_id} в {self.otlp_endpoint}: {e}')
+
+
+tracer = Tracer(
+    sample_rate=settings.TRACE_SAMPLE_RATE,
+    buffer_size=settings.TRACE_BUFFER_SIZE,
+    otlp_endpoint=settings.TRACE_OTLP_ENDPOINT,
+)
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    parent = _current_span.get()
+    if parent is not None:
+        conn.info['trace_span'] = parent.trace.start_span(
+            'db.query', KIND_DB, parent, {'db.statement': statement[:DB_STATEMENT_LIMIT]}
+        )
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    db_span = conn.info.pop('trace_span', None)
+    if db_span is not None:
+        db_span.finish()
+
+
+@event.listens_for(Engine, 'handle_error')
+def _handle_error(exception_context) -> None:
+    conn = exception_context.connection
+    db_span = conn.info.pop('trace_span', None) if conn is not None else None
+    if db_span is not None:
+        db_span.attributes['error'] = type(exception_context.original_exception).__name__
+        db_span.finish()
@@ -0,0 +1,71 @@
+# Path: app/utils/agent_client.py
+"""
+Эталонный клиент протокола агента (версия 1).
+
+Повторяет поведение агентов из agent_builder: запрашивает состояние устройства,
+отправляет "без изменений" или дельту, а при конфликте - полный отчёт.
+Используется в тестах и для интеграций, написанных на Python.
+"""
+from collections import Counter
+
+import httpx
+from pydantic import TypeAdapter
+
+from app.schemas.component import ComponentItem
+from app.services.agent_protocol_service import PROTOCOL_VERSION
+from app.services.component_service import ComponentService
+
+_items_adapter = TypeAdapter(list[ComponentItem])
+
+
+class AgentClient:
+    def __init__(self, http: httpx.AsyncClient, base_path: str = '/api/agent/v1'):
+        self._http = http
+        self._base_path = base_path
+        self.last_report: dict | None = None
+
+    async def report(self, asset_id: int, components: list[dict]) -> dict:
+        """Отправляет набор компонентов устройства, передавая только изменения."""
+        items = [item.model_dump() for item in _items_adapter.validate_python(components)]
+
+        response = await self._http.get(f'{self._base_path}/devices/{asset_id}/state')
+        response.raise_for_status()
+        body = self.build_report(response.json(), items)
+
+        response = await self._post(asset_id, body)
+        if response.status_code == httpx.codes.CONFLICT and 'components' not in body:
+            response = await self._post(asset_id, self.build_report(None, items))
+        response.raise_for_status()
+        return response.json()
+
+    @staticmethod
+    def build_report(state: dict | None, items: list[dict]) -> dict:
+        """Тело отчёта для состояния сервера; items - в виде item.model_dump()."""
+        fingerprint = ComponentService.fingerprint(_items_adapter.validate_python(items))
+        report: dict = {'protocol_version': PROTOCOL_VERSION, 'fingerprint': fingerprint}
+
+        if not state or state.get('protocol_version') != PROTOCOL_VERSION or state.get('fingerprint') is None:
+            report['components'] = items
+            return report
+
+        if state['fingerprint'] == fingerprint:
+            report['unchanged'] = True
+            return report
+
+        server_hashes = Counter(state['hashes'])
+        added = []
+        for item in items:
+            digest = ComponentService.item_hash(item)
+            if server_hashes[digest] > 0:
+                server_hashes[digest] -= 1
+            else:
+                added.append(item)
+
+        report['base_fingerprint'] = state['fingerprint']
+        report['added'] = added
+        report['removed'] = list(server_hashes.elements())
+        return report
+
+    async def _post(self, asset_id: int, body: dict) -> httpx.Response:
+        self.last_report = body
+        return await self._http.post(f'{self._base_path}/devices/{asset_id}/report', json=body)
@@ -0,0 +1,77 @@
+# generate_fleet.py
+"""
+Синтетический парк для нагрузочных тестов и проверки планов запросов.
+
+Примеры:
+    python generate_fleet.py --devices 1000000 --components-per-device 10 --audit-per-device 50
+    python generate_fleet.py --devices 50000 --seed 42 --reset
+"""
+import argparse
+import asyncio
+import logging
+import sys
+import time
+
+from app.db.database import AsyncSessionFactory
+from app.services.exceptions import NotFoundError
+from app.services.fleet_generator_service import FleetConfig, FleetGeneratorService, FleetStats
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Генерация синтетического парка активов через COPY")
+    parser.add_argument("--devices", type=int, default=10_000, help="число устройств")
+    parser.add_argument("--components-per-device", type=float, default=10, help="среднее число компонентов")
+    parser.add_argument("--audit-per-device", type=float, default=50, help="среднее число записей журнала")
+    parser.add_argument("--seed", type=int, default=1, help="seed: одинаковый seed дает одинаковые данные")
+    parser.add_argument(
+        "--reset",
+        action="store_true",
+        help="перед загрузкой удалить ВСЕ активы, компоненты и журнал действий (только для стендов!)",
+    )
+    return parser.parse_args()
+
+
+async def main(args: argparse.Namespace) -> None:
+    config = FleetConfig(
+        devices=args.devices,
+        components_per_device=args.components_per_device,
+        audit_per_device=args.audit_per_device,
+        seed=args.seed,
+    )
+    service = FleetGeneratorService(config)
+    started = time.perf_counter()
+
+    def report(stats: FleetStats) -> None:
+        if stats.devices % 100_000 and stats.devices != config.devices:
+            return
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"Устройств: {stats.devices}/{config.devices}, компонентов: {stats.components}, "
+            f"записей журнала: {stats.audit} ({elapsed:.0f} с)"
+        )
+
+    async with AsyncSessionFactory() as session:
+        if args.reset:
+            logger.warning("⚠️ --reset: удаляются все активы, компоненты и журнал действий")
+            await service.reset(session)
+        try:
+            stats = await service.generate(session, progress=report)
+        except NotFoundError as e:
+            logger.error(f"❌ {e}")
+            sys.exit(1)
+
+    logger.info(
+        f"✅ Готово за {time.perf_counter() - started:.0f} с: {stats.devices} устройств, "
+        f"{stats.device_tags} тегов, {stats.components} компонентов, {stats.audit} записей журнала"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,30 @@
+# gunicorn.conf.py
+"""
+Настройки gunicorn для production (подхватывается автоматически из рабочего каталога).
+
+Метрики Prometheus собираются в multiprocess-режиме: каждый воркер пишет
+их в файлы PROMETHEUS_MULTIPROC_DIR, а /metrics любого воркера суммирует все.
+
+Число воркеров задается переменной WEB_CONCURRENCY (gunicorn читает ее сам),
+а не флагом -w: по ней же приложение делит бюджет соединений DB_MAX_CONNECTIONS.
+"""
+import os
+import shutil
+
+# Переменная должна быть задана до импорта prometheus_client: он выбирает
+# хранилище значений при импорте, а воркеры наследуют модуль от мастера
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus_multiproc")
+
+from prometheus_client import multiprocess  # noqa: E402
+
+
+def on_starting(server):
+    # Файлы прошлого запуска исказили бы счетчики
+    path = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path)
+
+
+def child_exit(server, worker):
+    # Gauge с режимом live* не должны учитывать остановленный воркер
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,69 @@
+# profile_startup.py
+"""
+Профиль импорта приложения: python -X importtime в отдельном процессе,
+модули с наибольшим собственным и накопленным временем импорта.
+
+Примеры:
+    python profile_startup.py
+    python profile_startup.py --top 30 --module app.main
+"""
+import argparse
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+
+
+@dataclass
+class ImportTime:
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+def parse_importtime(stderr: str) -> list[ImportTime]:
+    """Строки 'import time: self | cumulative | module' из вывода -X importtime."""
+    result = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, module = line.removeprefix("import time:").split("|")
+        result.append(ImportTime(module.strip(), int(self_us), int(cumulative_us)))
+    return result
+
+
+def profile_import(module: str) -> list[ImportTime]:
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+        check=False,
+    )
+    if completed.returncode != 0:
+        tail = [line for line in completed.stderr.splitlines() if not line.startswith("import time:")]
+        sys.exit("\n".join(tail[-20:]))
+    return parse_importtime(completed.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Профиль времени импорта приложения")
+    parser.add_argument("--module", default="app.main", help="Импортируемый модуль")
+    parser.add_argument("--top", type=int, default=20, help="Сколько модулей показать")
+    args = parser.parse_args()
+
+    times = profile_import(args.module)
+    total_ms = sum(item.self_us for item in times) / 1000
+
+    print(f"Импорт {args.module}: {total_ms:.0f} мс, модулей: {len(times)}\n")
+    print("Собственное время:")
+    for item in sorted(times, key=lambda item: item.self_us, reverse=True)[: args.top]:
+        print(f"  {item.self_us / 1000:8.1f} мс  {item.module}")
+    print("\nНакопленное время (пакеты приложения):")
+    app_times = [item for item in times if item.module == "app" or item.module.startswith("app.")]
+    for item in sorted(app_times, key=lambda item: item.cumulative_us, reverse=True)[: args.top]:
+        print(f"  {item.cumulative_us / 1000:8.1f} мс  {item.module}")
+
+
+if __name__ == "__main__":
+    main()
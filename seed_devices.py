@@ -315,7 +315,7 @@ async def process_scenario_batch(scenario, all_types, all_models, all_statuses,
 
     suitable_models = find_suitable_models(scenario, all_models, target_type)
     status_map = {s.name: s for s in all_statuses}
-    batch_created = 0
+    assets = []
 
     for _ in range(scenario['count']):
         try:
@@ -329,16 +329,21 @@ async def process_scenario_batch(scenario, all_types, all_models, all_statuses,
                 scenario, model, target_type, purchase_date, wear,
                 status_obj, emp_id, dept_id, loc_id, faker
             )
-
-            await service.create_device(db, AssetCreate(**asset_data), user_id=ADMIN_USER_ID)
-            batch_created += 1
+            assets.append(AssetCreate(**asset_data))
             print('.', end='', flush=True)
 
         except Exception as e:
             print(f'x ({e})', end='', flush=True)
 
-    print(f" OK ({batch_created}/{scenario['count']})")
-    return batch_created
+    # Вся партия создается одной транзакцией (номера, теги и аудит - пакетно)
+    try:
+        created = await service.bulk_create_devices(db, assets, user_id=ADMIN_USER_ID)
+    except Exception as e:
+        print(f' ❌ ({e})')
+        return 0
+
+    print(f" OK ({len(created)}/{scenario['count']})")
+    return len(created)
 
 
 async def seed_devices():
@@ -0,0 +1,196 @@
+/**
+ * Список активов (/assets-list): выбор колонок, массовые действия и смена
+ * страницы, сортировки и фильтров без перезагрузки страницы.
+ *
+ * Ссылки пагинации и сортировки и формы фильтров ведут на полную страницу;
+ * здесь они перехватываются, и с тем же query string запрашивается только
+ * фрагмент #assets-results (/assets-list/results). Адрес в строке браузера
+ * обновляется, так что перезагрузка и закладки открывают то же состояние.
+ */
+
+document.addEventListener('DOMContentLoaded', function () {
+    const style = document.createElement('style');
+    style.innerHTML = `
+        .column-hidden-by-user { display: none !important; }
+        .table-assets td {
+            word-break: break-word;
+            white-space: normal !important;
+            max-width: 250px;
+        }
+        .table-assets td.tags-cell .tags-container { display: flex; flex-wrap: wrap; gap: 0.25rem; }
+    `;
+    document.head.appendChild(style);
+
+    const page = document.getElementById('assets-page');
+    if (!page) {
+        return;
+    }
+    const pageUrl = page.dataset.pageUrl;
+    const resultsUrl = page.dataset.resultsUrl;
+
+    // --- Выбор колонок ---
+    const columnList = document.getElementById('column-list');
+    const storageKey = 'assetsListColumnVisibility';
+    const columnVisibility = JSON.parse(localStorage.getItem(storageKey)) || {
+        'ID': false, 'Название актива': true, 'Модель': true, 'Производитель': false,
+        'Тип': true, 'Статус': true, 'Отдел': false, 'Сотрудник': true,
+        'Локация': true, 'Теги': true, 'Действия': true
+    };
+
+    function columnName(th) {
+        const link = th.querySelector('a');
+        return (link ? link.innerText : th.innerText).trim();
+    }
+
+    function toggleColumn(table, colIndex, show) {
+        table.querySelectorAll(`tr > *:nth-child(${colIndex + 1})`).forEach(cell => {
+            cell.classList.toggle('column-hidden-by-user', !show);
+        });
+    }
+
+    function applyColumnVisibility() {
+        const table = document.querySelector('.table-assets');
+        if (!table) {
+            return;
+        }
+        table.querySelectorAll('thead th').forEach((th, index) => {
+            const name = columnName(th);
+            if (columnVisibility[name] !== undefined) {
+                toggleColumn(table, index, columnVisibility[name]);
+            }
+        });
+    }
+
+    function buildColumnList() {
+        const table = document.querySelector('.table-assets');
+        if (!table || !columnList || columnList.children.length) {
+            return;
+        }
+        table.querySelectorAll('thead th').forEach((th, index) => {
+            const name = columnName(th);
+            if (!name && index > 0) return; // Пропускаем пустые заголовки, кроме первого (чекбокс)
+
+            if (columnVisibility[name] === undefined) {
+                columnVisibility[name] = true;
+            }
+
+            const li = document.createElement('li');
+            li.className = 'dropdown-item pe-2';
+            li.innerHTML = `
+                <div class="form-check">
+                    <input class="form-check-input" type="checkbox" value="" id="col-check-${index}"
+                           ${columnVisibility[name] ? 'checked' : ''}
+                           ${name === 'Действия' ? 'disabled' : ''}>
+                    <label class="form-check-label" for="col-check-${index}">${name}</label>
+                </div>
+            `;
+            columnList.appendChild(li);
+
+            const checkbox = li.querySelector('input');
+            if (name !== 'Действия') {
+                checkbox.addEventListener('change', () => {
+                    // Таблицу берем заново: она могла быть заменена после загрузки фрагмента
+                    toggleColumn(document.querySelector('.table-assets'), index, checkbox.checked);
+                    columnVisibility[name] = checkbox.checked;
+                    localStorage.setItem(storageKey, JSON.stringify(columnVisibility));
+                });
+            }
+        });
+    }
+
+    if (columnList) {
+        columnList.addEventListener('click', function (e) {
+            e.stopPropagation();
+        });
+    }
+
+    // --- Массовые действия (делегирование: строки таблицы меняются) ---
+    const bulkActionsPanel = document.getElementById('bulk-actions-panel');
+    const selectedCountSpan = document.getElementById('selected-count');
+
+    function updateBulkActionsPanel() {
+        const selectedCount = document.querySelectorAll('.device-checkbox:checked').length;
+        if (bulkActionsPanel) {
+            if (selectedCount > 0) {
+                bulkActionsPanel.style.display = 'block';
+                selectedCountSpan.textContent = `Выбрано: ${selectedCount}`;
+            } else {
+                bulkActionsPanel.style.display = 'none';
+            }
+        }
+    }
+
+    page.addEventListener('change', function (e) {
+        if (e.target.id === 'selectAllCheckbox') {
+            document.querySelectorAll('.device-checkbox').forEach(checkbox => {
+                checkbox.checked = e.target.checked;
+            });
+            updateBulkActionsPanel();
+        } else if (e.target.classList.contains('device-checkbox')) {
+            updateBulkActionsPanel();
+        }
+    });
+
+    // --- Загрузка фрагмента с результатами ---
+    async function loadResults(query, pushState) {
+        const fullUrl = query ? `${pageUrl}?${query}` : pageUrl;
+        const results = document.getElementById('assets-results');
+        results.classList.add('opacity-50');
+        try {
+            const response = await fetch(query ? `${resultsUrl}?${query}` : resultsUrl);
+            // Редирект на вход или ошибка: открываем страницу целиком
+            if (!response.ok || response.redirected) {
+                window.location.assign(fullUrl);
+                return;
+            }
+            results.outerHTML = await response.text();
+        } catch (error) {
+            window.location.assign(fullUrl);
+            return;
+        }
+
+        const total = document.getElementById('assets-results').dataset.total;
+        document.getElementById('assets-total').textContent = `Всего: ${total} активов`;
+        const exportQuery = new URLSearchParams(query);
+        exportQuery.delete('page');
+        document.querySelectorAll('.js-export-link').forEach(link => {
+            link.search = exportQuery.toString();
+        });
+        if (pushState) {
+            history.pushState({ query: query }, '', fullUrl);
+        }
+        buildColumnList();
+        applyColumnVisibility();
+        updateBulkActionsPanel();
+    }
+
+    // Пагинация и сортировка
+    page.addEventListener('click', function (e) {
+        const link = e.target.closest('#assets-results .page-link, #assets-results thead a');
+        if (!link || e.ctrlKey || e.metaKey || e.shiftKey || e.button !== 0) {
+            return;
+        }
+        e.preventDefault();
+        loadResults(new URL(link.href).searchParams.toString(), true);
+    });
+
+    // Фильтры
+    document.querySelectorAll('form.js-assets-filters').forEach(form => {
+        form.addEventListener('submit', function (e) {
+            e.preventDefault();
+            const offcanvas = form.closest('.offcanvas');
+            if (offcanvas && window.bootstrap) {
+                bootstrap.Offcanvas.getOrCreateInstance(offcanvas).hide();
+            }
+            loadResults(new URLSearchParams(new FormData(form)).toString(), true);
+        });
+    });
+
+    window.addEventListener('popstate', function () {
+        loadResults(window.location.search.slice(1), false);
+    });
+
+    buildColumnList();
+    applyColumnVisibility();
+    updateBulkActionsPanel();
+});
@@ -0,0 +1,21 @@
+/**
+ * Ожидание задания очереди отчетов агентов.
+ * /import и /{id}/components/upload отвечают 202 с status_url;
+ * опрашиваем его, пока задание не перейдет в done или failed.
+ */
+
+async function waitForJob(statusUrl, intervalMs = 1000, timeoutMs = 120000) {
+    const deadline = Date.now() + timeoutMs;
+    while (Date.now() < deadline) {
+        const response = await fetch(statusUrl);
+        if (!response.ok) {
+            return { status: 'failed', error: 'Не удалось получить статус задания' };
+        }
+        const job = await response.json();
+        if (job.status !== 'pending') {
+            return job;
+        }
+        await new Promise(resolve => setTimeout(resolve, intervalMs));
+    }
+    return { status: 'failed', error: 'Задание не обработано за отведенное время' };
+}
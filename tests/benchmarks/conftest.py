@@ -0,0 +1,195 @@
+"""
+Окружение нагрузочных тестов: отдельная база <POSTGRES_DB>_bench с синтетическим
+парком (FleetGeneratorService) и приложение в процессе через ASGITransport.
+Парк генерируется один раз и переиспользуется, пока не изменится его размер.
+"""
+from collections.abc import AsyncGenerator, Awaitable, Callable
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
+from dataclasses import asdict
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+from fastapi import Depends, FastAPI
+from httpx import ASGITransport, AsyncClient, Response
+from sqlalchemy import event, func, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from app.api.deps import (
+    get_current_active_superuser,
+    get_current_superuser_from_session,
+    get_current_user_from_session,
+)
+from app.config import settings
+from app.db.database import get_db
+from app.main import create_app
+from app.models import Device, User
+from app.services.fleet_generator_service import FLEET_SOURCE, FleetConfig, FleetGeneratorService
+from app.services.initial_data_service import InitialDataService
+from tests.benchmarks.harness import BenchRecorder, QueryCounter, measure
+from tests.conftest import ensure_database
+
+BENCH_DB = f'{settings.POSTGRES_DB}_bench'
+BENCH_DATABASE_URL = settings.DATABASE_URL_ASYNC.replace(f'/{settings.POSTGRES_DB}', f'/{BENCH_DB}')
+BASELINE_PATH = Path(__file__).with_name('baseline.json')
+BENCH_USER_EMAIL = 'benchmark@example.com'
+# Таблицы, которые растут от пишущих замеров (devices - каскадом с компонентами;
+# загрузка компонентов идет в устройство, созданное внутри restore_writes())
+WRITE_TABLES = ('devices', 'actionlog', 'ingestion_jobs', 'component_history')
+
+# Парк на устройство: как в производственной базе, но журнал короче -
+# иначе генерация базы по умолчанию занимает минуты
+COMPONENTS_PER_DEVICE = 10
+AUDIT_PER_DEVICE = 10
+FLEET_SEED = 1
+
+
+@pytest.fixture(scope='session')
+def fleet_config(pytestconfig: pytest.Config) -> FleetConfig:
+    return FleetConfig(
+        devices=pytestconfig.getoption('--benchmark-devices'),
+        components_per_device=COMPONENTS_PER_DEVICE,
+        audit_per_device=AUDIT_PER_DEVICE,
+        seed=FLEET_SEED,
+    )
+
+
+async def _seed(engine: AsyncEngine, config: FleetConfig) -> None:
+    """Справочники, пользователь и парк; повторный запуск с тем же парком ничего не меняет."""
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        await InitialDataService(session).load_from_yaml(
+            str(Path(__file__).resolve().parents[2] / 'initial_data.yaml')
+        )
+        if not await session.scalar(select(User.id).where(User.email == BENCH_USER_EMAIL)):
+            session.add(User(
+                email=BENCH_USER_EMAIL,
+                full_name='Benchmark',
+                hashed_password='not-used',
+                is_active=True,
+                is_superuser=True,
+            ))
+            await session.commit()
+
+        synthetic = await session.scalar(
+            select(func.count()).select_from(Device).where(Device.source == FLEET_SOURCE)
+        )
+        # После reset id начинаются с 1: номер первого устройства однозначно задает seed
+        first = await session.scalar(
+            select(Device.id).where(Device.inventory_number == f'SYN-{config.seed}-{1:08d}')
+        )
+        if synthetic == config.devices and first:
+            return
+        service = FleetGeneratorService(config)
+        await service.reset(session)
+        await service.generate(session)
+
+
+@pytest_asyncio.fixture(scope='session')
+async def bench_engine(fleet_config: FleetConfig) -> AsyncGenerator[AsyncEngine, None]:
+    await ensure_database(BENCH_DB, BENCH_DATABASE_URL)
+    engine = create_async_engine(BENCH_DATABASE_URL)
+    await _seed(engine, fleet_config)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture(scope='session')
+def bench_sessions(bench_engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(bench_engine, expire_on_commit=False)
+
+
+@pytest.fixture(scope='session')
+def bench_app(bench_sessions: async_sessionmaker[AsyncSession]) -> FastAPI:
+    """
+    Приложение с настоящими сессиями (каждый запрос - своя транзакция, как в
+    проде) и авторизацией под пользователем нагрузочных тестов.
+    """
+    application = create_app()
+
+    async def override_get_db() -> AsyncGenerator[AsyncSession, None]:
+        async with bench_sessions() as session:
+            yield session
+
+    async def override_get_user(db: AsyncSession = Depends(get_db)) -> User:
+        return (await db.scalars(select(User).where(User.email == BENCH_USER_EMAIL))).one()
+
+    application.dependency_overrides[get_db] = override_get_db
+    application.dependency_overrides[get_current_user_from_session] = override_get_user
+    application.dependency_overrides[get_current_superuser_from_session] = override_get_user
+    application.dependency_overrides[get_current_active_superuser] = override_get_user
+    return application
+
+
+@pytest_asyncio.fixture(scope='session')
+async def bench_client(bench_app: FastAPI) -> AsyncGenerator[AsyncClient, None]:
+    async with AsyncClient(
+        transport=ASGITransport(app=bench_app),
+        base_url='http://test',
+        headers={'X-Test-Mode': 'true'},
+    ) as client:
+        yield client
+
+
+@pytest.fixture(scope='session')
+def restore_writes(
+    bench_sessions: async_sessionmaker[AsyncSession],
+) -> Callable[[], AbstractAsyncContextManager[None]]:
+    """
+    async with restore_writes(): удаляет строки, добавленные пишущим замером
+    (импорт, загрузка компонентов) - иначе база растет от прогона к прогону
+    и замеры перестают быть сравнимыми. Контекстный менеджер, а не async-фикстура
+    уровня функции: та выполнялась бы в другом event loop, чем движок сессии.
+    """
+
+    @asynccontextmanager
+    async def restore() -> AsyncGenerator[None, None]:
+        async with bench_sessions() as session:
+            marks = {
+                table: await session.scalar(text(f'SELECT COALESCE(max(id), 0) FROM {table}'))
+                for table in WRITE_TABLES
+            }
+        try:
+            yield
+        finally:
+            async with bench_sessions() as session:
+                for table, mark in marks.items():
+                    await session.execute(text(f'DELETE FROM {table} WHERE id > :mark'), {'mark': mark})
+                await session.commit()
+
+    return restore
+
+
+@pytest.fixture(scope='session')
+def query_counter(bench_engine: AsyncEngine) -> QueryCounter:
+    counter = QueryCounter()
+    event.listen(bench_engine.sync_engine, 'before_cursor_execute', counter)
+    return counter
+
+
+@pytest.fixture(scope='session')
+def bench_recorder(pytestconfig: pytest.Config, fleet_config: FleetConfig):
+    threshold = pytestconfig.getoption('--benchmark-threshold')
+    recorder = BenchRecorder(BASELINE_PATH, asdict(fleet_config), threshold)
+    yield recorder
+    recorder.dump(pytestconfig.rootpath / '.benchmarks' / 'latest.json')
+    if pytestconfig.getoption('--benchmark-save'):
+        recorder.save_baseline()
+
+
+@pytest.fixture
+def benchmark(
+    bench_recorder: BenchRecorder, query_counter: QueryCounter
+) -> Callable[..., Awaitable[None]]:
+    """benchmark(name, call, iterations): замер и проверка регрессий относительно baseline."""
+
+    async def run(name: str, call: Callable[[], Awaitable[Response]], iterations: int = 30) -> None:
+        result = await measure(call, query_counter, iterations)
+        regressions = bench_recorder.check(name, result)
+        if regressions:
+            # Случайный всплеск (планировщик ОС, autovacuum) при повторном замере
+            # обычно не воспроизводится, настоящая регрессия - воспроизводится
+            result = await measure(call, query_counter, iterations)
+            regressions = bench_recorder.check(name, result)
+        assert not regressions, f'{name}: ' + '; '.join(regressions)
+
+    return run
@@ -0,0 +1,145 @@
+"""
+Измерение горячих HTTP-путей: латентность (p50/p95/p99), число SQL-запросов
+и пиковая память (tracemalloc) на запрос, сравнение с baseline.json.
+
+Baseline сравним только с тем же синтетическим парком (размер, seed): при
+другом парке результаты записываются, но не сравниваются.
+"""
+import gc
+import json
+import statistics
+import time
+import tracemalloc
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from httpx import Response
+
+# Абсолютный запас поверх относительного порога: на быстрых запросах
+# (единицы миллисекунд) относительный порог меньше шума измерений
+LATENCY_SLACK_MS = 2.0
+MEMORY_SLACK_KIB = 256
+# Показатели латентности, по которым определяется регрессия. p99 при десятках
+# итераций - это один-два замера, поэтому он записывается, но не проверяется.
+GATED_LATENCIES = ('p50_ms', 'p95_ms')
+
+
+@dataclass
+class BenchResult:
+    iterations: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    queries: int
+    peak_kib: int
+
+
+class QueryCounter:
+    """Слушатель before_cursor_execute: число выполненных SQL-запросов."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args: Any) -> None:
+        self.count += 1
+
+
+def find_regressions(result: BenchResult, baseline: dict | None, threshold: float) -> list[str]:
+    """Описания превышений baseline; пустой список - регрессий нет."""
+    if not baseline:
+        return []
+    problems = []
+    for key in GATED_LATENCIES:
+        limit = baseline[key] * (1 + threshold) + LATENCY_SLACK_MS
+        if getattr(result, key) > limit:
+            problems.append(f'{key} {getattr(result, key)} > {limit:.2f} (baseline {baseline[key]})')
+    # Число запросов детерминировано: любой рост - регрессия (например, N+1)
+    if result.queries > baseline['queries']:
+        problems.append(f'queries {result.queries} > {baseline["queries"]}')
+    limit = baseline['peak_kib'] * (1 + threshold) + MEMORY_SLACK_KIB
+    if result.peak_kib > limit:
+        problems.append(f'peak_kib {result.peak_kib} > {limit:.0f} (baseline {baseline["peak_kib"]})')
+    return problems
+
+
+class BenchRecorder:
+    """Результаты прогона, baseline и их сохранение в JSON."""
+
+    def __init__(self, baseline_path: Path, fleet: dict, threshold: float):
+        self.baseline_path = baseline_path
+        self.fleet = fleet
+        self.threshold = threshold
+        self.results: dict[str, BenchResult] = {}
+        stored = json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+        self.stored_baseline = stored
+        # Замеры на другом парке несравнимы
+        self.baseline = stored.get('results', {}) if stored.get('fleet') == fleet else {}
+
+    def check(self, name: str, result: BenchResult) -> list[str]:
+        self.results[name] = result
+        return find_regressions(result, self.baseline.get(name), self.threshold)
+
+    def dump(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            'fleet': self.fleet,
+            'threshold': self.threshold,
+            'results': {name: asdict(result) for name, result in sorted(self.results.items())},
+        }
+        path.write_text(json.dumps(data, indent=2, ensure_ascii=False) + '\n')
+
+    def save_baseline(self) -> None:
+        """Обновляет baseline замерами этого прогона, сохраняя остальные случаи."""
+        results = self.baseline.copy()
+        results.update({name: asdict(result) for name, result in self.results.items()})
+        data = {'fleet': self.fleet, 'results': dict(sorted(results.items()))}
+        self.baseline_path.write_text(json.dumps(data, indent=2, ensure_ascii=False) + '\n')
+
+
+async def measure(
+    call: Callable[[], Awaitable[Response]],
+    counter: QueryCounter,
+    iterations: int,
+    warmup: int = 2,
+) -> BenchResult:
+    """
+    Выполняет call() warmup + iterations раз и ещё один раз под tracemalloc
+    (он замедляет выполнение, поэтому память меряется отдельно от времени).
+    """
+    for _ in range(warmup):
+        _check(await call())
+
+    timings = []
+    queries = 0
+    for _ in range(iterations):
+        # Сборка мусора от предыдущих запросов не должна попадать в замер этого
+        gc.collect()
+        counter.count = 0
+        started = time.perf_counter()
+        response = await call()
+        timings.append((time.perf_counter() - started) * 1000)
+        _check(response)
+        queries = max(queries, counter.count)
+
+    tracemalloc.start()
+    try:
+        _check(await call())
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    percentiles = statistics.quantiles(timings, n=100, method='inclusive')
+    return BenchResult(
+        iterations=iterations,
+        p50_ms=round(percentiles[49], 2),
+        p95_ms=round(percentiles[94], 2),
+        p99_ms=round(percentiles[98], 2),
+        queries=queries,
+        peak_kib=peak // 1024,
+    )
+
+
+def _check(response: Response) -> None:
+    assert response.status_code < 400, f'{response.request.url}: {response.status_code} {response.text[:200]}'
@@ -0,0 +1,56 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from tests.benchmarks.harness import BenchRecorder, BenchResult, QueryCounter, find_regressions, measure
+
+pytestmark = pytest.mark.asyncio(scope='session')
+
+BASELINE = {'p50_ms': 10.0, 'p95_ms': 20.0, 'p99_ms': 30.0, 'queries': 5, 'peak_kib': 1000}
+
+
+def _result(**overrides) -> BenchResult:
+    values = {'iterations': 10, **BASELINE, **overrides}
+    return BenchResult(**values)
+
+
+def test_find_regressions():
+    assert find_regressions(_result(), None, 0.5) == []
+    # В пределах порога и абсолютного запаса
+    assert find_regressions(_result(p50_ms=16.9, p95_ms=31.9, p99_ms=90.0, peak_kib=1700), BASELINE, 0.5) == []
+
+    problems = find_regressions(_result(p95_ms=40.0, queries=6, peak_kib=2000), BASELINE, 0.5)
+    assert [problem.split()[0] for problem in problems] == ['p95_ms', 'queries', 'peak_kib']
+
+
+def test_recorder_compares_only_same_fleet(tmp_path: Path):
+    path = tmp_path / 'baseline.json'
+    path.write_text(json.dumps({'fleet': {'devices': 10}, 'results': {'case': BASELINE}}))
+
+    assert BenchRecorder(path, {'devices': 10}, 0.5).check('case', _result(queries=9))
+    recorder = BenchRecorder(path, {'devices': 20}, 0.5)
+    assert recorder.check('case', _result(queries=9)) == []
+
+    recorder.save_baseline()
+    saved = json.loads(path.read_text())
+    assert saved['fleet'] == {'devices': 20}
+    assert saved['results']['case']['queries'] == 9
+
+
+class _Response:
+    status_code = 200
+
+
+async def test_measure_counts_queries():
+    counter = QueryCounter()
+
+    async def call():
+        counter()
+        counter()
+        return _Response()
+
+    result = await measure(call, counter, iterations=5, warmup=1)
+
+    assert (result.iterations, result.queries) == (5, 2)
+    assert result.p50_ms <= result.p95_ms <= result.p99_ms
@@ -0,0 +1,199 @@
+"""
+Горячие HTTP-пути на синтетическом парке.
+
+Запуск: pytest tests/benchmarks --benchmark --no-cov [--benchmark-save]
+Результаты прогона - в .benchmarks/latest.json, baseline - tests/benchmarks/baseline.json.
+"""
+import csv
+import io
+import json
+from collections.abc import Callable
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, Response
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import selectinload
+
+from app.models import Device, DeviceModel, DeviceStatus
+from app.models.device import device_tags_table
+from app.services.fleet_generator_service import FLEET_SOURCE
+from app.services.ingestion_service import IngestionService
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.asyncio(scope='session')]
+
+LIST_FILTERS = (
+    'asset_type_id', 'status_id', 'department_id', 'location_id', 'manufacturer_id',
+    'employee_id', 'supplier_id', 'tag_id',
+)
+# Ключи SORTABLE_COLUMNS (app/services/device_service.py)
+LIST_SORTS = (
+    'name', 'inventory_number', 'asset_type', 'device_model', 'status', 'location',
+    'updated_at', 'tags', 'price', 'purchase_date', 'employee', 'supplier',
+)
+IMPORT_ROWS = 500
+IMPORT_HEADER = ['Инвентарный номер', 'Название', 'Серийный номер', 'Тип', 'Производитель', 'Модель', 'Статус']
+
+# Два набора чередуются, чтобы каждая загрузка меняла состав компонентов
+COMPONENT_SETS = [
+    [
+        {'type': 'motherboard', 'name': 'PRO B660M-A', 'serial_number': 'BENCH-MB-1', 'manufacturer': 'MSI'},
+        {'type': 'cpu', 'name': 'Core i5-12400', 'cores': 6, 'threads': 12},
+        {'type': 'ram', 'name': 'DDR4-3200 16GB', 'serial_number': 'BENCH-RAM-1', 'size_mb': size_mb},
+        {'type': 'storage', 'name': 'NVMe 512GB', 'type_label': 'NVMe', 'capacity_gb': 512},
+    ]
+    for size_mb in (16384, 32768)
+]
+
+
+@pytest_asyncio.fixture(scope='session')
+async def fleet_values(bench_sessions: async_sessionmaker[AsyncSession]) -> dict:
+    """Самые частые значения фильтров парка и данные для запросов на запись."""
+    async with bench_sessions() as session:
+        async def most_common(column, source) -> int:
+            stmt = (
+                select(column)
+                .select_from(source)
+                .where(column.is_not(None))
+                .group_by(column)
+                .order_by(func.count().desc(), column)
+                .limit(1)
+            )
+            return await session.scalar(stmt)
+
+        values = {
+            name: await most_common(getattr(Device, name), Device)
+            for name in LIST_FILTERS
+            if hasattr(Device, name)
+        }
+        values['manufacturer_id'] = await most_common(
+            DeviceModel.manufacturer_id, Device.__table__.join(DeviceModel.__table__)
+        )
+        values['tag_id'] = await most_common(device_tags_table.c.tag_id, device_tags_table)
+
+        model = (await session.scalars(
+            select(DeviceModel)
+            .options(selectinload(DeviceModel.manufacturer), selectinload(DeviceModel.asset_type))
+            .where(DeviceModel.id == await most_common(Device.device_model_id, Device))
+        )).one()
+        values['import_row'] = [
+            model.asset_type.name,
+            model.manufacturer.name,
+            model.name,
+            await session.scalar(select(DeviceStatus.name).where(DeviceStatus.id == values['status_id'])),
+        ]
+        values['device_id'] = await session.scalar(
+            select(func.min(Device.id)).where(Device.source == FLEET_SOURCE)
+        )
+        return values
+
+
+def _get(client: AsyncClient, url: str) -> Callable:
+    return lambda: client.get(url)
+
+
+async def test_assets_list(bench_client: AsyncClient, benchmark):
+    await benchmark('assets_list', _get(bench_client, '/assets-list'))
+
+
+async def test_assets_list_results(bench_client: AsyncClient, benchmark):
+    # Смена страницы без перезагрузки: только таблица и пагинация
+    await benchmark('assets_list_results', _get(bench_client, '/assets-list/results?page=2'))
+
+
+@pytest.mark.parametrize('name', LIST_FILTERS)
+async def test_assets_list_filter(bench_client: AsyncClient, fleet_values: dict, benchmark, name: str):
+    await benchmark(f'assets_list[{name}]', _get(bench_client, f'/assets-list?{name}={fleet_values[name]}'))
+
+
+async def test_assets_list_search(bench_client: AsyncClient, benchmark):
+    await benchmark('assets_list[search]', _get(bench_client, '/assets-list?search=SYN-1-0000123'))
+
+
+@pytest.mark.parametrize('sort_by', LIST_SORTS)
+async def test_assets_list_sort(bench_client: AsyncClient, benchmark, sort_by: str):
+    url = f'/assets-list?sort_by={sort_by}&sort_order=desc'
+    await benchmark(f'assets_list[sort={sort_by}]', _get(bench_client, url))
+
+
+async def test_export_csv(bench_client: AsyncClient, benchmark):
+    await benchmark('export_csv', _get(bench_client, '/export/csv'), iterations=5)
+
+
+async def test_import_csv(bench_client: AsyncClient, fleet_values: dict, restore_writes, benchmark):
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(IMPORT_HEADER)
+    for number in range(IMPORT_ROWS):
+        writer.writerow([f'BENCH-{number}', f'Bench {number}', f'BENCH-SN-{number}', *fleet_values['import_row']])
+    content = output.getvalue().encode('utf-8-sig')
+
+    async def call() -> Response:
+        # Первый (прогревочный) импорт создает активы, замеряемые - обновляют их
+        files = {'file': ('bench.csv', content, 'text/csv')}
+        return await bench_client.post('/api/assets/import', files=files)
+
+    async with restore_writes():
+        await benchmark('import_csv', call, iterations=5)
+
+
+async def _upload_target(sessions: async_sessionmaker[AsyncSession], template_id: int) -> int:
+    """
+    Пустое устройство для загрузки компонентов: создается внутри restore_writes()
+    и удаляется вместе с компонентами, так что парк и замер от прогона не меняются.
+    """
+    async with sessions() as session:
+        template = await session.get(Device, template_id)
+        device = Device(
+            name='Bench upload',
+            inventory_number='BENCH-UPLOAD',
+            asset_type_id=template.asset_type_id,
+            device_model_id=template.device_model_id,
+            status_id=template.status_id,
+        )
+        session.add(device)
+        await session.commit()
+        return device.id
+
+
+async def test_components_upload(
+    bench_client: AsyncClient,
+    bench_sessions: async_sessionmaker[AsyncSession],
+    fleet_values: dict,
+    restore_writes,
+    benchmark,
+):
+    uploads = 0
+
+    async with restore_writes():
+        device_id = await _upload_target(bench_sessions, fleet_values['device_id'])
+
+        async def call() -> Response:
+            # Загрузка ставится в очередь; замер включает обработку задания.
+            # Прогревочные загрузки заполняют устройство, замеряемые - меняют состав
+            nonlocal uploads
+            payload = json.dumps(COMPONENT_SETS[uploads % len(COMPONENT_SETS)]).encode()
+            uploads += 1
+            response = await bench_client.post(
+                f'/{device_id}/components/upload',
+                files={'file': ('report.json', payload, 'application/json')},
+            )
+            async with bench_sessions() as session:
+                await IngestionService.process_batch(session, batch_size=10)
+            return response
+
+        await benchmark('components_upload', call, iterations=20)
+
+
+async def test_analytics_dashboard(bench_client: AsyncClient, benchmark):
+    await benchmark('analytics_dashboard', _get(bench_client, '/api/analytics/dashboard'))
+
+
+async def test_audit_log(bench_client: AsyncClient, benchmark):
+    await benchmark('audit_log', _get(bench_client, '/audit-logs'))
+
+
+async def test_audit_log_filtered(bench_client: AsyncClient, fleet_values: dict, benchmark):
+    url = f'/audit-logs?action_type=update&entity_id={fleet_values["device_id"]}'
+    await benchmark('audit_log[entity]', _get(bench_client, url))
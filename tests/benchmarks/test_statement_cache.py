@@ -0,0 +1,154 @@
+"""
+Микробенчмарк построения запросов списка активов и кэша компиляции SQLAlchemy.
+
+Запуск: pytest tests/benchmarks/test_statement_cache.py --benchmark --no-cov -s
+Пишет .benchmarks/statement_cache.json. Парк не нужен: запросы идут в тестовую базу.
+"""
+import json
+import random
+import timeit
+from collections.abc import AsyncGenerator
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import lambda_stmt, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import selectinload
+
+from app.db.instrumentation import track_queries
+from app.models import Device, DeviceModel, DeviceStatus
+from app.services.device_service import DeviceService
+from tests.conftest import TEST_DATABASE_URL
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.asyncio]
+
+REQUESTS = 500
+BUILD_ITERATIONS = 2000
+# Частые на странице списка наборы фильтров; значения в каждом запросе свои
+FILTER_SHAPES = (
+    (),
+    ('search',),
+    ('status_id',),
+    ('asset_type_id', 'status_id'),
+    ('location_id', 'department_id'),
+    ('manufacturer_id',),
+    ('tag_id',),
+)
+SORTS = (None, 'name', 'status', 'updated_at')
+
+
+@pytest_asyncio.fixture
+async def engine() -> AsyncGenerator[AsyncEngine, None]:
+    # Свой движок: кэш компиляции начинается пустым
+    engine = create_async_engine(TEST_DATABASE_URL)
+    yield engine
+    await engine.dispose()
+
+
+def _random_request(rng: random.Random) -> tuple[tuple, dict]:
+    """Форма запроса (фильтры и сортировка) и аргументы get_devices_with_filters."""
+    shape = rng.choice(FILTER_SHAPES)
+    sort_by, sort_order = rng.choice(SORTS), rng.choice(('asc', 'desc'))
+    filters = {name: (f'PC-{rng.randint(1, 9999)}' if name == 'search' else rng.randint(1, 1000)) for name in shape}
+    request = {
+        'page': rng.randint(1, 50),
+        'page_size': rng.choice((20, 50)),
+        'sort_by': sort_by,
+        'sort_order': sort_order,
+        **filters,
+    }
+    return (shape, sort_by, sort_order), request
+
+
+def _plain_list_statement(status_id: int, offset: int):
+    """Тот же запрос, что строит DeviceService для status_id и сортировки по статусу, обычным select()."""
+    return (
+        select(Device)
+        .options(
+            selectinload(Device.asset_type),
+            selectinload(Device.device_model).options(
+                selectinload(DeviceModel.manufacturer),
+                selectinload(DeviceModel.asset_type),
+            ),
+            selectinload(Device.status),
+            selectinload(Device.department),
+            selectinload(Device.location),
+            selectinload(Device.employee),
+            selectinload(Device.tags),
+            selectinload(Device.supplier),
+        )
+        .where(Device.status_id == status_id)
+        .outerjoin(Device.status)
+        .order_by(DeviceStatus.name.asc())
+        .offset(offset)
+        .limit(20)
+    )
+
+
+def _lambda_list_statement(service: DeviceService, status_id: int, offset: int):
+    stmt = lambda_stmt(
+        lambda: select(Device).options(
+            selectinload(Device.asset_type),
+            selectinload(Device.device_model).options(
+                selectinload(DeviceModel.manufacturer),
+                selectinload(DeviceModel.asset_type),
+            ),
+            selectinload(Device.status),
+            selectinload(Device.department),
+            selectinload(Device.location),
+            selectinload(Device.employee),
+            selectinload(Device.tags),
+            selectinload(Device.supplier),
+        )
+    )
+    stmt = service._apply_filters(stmt, {'status_id': status_id})
+    stmt = service._apply_sorting(stmt, 'status', 'asc')
+    return stmt + (lambda s: s.offset(offset).limit(20))
+
+
+def _build_us(build) -> float:
+    """Микросекунды на построение запроса и его ключа кэша компиляции."""
+    counter = iter(range(10**9))
+
+    def run():
+        n = next(counter)
+        build(n % 1000 + 1, n % 50 * 20)._generate_cache_key()
+
+    run()
+    return round(timeit.timeit(run, number=BUILD_ITERATIONS) / BUILD_ITERATIONS * 1e6, 1)
+
+
+async def test_list_statement_cache(engine: AsyncEngine, pytestconfig: pytest.Config):
+    service = DeviceService()
+    rng = random.Random(1)
+    shapes = set()
+
+    async with AsyncSession(engine) as session:
+        with track_queries() as stats:
+            for _ in range(REQUESTS):
+                shape, request = _random_request(rng)
+                shapes.add(shape)
+                await service.get_devices_with_filters(session, **request)
+            await session.rollback()
+
+    compiled = len(engine.sync_engine._compiled_cache)
+    result = {
+        'requests': REQUESTS,
+        'filter_shapes': len(shapes),
+        'statements': stats.count,
+        'cache_hits': stats.cache_hits,
+        'cache_hit_ratio': round(stats.cache_hit_ratio, 4),
+        'compiled_cache_entries': compiled,
+        'build_us': {
+            'select': _build_us(_plain_list_statement),
+            'lambda_stmt': _build_us(lambda status_id, offset: _lambda_list_statement(service, status_id, offset)),
+        },
+    }
+    path = pytestconfig.rootpath / '.benchmarks' / 'statement_cache.json'
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(result, indent=2) + '\n')
+    print(json.dumps(result, indent=2))
+
+    # Компилируется каждая форма запроса (список и счетчик) по разу, остальное - попадания
+    assert stats.count - stats.cache_hits <= 2 * len(shapes)
+    assert result['build_us']['lambda_stmt'] < result['build_us']['select']
@@ -1,8 +1,11 @@
 import os
 import subprocess
+from collections.abc import Callable, Iterator
+from contextlib import AbstractContextManager, contextmanager
 from typing import AsyncGenerator
 
 import asyncpg
+import pytest
 import pytest_asyncio
 from fastapi import FastAPI
 from httpx import ASGITransport, AsyncClient
@@ -16,9 +19,14 @@ from sqlalchemy.ext.asyncio import (
 import app.models  # noqa: F401
 from app.config import settings
 from app.db.database import get_db
+from app.db.instrumentation import QueryStats, track_queries
 from app.main import create_app
 from app.models.user import User
-from app.api.deps import get_current_user_from_session, get_current_superuser_from_session
+from app.api.deps import (
+    get_current_active_superuser,
+    get_current_superuser_from_session,
+    get_current_user_from_session,
+)
 
 # Настройка тестовой базы данных
 TEST_DATABASE_URL = settings.DATABASE_URL_ASYNC.replace(
@@ -26,11 +34,37 @@ TEST_DATABASE_URL = settings.DATABASE_URL_ASYNC.replace(
 )
 
 
-@pytest_asyncio.fixture(scope="session", autouse=True)
-async def ensure_test_db() -> None:
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup('benchmark', 'нагрузочные тесты (tests/benchmarks)')
+    group.addoption('--benchmark', action='store_true', help='запустить нагрузочные тесты')
+    group.addoption(
+        '--benchmark-save', action='store_true', help='записать результаты в baseline.json'
+    )
+    group.addoption(
+        '--benchmark-devices', type=int, default=20_000, help='размер синтетического парка'
+    )
+    group.addoption(
+        '--benchmark-threshold',
+        type=float,
+        default=0.5,
+        help='допустимый рост латентности и памяти относительно baseline (доля)',
+    )
+
+
+def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]) -> None:
+    """Нагрузочные тесты долгие и требуют отдельной базы: только с --benchmark."""
+    if config.getoption('--benchmark'):
+        return
+    skip = pytest.mark.skip(reason='нагрузочный тест: запускается с --benchmark')
+    for item in items:
+        if 'benchmark' in item.keywords:
+            item.add_marker(skip)
+
+
+async def ensure_database(db_name: str, database_url: str) -> None:
     """
-    Гарантирует существование тестовой базы данных и накатывает миграции.
-    Запускается один раз перед всеми тестами.
+    Создает базу данных, если её нет, и накатывает миграции.
+    Используется тестовой базой и базой нагрузочных тестов (tests/benchmarks).
     """
     # 1. Создаем базу данных если нет
     admin_url = settings.DATABASE_URL_SYNC.replace(
@@ -38,20 +72,19 @@ async def ensure_test_db() -> None:
     )
     # Используем asyncpg напрямую для простых операций
     conn = await asyncpg.connect(admin_url)
-    test_db_name = f'{settings.POSTGRES_DB}_test'
     try:
         db_exists = await conn.fetchval(
-            'SELECT EXISTS (SELECT 1 FROM pg_database WHERE datname = $1)', test_db_name
+            'SELECT EXISTS (SELECT 1 FROM pg_database WHERE datname = $1)', db_name
         )
         if not db_exists:
-            await conn.execute(f'CREATE DATABASE "{test_db_name}"')
+            await conn.execute(f'CREATE DATABASE "{db_name}"')
     finally:
         await conn.close()
 
     # 2. Применяем миграции (Alembic)
     # Запускаем в синхронном subprocess, так как это разовая операция
     env = os.environ.copy()
-    env['DATABASE_URL'] = TEST_DATABASE_URL
+    env['DATABASE_URL'] = database_url
 
     # Пытаемся запустить миграции.
     # check=True вызовет ошибку если миграции упадут
@@ -68,6 +101,37 @@ async def ensure_test_db() -> None:
         raise e
 
 
+@pytest.fixture
+def query_budget() -> Callable[..., AbstractContextManager[QueryStats]]:
+    """
+    with query_budget(5): ... - блок выполняет не больше 5 SQL-запросов и ни один
+    SQL не повторяется больше max_repeats раз (повтор одного запроса с разными
+    параметрами - признак N+1).
+    """
+
+    @contextmanager
+    def budget(max_queries: int, max_repeats: int = 1) -> Iterator[QueryStats]:
+        with track_queries() as stats:
+            yield stats
+        problems = []
+        if stats.count > max_queries:
+            problems.append(f'{stats.count} SQL-запросов при бюджете {max_queries}')
+        for statement, count in stats.repeated(max_repeats + 1).items():
+            problems.append(f'{count} повторов: {statement}')
+        assert not problems, '\n'.join(problems)
+
+    return budget
+
+
+@pytest_asyncio.fixture(scope="session", autouse=True)
+async def ensure_test_db() -> None:
+    """
+    Гарантирует существование тестовой базы данных и накатывает миграции.
+    Запускается один раз перед всеми тестами.
+    """
+    await ensure_database(f'{settings.POSTGRES_DB}_test', TEST_DATABASE_URL)
+
+
 @pytest_asyncio.fixture(scope="function")
 async def engine_test() -> AsyncGenerator[AsyncEngine, None]:
     """
@@ -143,6 +207,7 @@ def test_app(db_session: AsyncSession) -> FastAPI:
     application.dependency_overrides[get_db] = override_get_db
     application.dependency_overrides[get_current_user_from_session] = override_get_user
     application.dependency_overrides[get_current_superuser_from_session] = override_get_user
+    application.dependency_overrides[get_current_active_superuser] = override_get_user
     
     return application
 
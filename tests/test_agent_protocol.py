@@ -0,0 +1,98 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+from httpx import AsyncClient
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Device
+from app.schemas.component import ComponentItem
+from app.services.component_service import ComponentService
+from app.utils.agent_client import AgentClient
+
+pytestmark = pytest.mark.asyncio
+
+REPORT = [
+    {'type': 'motherboard', 'name': 'B550M', 'serial_number': 'MB-1', 'manufacturer': 'ASUS'},
+    {'type': 'cpu', 'name': 'Ryzen 5 5600', 'cores': 6, 'threads': 12},
+    {'type': 'ram', 'name': 'DDR4-3200', 'size_mb': 8192},
+    {'type': 'ram', 'name': 'DDR4-3200', 'size_mb': 8192},
+    {'type': 'storage', 'name': 'Samsung 980', 'type_label': 'SSD', 'capacity_gb': 500, 'serial_number': 'S1'},
+]
+
+
+@pytest.fixture
+async def device(db_session: AsyncSession, test_data: dict) -> Device:
+    device = Device(
+        name='Agent PC',
+        inventory_number='AGENT-001',
+        asset_type_id=test_data['asset_type'].id,
+        device_model_id=test_data['device_model'].id,
+        status_id=test_data['status'].id,
+    )
+    db_session.add(device)
+    await db_session.flush()
+    return device
+
+
+async def test_full_then_unchanged_then_delta(async_client: AsyncClient, device: Device):
+    client = AgentClient(async_client)
+
+    result = await client.report(device.id, REPORT)
+    assert result['status'] == 'applied'
+    assert result['added'] == len(REPORT)
+    assert 'components' in client.last_report
+
+    result = await client.report(device.id, list(reversed(REPORT)))
+    assert result['status'] == 'unchanged'
+    assert client.last_report['unchanged'] is True
+    assert 'components' not in client.last_report
+
+    changed = [dict(item) for item in REPORT]
+    changed[3]['size_mb'] = 16384
+    result = await client.report(device.id, changed)
+    assert (result['status'], result['updated']) == ('applied', 1)
+    assert len(client.last_report['added']) == 1
+    assert len(client.last_report['removed']) == 1
+    assert 'components' not in client.last_report
+
+
+async def test_stale_delta_falls_back_to_full_report(
+    async_client: AsyncClient, db_session: AsyncSession, device: Device
+):
+    client = AgentClient(async_client)
+    await client.report(device.id, REPORT)
+    state = (await async_client.get(f'/api/agent/v1/devices/{device.id}/state')).json()
+
+    # Состояние на сервере меняется между запросом /state и отправкой дельты
+    items = TypeAdapter(list[ComponentItem]).validate_python(REPORT[:2])
+    await ComponentService.sync_components(db_session, device.id, items)
+
+    stale = AgentClient.build_report(state, [item.model_dump() for item in items[:1]])
+    response = await async_client.post(f'/api/agent/v1/devices/{device.id}/report', json=stale)
+    assert response.status_code == 409
+
+    result = await client.report(device.id, REPORT[:1])
+    assert result['status'] == 'applied'
+
+
+async def test_unknown_device_and_version(async_client: AsyncClient):
+    response = await async_client.get('/api/agent/v1/devices/999999/state')
+    assert response.status_code == 404
+
+    response = await async_client.post(
+        '/api/agent/v1/devices/999999/report', json={'protocol_version': 99, 'fingerprint': 'x'}
+    )
+    assert response.status_code == 400
+
+
+def test_agent_protocol_module_matches_server():
+    path = Path(__file__).resolve().parents[1] / 'agent_builder' / 'src' / 'protocol.py'
+    spec = importlib.util.spec_from_file_location('agent_protocol', path)
+    protocol = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(protocol)
+
+    items = TypeAdapter(list[ComponentItem]).validate_python(REPORT)
+    assert protocol.fingerprint(REPORT) == ComponentService.fingerprint(items)
+    assert protocol.item_hash(REPORT[1]) == ComponentService.item_hash(items[1].model_dump())
@@ -0,0 +1,206 @@
+import csv
+import io
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Device, Supplier
+from app.services.asset_import_service import AssetImportService
+from app.services.exceptions import AssetImportError
+
+pytestmark = pytest.mark.asyncio
+
+HEADER = ['Инвентарный номер', 'Название', 'Серийный номер', 'Тип', 'Производитель', 'Модель',
+          'Статус', 'Локация', 'Дата покупки', 'Цена', 'Теги']
+
+
+def _csv(rows: list[list], delimiter: str = ',') -> io.BytesIO:
+    output = io.StringIO()
+    writer = csv.writer(output, delimiter=delimiter)
+    writer.writerow(HEADER)
+    writer.writerows(rows)
+    return io.BytesIO(output.getvalue().encode('utf-8-sig'))
+
+
+def _row(test_data: dict, legacy: str, serial: str | None, **overrides) -> list:
+    values = {
+        'legacy': legacy,
+        'name': f'Old {legacy}',
+        'serial': serial,
+        'type': test_data['asset_type'].name,
+        'manufacturer': test_data['manufacturer'].name,
+        'model': test_data['device_model'].name,
+        'status': test_data['status'].name,
+        'location': test_data['location'].name,
+        'date': '15.03.2021',
+        'price': '12 500,50',
+        'tags': test_data['tag'].name,
+    }
+    values.update(overrides)
+    return list(values.values())
+
+
+async def _legacy_devices(db_session: AsyncSession) -> int:
+    stmt = select(func.count()).select_from(Device).where(Device.legacy_inventory_number.is_not(None))
+    return await db_session.scalar(stmt)
+
+
+async def test_import_creates_updates_and_reports_rows(db_session: AsyncSession, test_data: dict):
+    rows = [
+        _row(test_data, 'OLD-1', 'IMP-1'),
+        _row(test_data, 'OLD-2', 'IMP-2'),
+        _row(test_data, 'OLD-3', 'IMP-3', status='Нет такого'),
+        _row(test_data, 'OLD-4', 'IMP-1'),  # повтор серийного номера
+        _row(test_data, 'OLD-5', 'IMP-5', date='31.02.2021'),
+        _row(test_data, 'OLD-6', None, price='дорого'),
+        _row(test_data, 'OLD-7', None),
+    ]
+    service = AssetImportService(chunk_size=3)
+    user_id = test_data['user'].id
+
+    report = await service.import_file(db_session, _csv(rows, delimiter=';'), 'legacy.csv', user_id)
+
+    assert (report.total_rows, report.created, report.updated, report.failed) == (7, 3, 0, 4)
+    errors = {error.row: error.message for error in report.errors}
+    assert sorted(errors) == [4, 5, 6, 7]
+    assert 'статус "Нет такого"' in errors[4]
+    # Строка 5 во второй порции: серийный номер уже занят активом из первой
+    assert 'IMP-1' in errors[5]
+
+    device = (await db_session.execute(
+        select(Device).where(Device.legacy_inventory_number == 'OLD-1')
+    )).scalar_one()
+    assert device.inventory_number.startswith('PC-')
+    assert device.purchase_date.isoformat() == '2021-03-15'
+    assert float(device.price) == 12500.5
+    assert device.source == 'import'
+
+    # Повторный импорт обновляет найденные активы по номеру старой системы
+    rows = [_row(test_data, 'OLD-1', 'IMP-1', name='Renamed'), _row(test_data, 'OLD-8', 'IMP-8')]
+    report = await service.import_file(db_session, _csv(rows), 'legacy.csv', user_id)
+    assert (report.created, report.updated, report.failed) == (1, 1, 0)
+
+    await db_session.refresh(device)
+    assert device.name == 'Renamed'
+    assert await _legacy_devices(db_session) == 4
+
+
+async def test_import_updates_newest_device_with_duplicated_legacy_number(
+    db_session: AsyncSession, test_data: dict
+):
+    devices = [
+        Device(
+            name=name,
+            inventory_number=f'DUP-LEGACY-{number}',
+            legacy_inventory_number='OLD-DUP',
+            asset_type_id=test_data['asset_type'].id,
+            device_model_id=test_data['device_model'].id,
+            status_id=test_data['status'].id,
+        )
+        for number, name in enumerate(('Older', 'Newer'))
+    ]
+    db_session.add_all(devices)
+    await db_session.flush()
+    older, newer = sorted(devices, key=lambda device: device.id)
+
+    rows = [_row(test_data, 'OLD-DUP', None, name='Renamed')]
+    report = await AssetImportService().import_file(db_session, _csv(rows), 'legacy.csv', test_data['user'].id)
+    assert (report.created, report.updated, report.failed) == (0, 1, 0)
+
+    await db_session.refresh(older)
+    await db_session.refresh(newer)
+    assert (older.name, newer.name) == ('Older', 'Renamed')
+
+
+async def test_reimport_keeps_fields_missing_from_file(db_session: AsyncSession, test_data: dict):
+    supplier = Supplier(name='Import Supplier')
+    db_session.add(supplier)
+    await db_session.flush()
+    device = Device(
+        name='Бухгалтерия-1',
+        inventory_number='KEEP-01',
+        legacy_inventory_number='OLD-KEEP',
+        ip_address='10.0.0.15',
+        notes='Не выключать',
+        price=1000,
+        source='purchase',
+        supplier_id=supplier.id,
+        asset_type_id=test_data['asset_type'].id,
+        device_model_id=test_data['device_model'].id,
+        status_id=test_data['status'].id,
+        location_id=test_data['location'].id,
+    )
+    db_session.add(device)
+    await db_session.flush()
+
+    # Колонки как в /export/csv: без названия, примечаний, IP, цены и поставщика
+    header = ['Инвентарный номер', 'Серийный номер', 'Тип', 'Производитель', 'Модель', 'Статус', 'Локация']
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(header)
+    writer.writerow([
+        'OLD-KEEP', 'KEEP-SN', test_data['asset_type'].name, test_data['manufacturer'].name,
+        test_data['device_model'].name, test_data['status'].name, '',
+    ])
+    file = io.BytesIO(output.getvalue().encode('utf-8-sig'))
+
+    report = await AssetImportService().import_file(db_session, file, 'export.csv', test_data['user'].id)
+    assert (report.created, report.updated, report.failed) == (0, 1, 0)
+
+    await db_session.refresh(device)
+    assert device.serial_number == 'KEEP-SN'
+    # Пустая ячейка колонки из файла очищает поле
+    assert device.location_id is None
+    assert (device.name, device.ip_address, device.notes, float(device.price)) == (
+        'Бухгалтерия-1', '10.0.0.15', 'Не выключать', 1000.0
+    )
+    assert (device.supplier_id, device.source) == (supplier.id, 'purchase')
+
+
+async def test_import_caps_reported_errors(db_session: AsyncSession, test_data: dict, monkeypatch):
+    monkeypatch.setattr('app.services.asset_import_service.MAX_REPORTED_ERRORS', 2)
+    rows = [_row(test_data, f'BAD-{i}', None, model='Нет модели') for i in range(5)]
+
+    report = await AssetImportService().import_file(db_session, _csv(rows), 'bad.csv', test_data['user'].id)
+
+    assert report.failed == 5
+    assert len(report.errors) == 2
+    assert report.errors_truncated is True
+
+
+async def test_import_rejects_unusable_files(db_session: AsyncSession, test_data: dict):
+    service = AssetImportService()
+    with pytest.raises(AssetImportError, match='.csv и .xlsx'):
+        await service.import_file(db_session, io.BytesIO(b''), 'assets.txt', test_data['user'].id)
+    with pytest.raises(AssetImportError, match='device_model'):
+        await service.import_file(
+            db_session, io.BytesIO('Тип,Статус\n'.encode()), 'assets.csv', test_data['user'].id
+        )
+
+
+async def test_import_xlsx(db_session: AsyncSession, test_data: dict):
+    openpyxl = pytest.importorskip('openpyxl')
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(HEADER)
+    sheet.append(_row(test_data, 'XLS-1', 'XLS-SN-1'))
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    buffer.seek(0)
+
+    report = await AssetImportService().import_file(db_session, buffer, 'legacy.xlsx', test_data['user'].id)
+
+    assert (report.created, report.failed) == (1, 0)
+
+
+async def test_import_endpoint(async_client: AsyncClient, test_data: dict):
+    files = {'file': ('legacy.csv', _csv([_row(test_data, 'API-1', 'API-SN-1')]).getvalue(), 'text/csv')}
+    response = await async_client.post('/api/assets/import', files=files)
+    assert response.status_code == 200
+    assert response.json()['created'] == 1
+
+    files = {'file': ('legacy.pdf', b'%PDF', 'application/pdf')}
+    response = await async_client.post('/api/assets/import', files=files)
+    assert response.status_code == 400
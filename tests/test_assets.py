@@ -1,9 +1,13 @@
 import pytest
 from httpx import AsyncClient
+from pydantic import TypeAdapter
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import Device
+from app.api.endpoints.assets import COMPONENT_HISTORY_WINDOW
+from app.models import ComponentHistory, Device
+from app.schemas.component import ComponentItem
+from app.services.component_service import ComponentService
 
 pytestmark = pytest.mark.asyncio
 
@@ -37,6 +41,40 @@ async def test_read_assets_list_with_data(
     # assert 'Test Tag' in response.text # Если выводим теги в списке
 
 
+async def test_read_assets_results_fragment(
+    async_client: AsyncClient, db_session: AsyncSession, test_data: dict
+):
+    """Тест: /assets-list/results отдает только таблицу и пагинацию для тех же фильтров."""
+    db_session.add_all([
+        Device(
+            name=f'Fragment PC {n}',
+            inventory_number=f'FRG-{n}',
+            asset_type_id=test_data['asset_type'].id,
+            device_model_id=test_data['device_model'].id,
+            status_id=test_data['status'].id,
+            location_id=test_data['location'].id,
+        )
+        for n in range(3)
+    ])
+    await db_session.flush()
+
+    params = {'search': 'FRG-', 'page_size': 2, 'page': 2, 'sort_by': 'inventory_number'}
+    response = await async_client.get('/assets-list/results', params=params)
+    assert response.status_code == 200
+    html = response.text
+    assert html.lstrip().startswith('<!-- templates/includes/assets_results.html -->')
+    assert 'id="assets-results" data-total="3"' in html
+    assert 'Fragment PC 2' in html and 'Fragment PC 0' not in html
+    # Ссылки ведут на полную страницу с тем же состоянием фильтров
+    assert '/assets-list?search=FRG-&amp;page_size=2&amp;sort_by=inventory_number&amp;page=1' in html
+    # Ни каркаса страницы, ни справочников фильтров
+    assert '<html' not in html and 'name="employee_id"' not in html
+
+    page = await async_client.get('/assets-list', params=params)
+    assert 'id="assets-results" data-total="3"' in page.text
+    assert 'js-assets-filters' in page.text
+
+
 async def test_create_asset_invalid_data(
     async_client: AsyncClient, test_data: dict
 ):
@@ -171,3 +209,110 @@ async def test_full_asset_crud_cycle(
 
     deleted_device = await db_session.get(Device, device_id)
     assert deleted_device is None
+
+
+async def test_edit_page_shows_recent_component_history(
+    async_client: AsyncClient, db_session: AsyncSession, test_data: dict
+):
+    """Тест: Страница редактирования показывает окно истории, остальное - через API."""
+    device = Device(
+        name='History PC',
+        inventory_number='HIST-01',
+        asset_type_id=test_data['asset_type'].id,
+        device_model_id=test_data['device_model'].id,
+        status_id=test_data['status'].id,
+    )
+    db_session.add(device)
+    await db_session.flush()
+    db_session.add_all(
+        ComponentHistory(asset_id=device.id, change_type='ADD', component_snapshot={'n': i})
+        for i in range(COMPONENT_HISTORY_WINDOW + 5)
+    )
+    await db_session.flush()
+
+    response = await async_client.get(f'/edit/{device.id}')
+    assert response.status_code == 200
+    assert 'Более ранние записи' in response.text
+
+    page = (await async_client.get(f'/{device.id}/components/history', params={'limit': 10})).json()
+    assert len(page['items']) == 10
+    rest = (
+        await async_client.get(
+            f'/{device.id}/components/history', params={'before_id': page['next_before_id'], 'limit': 100}
+        )
+    ).json()
+    assert len(rest['items']) == COMPONENT_HISTORY_WINDOW + 5 - 10
+    assert rest['next_before_id'] is None
+
+
+async def test_component_history_endpoints_404_for_missing_asset(
+    async_client: AsyncClient, db_session: AsyncSession, test_data: dict
+):
+    """Тест: История и состав компонентов несуществующего актива - 404, пустого - пустой ответ."""
+    device = Device(
+        name='Empty PC',
+        inventory_number='EMPTY-01',
+        asset_type_id=test_data['asset_type'].id,
+        device_model_id=test_data['device_model'].id,
+        status_id=test_data['status'].id,
+    )
+    db_session.add(device)
+    await db_session.flush()
+    at = {'at': '2030-01-01T00:00:00Z'}
+
+    assert (await async_client.get('/999999/components/history')).status_code == 404
+    assert (await async_client.get('/999999/components/at', params=at)).status_code == 404
+
+    history = await async_client.get(f'/{device.id}/components/history')
+    assert history.status_code == 200
+    assert history.json()['items'] == []
+    components = await async_client.get(f'/{device.id}/components/at', params=at)
+    assert components.status_code == 200
+    assert components.json()['components'] == []
+
+
+async def test_edit_page_renders_flat_components(
+    async_client: AsyncClient, db_session: AsyncSession, test_data: dict
+):
+    """Тест: Текущая конфигурация на странице редактирования читается из плоской модели."""
+    device = Device(
+        name='Flat PC',
+        inventory_number='FLAT-01',
+        asset_type_id=test_data['asset_type'].id,
+        device_model_id=test_data['device_model'].id,
+        status_id=test_data['status'].id,
+    )
+    db_session.add(device)
+    await db_session.flush()
+    items = TypeAdapter(list[ComponentItem]).validate_python(
+        [{'type': 'ram', 'name': 'DDR4-3200', 'size_mb': 8192, 'speed_mhz': 3200}]
+    )
+    await ComponentService.sync_components(db_session, device.id, items)
+
+    response = await async_client.get(f'/edit/{device.id}')
+    assert response.status_code == 200
+    assert 'Size: 8192 MB, 3200 MHz' in response.text
+
+
+async def test_bulk_create_assets_endpoint(async_client: AsyncClient, test_data: dict):
+    """Тест: пакетное создание возвращает id и инвентарные номера; повтор серийника - 409."""
+    item = {
+        'name': 'Bulk PC',
+        'asset_type_id': test_data['asset_type'].id,
+        'device_model_id': test_data['device_model'].id,
+        'status_id': test_data['status'].id,
+        'source': 'bulk',
+    }
+    payload = {'items': [{**item, 'serial_number': f'BULK-API-{i}'} for i in range(3)]}
+
+    response = await async_client.post('/api/assets/bulk-create', json=payload)
+    assert response.status_code == 201
+    body = response.json()
+    assert body['created'] == 3
+    assert all(entry['inventory_number'].startswith('PC-') for entry in body['items'])
+
+    response = await async_client.post('/api/assets/bulk-create', json=payload)
+    assert response.status_code == 409
+
+    response = await async_client.post('/api/assets/bulk-create', json={'items': []})
+    assert response.status_code == 422
@@ -0,0 +1,190 @@
+from datetime import UTC, datetime
+
+import pytest
+from pydantic import TypeAdapter
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.models import ComponentFlat, ComponentHistory, ComponentRAM, Device
+from app.schemas.component import ComponentItem
+from app.services import component_service
+from app.services.component_service import ComponentService
+
+pytestmark = pytest.mark.asyncio
+
+WORKSTATION = [
+    {'type': 'motherboard', 'name': 'B550M', 'serial_number': 'MB-1', 'manufacturer': 'ASUS'},
+    {'type': 'cpu', 'name': 'Ryzen 5 5600', 'cores': 6, 'threads': 12, 'base_clock_mhz': 3500},
+    {'type': 'ram', 'name': 'DDR4-3200', 'size_mb': 8192, 'speed_mhz': 3200},
+    {'type': 'ram', 'name': 'DDR4-3200', 'size_mb': 8192, 'speed_mhz': 3200},
+    {'type': 'storage', 'name': 'Samsung 980', 'type_label': 'SSD', 'capacity_gb': 500, 'serial_number': 'S1'},
+    {'type': 'gpu', 'name': 'RTX 3060', 'memory_mb': 12288},
+]
+
+
+def _items(data: list[dict]) -> list:
+    return TypeAdapter(list[ComponentItem]).validate_python(data)
+
+
+@pytest.fixture
+async def device(db_session: AsyncSession, test_data: dict) -> Device:
+    device = Device(
+        name='Sync PC',
+        inventory_number='SYNC-001',
+        asset_type_id=test_data['asset_type'].id,
+        device_model_id=test_data['device_model'].id,
+        status_id=test_data['status'].id,
+    )
+    db_session.add(device)
+    await db_session.flush()
+    return device
+
+
+async def _history(db_session: AsyncSession, asset_id: int) -> list[str]:
+    stmt = select(ComponentHistory.change_type).where(
+        ComponentHistory.asset_id == asset_id, ComponentHistory.change_type != 'SNAPSHOT'
+    )
+    return sorted((await db_session.execute(stmt)).scalars().all())
+
+
+async def test_sync_adds_components_in_few_statements(
+    db_session: AsyncSession, engine_test: AsyncEngine, device: Device
+):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine_test.sync_engine, 'before_cursor_execute', count)
+    try:
+        await ComponentService.sync_components(db_session, device.id, _items(WORKSTATION))
+    finally:
+        event.remove(engine_test.sync_engine, 'before_cursor_execute', count)
+
+    # SELECT отпечатка + SELECT компонентов + (INSERT базы + INSERT подтипа)
+    # на каждый тип + upsert ComponentFlat + SELECT счётчика снимков
+    # + INSERT истории + UPDATE отпечатка
+    assert len(statements) <= 2 + 2 * 5 + 4
+    rams = (await db_session.execute(select(ComponentRAM).where(ComponentRAM.asset_id == device.id))).scalars().all()
+    assert len(rams) == 2
+    assert await _history(db_session, device.id) == ['ADD'] * len(WORKSTATION)
+
+
+async def test_resync_detects_update_and_remove(db_session: AsyncSession, device: Device):
+    await ComponentService.sync_components(db_session, device.id, _items(WORKSTATION))
+
+    changed = [dict(item) for item in WORKSTATION if item['type'] != 'gpu']
+    changed[2]['size_mb'] = 16384  # первая планка RAM
+    await ComponentService.sync_components(db_session, device.id, _items(changed))
+
+    history = await _history(db_session, device.id)
+    assert history.count('UPDATE') == 1
+    assert history.count('REMOVE') == 1
+
+    sizes = sorted(
+        (
+            await db_session.execute(select(ComponentRAM.size_mb).where(ComponentRAM.asset_id == device.id))
+        ).scalars().all()
+    )
+    assert sizes == [8192, 16384]
+
+
+async def test_resync_identical_report_is_noop(db_session: AsyncSession, device: Device):
+    await ComponentService.sync_components(db_session, device.id, _items(WORKSTATION))
+    await ComponentService.sync_components(db_session, device.id, _items(WORKSTATION))
+
+    assert await _history(db_session, device.id) == ['ADD'] * len(WORKSTATION)
+
+
+async def test_identical_report_short_circuits(
+    db_session: AsyncSession, engine_test: AsyncEngine, device: Device
+):
+    first = await ComponentService.sync_components(db_session, device.id, _items(WORKSTATION))
+    assert not first.unchanged
+    assert len(first.added) == len(WORKSTATION)
+
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine_test.sync_engine, 'before_cursor_execute', count)
+    try:
+        # Порядок компонентов в отчёте не влияет на отпечаток
+        second = await ComponentService.sync_components(
+            db_session, device.id, _items(list(reversed(WORKSTATION)))
+        )
+    finally:
+        event.remove(engine_test.sync_engine, 'before_cursor_execute', count)
+
+    assert second.unchanged
+    assert second.fingerprint == first.fingerprint
+    assert len(statements) == 1
+    assert 'components' not in statements[0].replace('components_fingerprint', '')
+
+
+async def test_history_stores_deltas_and_reconstructs(db_session: AsyncSession, device: Device):
+    await ComponentService.sync_components(db_session, device.id, _items(WORKSTATION))
+    before_upgrade = datetime.now(UTC)
+
+    changed = [dict(item) for item in WORKSTATION if item['type'] != 'gpu']
+    changed[2]['size_mb'] = 16384
+    await ComponentService.sync_components(db_session, device.id, _items(changed))
+
+    history, next_before_id = await ComponentService.get_history(db_session, device.id, limit=2)
+    assert [row.change_type for row in history] == ['REMOVE', 'UPDATE']
+    assert next_before_id == history[-1].id
+    assert history[1].component_snapshot['changes'] == {'size_mb': 16384}
+
+    older, _ = await ComponentService.get_history(db_session, device.id, limit=50, before_id=next_before_id)
+    assert [row.change_type for row in older] == ['ADD'] * len(WORKSTATION)
+
+    past = await ComponentService.get_components_at(db_session, device.id, before_upgrade)
+    assert sorted(c['type'] for c in past) == sorted(c['type'] for c in WORKSTATION)
+    assert sorted(c['size_mb'] for c in past if c['type'] == 'ram') == [8192, 8192]
+
+    now = await ComponentService.get_components_at(db_session, device.id, datetime.now(UTC))
+    assert 'gpu' not in {c['type'] for c in now}
+    assert sorted(c['size_mb'] for c in now if c['type'] == 'ram') == [8192, 16384]
+
+
+async def test_periodic_snapshot(db_session: AsyncSession, device: Device, monkeypatch):
+    monkeypatch.setattr(component_service, 'SNAPSHOT_INTERVAL', 3)
+    await ComponentService.sync_components(db_session, device.id, _items(WORKSTATION[:1]))
+    for size in (1024, 2048, 4096, 8192):
+        ram = {'type': 'ram', 'name': 'DDR4', 'size_mb': size}
+        await ComponentService.sync_components(db_session, device.id, _items([WORKSTATION[0], ram]))
+
+    snapshots = (
+        await db_session.execute(
+            select(ComponentHistory.component_snapshot)
+            .where(ComponentHistory.asset_id == device.id, ComponentHistory.change_type == 'SNAPSHOT')
+            .order_by(ComponentHistory.id)
+        )
+    ).scalars().all()
+    # Первый снимок - при первой синхронизации, следующий - после трёх дельт
+    assert len(snapshots) == 2
+    assert [c['size_mb'] for c in snapshots[-1]['components'] if c['type'] == 'ram'] == [4096]
+
+    # Снимок + одна дельта поверх него
+    current = await ComponentService.get_components_at(db_session, device.id, datetime.now(UTC))
+    assert [c['size_mb'] for c in current if c['type'] == 'ram'] == [8192]
+
+
+async def test_flat_read_model_follows_sync(db_session: AsyncSession, device: Device):
+    await ComponentService.sync_components(db_session, device.id, _items(WORKSTATION))
+
+    changed = [dict(item) for item in WORKSTATION if item['type'] != 'gpu']
+    changed[2]['size_mb'] = 16384
+    changed[1]['base_clock_mhz'] = 3700
+    await ComponentService.sync_components(db_session, device.id, _items(changed))
+
+    rows = (
+        await db_session.execute(select(ComponentFlat).where(ComponentFlat.asset_id == device.id))
+    ).scalars().all()
+    assert sorted(row.component_type for row in rows) == sorted(item['type'] for item in changed)
+    assert sorted(row.size_mb for row in rows if row.component_type == 'ram') == [8192, 16384]
+    cpu = next(row for row in rows if row.component_type == 'cpu')
+    assert (cpu.cores, cpu.spec['base_clock_mhz']) == (6, 3700)
+    storage = next(row for row in rows if row.component_type == 'storage')
+    assert (storage.type_label, storage.capacity_gb) == ('SSD', 500)
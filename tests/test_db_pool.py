@@ -0,0 +1,70 @@
+import logging
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.pool import PoolConfig, check_connection_budget, engine_options, worker_pool_config
+from tests.conftest import TEST_DATABASE_URL
+
+pytestmark = pytest.mark.asyncio
+
+
+def test_pool_without_budget():
+    config = worker_pool_config(pool_size=5, max_overflow=10, timeout=10, recycle=1800)
+    assert (config.pool_size, config.max_overflow, config.max_connections) == (5, 10, 15)
+
+
+def test_budget_split_between_workers():
+    config = worker_pool_config(pool_size=5, max_overflow=10, timeout=10, recycle=-1, total_budget=80, workers=4)
+    assert (config.pool_size, config.max_overflow) == (5, 15)
+
+    # Доля воркера меньше DB_POOL_SIZE: пул целиком постоянный
+    config = worker_pool_config(pool_size=5, max_overflow=10, timeout=10, recycle=-1, total_budget=10, workers=4)
+    assert (config.pool_size, config.max_overflow) == (2, 0)
+
+    with pytest.raises(ValueError):
+        worker_pool_config(pool_size=5, max_overflow=10, timeout=10, recycle=-1, total_budget=3, workers=4)
+
+
+def test_budget_warns_when_ingestion_takes_whole_pool(caplog):
+    with caplog.at_level(logging.WARNING, logger='app.db.pool'):
+        worker_pool_config(pool_size=5, max_overflow=0, timeout=10, recycle=-1, total_budget=8, workers=4, reserved=2)
+    assert 'обработчиков очереди' in caplog.text
+
+
+def test_engine_options():
+    config = PoolConfig(pool_size=3, max_overflow=7, timeout=5, recycle=600)
+    options = engine_options(config, connect_timeout=4)
+    assert options['pool_size'] == 3
+    assert options['max_overflow'] == 7
+    assert options['pool_timeout'] == 5
+    assert options['pool_recycle'] == 600
+    assert options['connect_args'] == {'timeout': 4}
+
+
+async def test_pgbouncer_mode_disables_statement_caches():
+    options = engine_options(PoolConfig(1, 0, 5, -1), connect_timeout=5, pgbouncer=True)
+    engine = create_async_engine(TEST_DATABASE_URL, **options)
+    try:
+        async with engine.connect() as conn:
+            for value in (1, 2):
+                assert (await conn.execute(text('SELECT CAST(:v AS integer)'), {'v': value})).scalar_one() == value
+            raw = await conn.get_raw_connection()
+            asyncpg_conn = raw.driver_connection
+            assert asyncpg_conn._stmt_cache.get_max_size() == 0
+            assert raw.dbapi_connection._prepared_statement_cache is None
+    finally:
+        await engine.dispose()
+
+
+async def test_check_connection_budget(caplog):
+    engine = create_async_engine(TEST_DATABASE_URL)
+    try:
+        limit = await check_connection_budget(engine, PoolConfig(5, 10, 10, -1), workers=1)
+        assert limit > 0
+        with caplog.at_level(logging.WARNING, logger='app.db.pool'):
+            await check_connection_budget(engine, PoolConfig(limit, 0, 10, -1), workers=2)
+        assert f'лимите сервера {limit}' in caplog.text
+    finally:
+        await engine.dispose()
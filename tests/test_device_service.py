@@ -1,13 +1,15 @@
 import uuid
 
 import pytest
-from sqlalchemy import select
+from sqlalchemy import event, func, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import ActionLog
+from app.db.instrumentation import track_queries
+from app.models import ActionLog, Device
 from app.schemas.asset import AssetCreate, AssetUpdate
 from app.services.device_service import DeviceService
-from app.services.exceptions import DuplicateDeviceError
+from app.services.exceptions import DuplicateDeviceError, NotFoundError
 
 pytestmark = pytest.mark.asyncio
 
@@ -122,6 +124,29 @@ async def test_get_devices_with_filters(db_session: AsyncSession, test_data: dic
     assert total == 0
 
 
+async def test_list_queries_reuse_compiled_statements(db_session: AsyncSession, test_data: dict):
+    service = DeviceService()
+    await service.get_devices_with_filters(
+        db_session, page=1, page_size=10, sort_by="status", sort_order="desc", status_id=test_data['status'].id
+    )
+    await service.get_all_dictionaries_for_form(db_session)
+
+    # Та же форма фильтров с другими значениями: SQL берется из кэша компиляции
+    with track_queries() as stats:
+        devices, total = await service.get_devices_with_filters(
+            db_session, page=2, page_size=5, sort_by="status", sort_order="desc", status_id=-1
+        )
+        await service.get_all_dictionaries_for_form(db_session)
+    assert (devices, total) == ([], 0)
+    assert stats.count == 12
+    assert stats.cache_hits == stats.count
+
+    # Другая форма - другой запрос
+    with track_queries() as stats:
+        await service.get_devices_with_filters(db_session, page=1, page_size=5, search="x", status_id=-1)
+    assert stats.cache_hits == 0
+
+
 async def test_update_device_success(db_session: AsyncSession, test_data: dict):
     service = DeviceService()
     user_id = test_data['user'].id
@@ -220,3 +245,128 @@ async def test_bulk_update(db_session: AsyncSession, test_data: dict):
     for dev_id in id_list:
         d = await service.get_device_with_relations(db_session, dev_id)
         assert d.location_id == test_data['location'].id
+
+
+async def test_inventory_number_ranges(db_session: AsyncSession):
+    from datetime import date
+
+    from app.services.inventory_number_service import InventoryNumberService
+
+    day = date(2001, 2, 3)
+    first = await InventoryNumberService.reserve(db_session, 'TST', count=3, day=day)
+    second = await InventoryNumberService.reserve(db_session, 'TST', count=1, day=day)
+
+    assert first == ['TST-20010203-001', 'TST-20010203-002', 'TST-20010203-003']
+    assert second == ['TST-20010203-004']
+
+
+async def test_inventory_number_past_four_digits(db_session: AsyncSession):
+    from datetime import date
+
+    from app.models.inventory_counter import InventoryCounter
+    from app.services.inventory_number_service import InventoryNumberService
+
+    day = date(2001, 2, 4)
+    db_session.add(InventoryCounter(prefix='TST', day=day, last_value=9998))
+    await db_session.flush()
+
+    numbers = await InventoryNumberService.reserve(db_session, 'TST', count=2, day=day)
+
+    assert numbers == ['TST-20010204-9999', 'TST-20010204-10000']
+    # Строковый порядок расходится с порядком выдачи, числовой - нет
+    assert sorted(numbers) != numbers
+    assert sorted(numbers, key=lambda number: int(number.rsplit('-', 1)[1])) == numbers
+
+
+def _bulk_assets(test_data: dict, count: int, **overrides) -> list[AssetCreate]:
+    return [
+        AssetCreate(
+            name=f"Bulk {i}",
+            serial_number=f"BULK-{i}",
+            asset_type_id=test_data['asset_type'].id,
+            device_model_id=test_data['device_model'].id,
+            status_id=test_data['status'].id,
+            source="bulk",
+            **overrides,
+        )
+        for i in range(count)
+    ]
+
+
+async def test_bulk_create_devices(db_session: AsyncSession, engine_test, test_data: dict):
+    service = DeviceService()
+    assets = _bulk_assets(test_data, 1500, tag_ids=[test_data['tag'].id, test_data['tag'].id + 1000])
+
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine_test.sync_engine, 'before_cursor_execute', count)
+    try:
+        created = await service.bulk_create_devices(db_session, assets, test_data['user'].id)
+    finally:
+        event.remove(engine_test.sync_engine, 'before_cursor_execute', count)
+
+    # Число запросов не растёт с размером пакета: справочники + номера
+    # + INSERT страницами по 1000 строк (устройства, теги, аудит) + COMMIT
+    assert len(statements) <= 3 + 3 * 2 + 1
+    assert len(created) == 1500
+
+    # Номера выделены одним непрерывным блоком в порядке входного списка
+    numbers = [number for _, number in created]
+    seqs = [int(number.rsplit('-', 1)[1]) for number in numbers]
+    assert seqs == list(range(seqs[0], seqs[0] + 1500))
+
+    ids = [device_id for device_id, _ in created]
+    device = await service.get_device_with_relations(db_session, ids[-1])
+    assert device.name == "Bulk 1499"
+    assert device.inventory_number == numbers[-1]
+    # Несуществующий тег пропущен
+    assert [tag.id for tag in device.tags] == [test_data['tag'].id]
+
+    logs = await db_session.scalar(
+        select(func.count()).select_from(ActionLog).where(ActionLog.entity_id.in_(ids))
+    )
+    assert logs == 1500
+
+
+async def test_bulk_create_devices_defaults_and_own_numbers(db_session: AsyncSession, test_data: dict):
+    service = DeviceService()
+    assets = [asset.model_copy(update={'source': None}) for asset in _bulk_assets(test_data, 3)]
+    assets[1].inventory_number = 'OWN-0001'
+
+    created = await service.bulk_create_devices(db_session, assets, test_data['user'].id)
+
+    numbers = [number for _, number in created]
+    assert numbers[1] == 'OWN-0001'
+    assert numbers[0].startswith('PC-') and numbers[2].startswith('PC-')
+    sources = (await db_session.scalars(
+        select(Device.source).where(Device.id.in_([device_id for device_id, _ in created]))
+    )).all()
+    # Колонка source без значения получает default, как при создании через ORM
+    assert sources == ['purchase'] * 3
+
+    duplicate = _bulk_assets(test_data, 2, inventory_number='OWN-0002')
+    with pytest.raises(DuplicateDeviceError, match="строках 1 и 2"):
+        await service.bulk_create_devices(db_session, duplicate, test_data['user'].id)
+
+    # Нарушение NOT NULL - не дубликат
+    nameless = _bulk_assets(test_data, 1)[0].model_copy(update={'name': None})
+    with pytest.raises(IntegrityError):
+        await service.bulk_create_devices(db_session, [nameless], test_data['user'].id)
+
+
+async def test_bulk_create_devices_rejects_duplicates(db_session: AsyncSession, test_data: dict):
+    service = DeviceService()
+    assets = _bulk_assets(test_data, 3)
+    assets[2].serial_number = assets[0].serial_number
+
+    with pytest.raises(DuplicateDeviceError, match="строках 1 и 3"):
+        await service.bulk_create_devices(db_session, assets, test_data['user'].id)
+
+    unknown_type = _bulk_assets(test_data, 1)[0].model_copy(
+        update={'asset_type_id': test_data['asset_type'].id + 1000}
+    )
+    with pytest.raises(NotFoundError):
+        await service.bulk_create_devices(db_session, [unknown_type], test_data['user'].id)
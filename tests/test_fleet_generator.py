@@ -0,0 +1,100 @@
+import json
+from collections import Counter
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import ActionLog, AssetType, ComponentCPU, ComponentFlat, Device, DeviceModel, Tag
+from app.models.device import device_tags_table
+from app.services.exceptions import NotFoundError
+from app.services.fleet_generator_service import (
+    FleetBuilder,
+    FleetConfig,
+    FleetDictionaries,
+    FleetGeneratorService,
+)
+
+DICTIONARIES = FleetDictionaries(
+    models=[(1, 1, 'OptiPlex 7090'), (2, 1, 'ThinkCentre M70q'), (3, 2, 'P2422H')],
+    statuses=[(1, 'in_stock'), (2, 'in_use'), (3, 'repair'), (4, 'write_off'), (5, None)],
+    locations=[1, 2],
+    departments=[1],
+    employees=[1, 2, 3],
+    tags=[1, 2, 3, 4],
+    users=[1],
+)
+
+
+def _chunk(config: FleetConfig, chunk: int = 0):
+    return FleetBuilder(config, DICTIONARIES).build_chunk(chunk, 1, 500, 1, 1)
+
+
+def test_builder_is_deterministic():
+    config = FleetConfig(components_per_device=4, audit_per_device=3, seed=7)
+    first = _chunk(config)
+
+    assert _chunk(config) == first
+    assert _chunk(FleetConfig(components_per_device=4, audit_per_device=3, seed=8)).devices != first.devices
+    assert _chunk(config, chunk=1).devices != first.devices
+    # Потоки независимы: другой объем журнала не меняет устройства и компоненты
+    other = _chunk(FleetConfig(components_per_device=4, audit_per_device=10, seed=7))
+    assert (other.devices, other.components) == (first.devices, first.components)
+    assert len(other.audit) > len(first.audit)
+
+
+def test_builder_distributions():
+    rows = _chunk(FleetConfig(components_per_device=4, audit_per_device=3))
+
+    statuses = Counter(row[13] for row in rows.devices)
+    assert [status for status, _ in statuses.most_common(2)] == [2, 1]
+    # Сотрудник закреплен только за устройствами в эксплуатации
+    assert {row[13] for row in rows.devices if row[16]} == {2}
+    assert len({row[2] for row in rows.devices}) == len(rows.devices)  # inventory_number
+    # Первые два компонента устройства - плата и процессор
+    first_types = [row[2] for row in rows.components[:2]]
+    assert first_types == ['motherboard', 'cpu']
+    assert len(rows.flat) == len(rows.components) == sum(map(len, rows.subtypes.values()))
+    assert {row[3] for row in rows.audit} == {'create', 'update'}
+    changes = [json.loads(row[6])['changes'] for row in rows.audit if row[3] == 'update']
+    assert all(set(change) <= {'status_id', 'location_id', 'employee_id'} for change in changes)
+
+
+async def test_generate_loads_fleet_via_copy(db_session: AsyncSession, test_data: dict, monkeypatch):
+    monkeypatch.setattr('app.services.fleet_generator_service.CHUNK_DEVICES', 3)
+    service = FleetGeneratorService(FleetConfig(devices=7, components_per_device=3, audit_per_device=2))
+    progress = []
+
+    stats = await service.generate(db_session, progress=lambda s: progress.append(s.devices))
+
+    assert progress == [3, 6, 7]
+
+    async def count(table, *where) -> int:
+        return await db_session.scalar(select(func.count()).select_from(table).where(*where))
+
+    assert await count(Device, Device.source == 'synthetic') == stats.devices == 7
+    assert await count(device_tags_table) == stats.device_tags
+    assert await count(ComponentFlat) == stats.components
+    assert await count(ComponentCPU) == await count(ComponentFlat, ComponentFlat.component_type == 'cpu')
+    assert await count(ActionLog, ActionLog.entity_type == 'Device') == stats.audit
+
+    device = (await db_session.scalars(select(Device).order_by(Device.id).limit(1))).one()
+    assert device.device_model_id == test_data['device_model'].id
+    assert device.status_id == test_data['status'].id
+
+
+async def test_generate_requires_dictionaries(db_session: AsyncSession):
+    with pytest.raises(NotFoundError, match='init-data'):
+        await FleetGeneratorService(FleetConfig(devices=1)).generate(db_session)
+
+
+async def test_ensure_catalog_fills_empty_dictionaries(db_session: AsyncSession):
+    asset_type = AssetType(name='Synthetic type', prefix='SYNT', slug='synthetic_type')
+    db_session.add(asset_type)
+    await db_session.flush()
+
+    await FleetGeneratorService(FleetConfig()).ensure_catalog(db_session)
+
+    models = (await db_session.scalars(select(DeviceModel.name).order_by(DeviceModel.id))).all()
+    assert models == ['Dell SYNT-100', 'HP SYNT-200', 'Lenovo SYNT-300', 'Acer SYNT-400']
+    assert await db_session.scalar(select(func.count()).select_from(Tag)) > 0
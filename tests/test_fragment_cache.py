@@ -0,0 +1,101 @@
+# tests/test_fragment_cache.py
+
+import pytest
+from httpx import AsyncClient
+from markupsafe import Markup
+from prometheus_client import REGISTRY
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.fragment_cache import mark_selected
+from app.models import DictionaryVersion, Employee
+from app.services.device_service import DICTIONARY_VERSIONS, FORM_DICTIONARY_QUERIES
+
+pytestmark = pytest.mark.asyncio
+
+
+def _fragments(result: str) -> float:
+    return REGISTRY.get_sample_value('cache_requests_total', {'cache': 'template_fragments', 'result': result}) or 0.0
+
+
+async def _version(db: AsyncSession, table: str) -> int | None:
+    return await db.scalar(select(DictionaryVersion.version).where(DictionaryVersion.name == table))
+
+
+async def test_trigger_bumps_version_per_changing_statement(db_session: AsyncSession):
+    before = await _version(db_session, 'employees')
+
+    db_session.add_all([
+        Employee(last_name='Petrov', first_name='Petr'),
+        Employee(last_name='Sidorov', first_name='Ivan'),
+    ])
+    await db_session.flush()
+    bumped = await _version(db_session, 'employees')
+    assert bumped is not None and bumped != before
+
+    # Оператор без измененных строк версию не меняет
+    await db_session.execute(update(Employee).where(Employee.id == -1).values(last_name='Nobody'))
+    assert await _version(db_session, 'employees') == bumped
+
+    await db_session.execute(update(Employee).where(Employee.last_name == 'Sidorov').values(first_name='Sidor'))
+    assert await _version(db_session, 'employees') != bumped
+
+
+async def test_options_rendered_once_per_dictionary_version(
+    async_client: AsyncClient, db_session: AsyncSession, test_data: dict
+):
+    employee = test_data['employee']
+    await async_client.get('/assets-list')
+
+    hits, misses = _fragments('hit'), _fragments('miss')
+    response = await async_client.get('/assets-list', params={'employee_id': employee.id})
+    assert response.status_code == 200
+    # Фильтры выводятся дважды (панель и мобильная форма), все блоки из кэша
+    assert _fragments('miss') == misses
+    assert _fragments('hit') > hits
+    assert f'<option value="{employee.id}" selected>Ivanov Ivan</option>' in response.text
+
+    # Новый сотрудник меняет версию справочника: перерисовывается только его блок
+    db_session.add(Employee(last_name='Kuznetsov', first_name='Oleg'))
+    await db_session.flush()
+    misses = _fragments('miss')
+    response = await async_client.get('/assets-list')
+    assert '>Kuznetsov Oleg</option>' in response.text
+    assert f'<option value="{employee.id}">Ivanov Ivan</option>' in response.text
+    assert _fragments('miss') == misses + 1
+
+
+async def test_dictionary_change_between_reads_is_not_cached_as_new_version(
+    async_client: AsyncClient, db_session: AsyncSession, monkeypatch
+):
+    await async_client.get('/assets-list')
+
+    # Сотрудник добавляется между чтением версий и справочника сотрудников -
+    # так же, как если бы изменение зафиксировала другая транзакция
+    execute = db_session.execute
+    race = {'pending': True}
+
+    async def execute_with_race(statement, *args, **kwargs):
+        result = await execute(statement, *args, **kwargs)
+        if race['pending'] and statement in (DICTIONARY_VERSIONS, FORM_DICTIONARY_QUERIES['employees']):
+            race['pending'] = False
+            await execute(insert(Employee).values(last_name='Racing', first_name='Roman'))
+        return result
+
+    monkeypatch.setattr(db_session, 'execute', execute_with_race)
+    await async_client.get('/assets-list')
+    monkeypatch.undo()
+
+    response = await async_client.get('/assets-list')
+    assert '>Racing Roman</option>' in response.text
+
+
+def test_mark_selected():
+    options = Markup('<option value="1">A</option><option value="12">B</option><option value="2">C</option>')
+
+    assert mark_selected(options, 2) == (
+        '<option value="1">A</option><option value="12">B</option><option value="2" selected>C</option>'
+    )
+    assert mark_selected(options, None) == options
+    assert mark_selected(options, '') == options
+    assert mark_selected(options, '"><script>') == options
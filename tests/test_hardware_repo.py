@@ -0,0 +1,104 @@
+import pytest
+from httpx import AsyncClient
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.repositories.hardware_repo import SqlAlchemyHardwareRepository
+from app.models import Device
+from app.schemas.component import ComponentItem
+from app.schemas.hardware import HardwareFilter
+from app.services.component_service import ComponentService
+
+pytestmark = pytest.mark.asyncio
+
+FLEET = {
+    'OLD-01': [
+        {'type': 'cpu', 'name': 'Core i3-2100', 'cores': 2, 'threads': 4},
+        {'type': 'ram', 'name': 'DDR3', 'size_mb': 2048},
+        {'type': 'ram', 'name': 'DDR3', 'size_mb': 2048},
+        {'type': 'storage', 'name': 'WD Blue', 'type_label': 'HDD', 'capacity_gb': 500},
+    ],
+    'NEW-01': [
+        {'type': 'cpu', 'name': 'Ryzen 5 5600', 'cores': 6, 'threads': 12},
+        {'type': 'ram', 'name': 'DDR4', 'size_mb': 16384},
+        {'type': 'storage', 'name': 'Samsung 980', 'type_label': 'NVMe', 'capacity_gb': 500},
+        {'type': 'storage', 'name': 'WD Blue', 'type_label': 'HDD', 'capacity_gb': 1000},
+        {'type': 'gpu', 'name': 'RTX 3060', 'memory_mb': 12288},
+    ],
+    'NEW-02': [
+        {'type': 'cpu', 'name': 'Ryzen 5 5600', 'cores': 6, 'threads': 12},
+        {'type': 'ram', 'name': 'DDR4', 'size_mb': 8192},
+        {'type': 'storage', 'name': 'Samsung 870', 'type_label': 'SSD', 'capacity_gb': 250},
+    ],
+}
+
+
+@pytest.fixture
+async def fleet(db_session: AsyncSession, test_data: dict) -> dict[str, int]:
+    adapter = TypeAdapter(list[ComponentItem])
+    ids = {}
+    for inventory_number, components in FLEET.items():
+        device = Device(
+            name=inventory_number,
+            inventory_number=inventory_number,
+            asset_type_id=test_data['asset_type'].id,
+            device_model_id=test_data['device_model'].id,
+            status_id=test_data['status'].id,
+        )
+        db_session.add(device)
+        await db_session.flush()
+        await ComponentService.sync_components(db_session, device.id, adapter.validate_python(components))
+        ids[inventory_number] = device.id
+    return ids
+
+
+async def test_find_devices_by_total_ram(db_session: AsyncSession, fleet: dict):
+    repo = SqlAlchemyHardwareRepository(db_session)
+    page = await repo.find_devices(HardwareFilter(ram_mb_lt=8192))
+
+    assert page.total == 1
+    assert page.items[0].id == fleet['OLD-01']
+    assert page.items[0].ram_total_mb == 4096
+    assert page.items[0].ram_modules == 2
+
+
+async def test_find_devices_total_past_last_page(db_session: AsyncSession, fleet: dict):
+    repo = SqlAlchemyHardwareRepository(db_session)
+
+    page = await repo.find_devices(HardwareFilter(ram_mb_lt=8192), limit=10, offset=10)
+    assert (page.items, page.total) == ([], 1)
+
+    page = await repo.find_devices(HardwareFilter(ram_mb_lt=1), limit=10, offset=10)
+    assert (page.items, page.total) == ([], 0)
+
+
+async def test_find_hdd_only_devices(db_session: AsyncSession, fleet: dict):
+    repo = SqlAlchemyHardwareRepository(db_session)
+    page = await repo.find_devices(HardwareFilter(hdd_only=True))
+    assert [item.id for item in page.items] == [fleet['OLD-01']]
+
+    page = await repo.find_devices(HardwareFilter(has_ssd=True, has_gpu=False))
+    assert [item.id for item in page.items] == [fleet['NEW-02']]
+
+
+async def test_census(db_session: AsyncSession, fleet: dict):
+    repo = SqlAlchemyHardwareRepository(db_session)
+
+    cpu = {row.label: row.devices for row in await repo.census('cpu')}
+    assert cpu == {'Ryzen 5 5600': 2, 'Core i3-2100': 1}
+
+    storage = {row.label: row.devices for row in await repo.census('storage', HardwareFilter(cores_lt=4))}
+    assert storage == {'HDD': 1}
+
+    ram = [(row.label, row.devices) for row in await repo.census('ram')]
+    assert ram == [('4 GB', 1), ('8 GB', 1), ('16 GB', 1)]
+
+
+async def test_hardware_api(async_client: AsyncClient, fleet: dict):
+    response = await async_client.get('/api/hardware/devices', params={'cpu_name': 'ryzen', 'ram_mb_gte': 16384})
+    assert response.status_code == 200
+    assert [item['inventory_number'] for item in response.json()['items']] == ['NEW-01']
+
+    response = await async_client.get('/api/hardware/census/cpu')
+    assert response.status_code == 200
+    assert response.json()[0] == {'label': 'Ryzen 5 5600', 'devices': 2}
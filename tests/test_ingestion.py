@@ -0,0 +1,160 @@
+import json
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import ComponentFlat, Device, IngestionJob
+from app.services import ingestion_service
+from app.services.ingestion_service import IngestionService
+
+pytestmark = pytest.mark.asyncio
+
+COMPONENTS = [
+    {'type': 'cpu', 'name': 'Core i5-12400', 'cores': 6, 'threads': 12},
+    {'type': 'ram', 'name': 'DDR4-3200', 'size_mb': 16384},
+]
+
+AGENT_REPORT = {
+    'hostname': 'WS-QUEUE-01',
+    'components': [
+        {'type': 'motherboard', 'name': 'B660M', 'serial_number': 'MB-Q-1', 'manufacturer': 'MSI'},
+        *COMPONENTS,
+    ],
+}
+
+
+def _file(data) -> dict:
+    return {'file': ('report.json', json.dumps(data).encode(), 'application/json')}
+
+
+@pytest.fixture
+async def device(db_session: AsyncSession, test_data: dict) -> Device:
+    device = Device(
+        name='Queue PC',
+        inventory_number='QUEUE-001',
+        asset_type_id=test_data['asset_type'].id,
+        device_model_id=test_data['device_model'].id,
+        status_id=test_data['status'].id,
+    )
+    db_session.add(device)
+    await db_session.flush()
+    return device
+
+
+async def test_upload_is_queued_and_processed(
+    async_client: AsyncClient, db_session: AsyncSession, device: Device
+):
+    response = await async_client.post(f'/{device.id}/components/upload', files=_file(COMPONENTS))
+    assert response.status_code == 202
+    queued = response.json()
+    assert queued['status'] == 'queued'
+
+    # До обработки компоненты не записаны
+    count = select(func.count()).select_from(ComponentFlat).where(ComponentFlat.asset_id == device.id)
+    assert await db_session.scalar(count) == 0
+    job = (await async_client.get(queued['status_url'])).json()
+    assert (job['status'], job['kind']) == ('pending', 'components')
+
+    assert await IngestionService.process_batch(db_session, batch_size=10) == 1
+
+    assert await db_session.scalar(count) == 2
+    job = (await async_client.get(queued['status_url'])).json()
+    assert job['status'] == 'done'
+    assert job['result']['count'] == 2
+    assert len(job['result']['added']) == 2
+
+
+async def test_import_is_queued_and_creates_device(
+    async_client: AsyncClient, db_session: AsyncSession, test_data: dict
+):
+    response = await async_client.post('/import', files=_file(AGENT_REPORT))
+    assert response.status_code == 202
+    status_url = response.json()['status_url']
+
+    await IngestionService.process_batch(db_session, batch_size=10)
+
+    job = (await async_client.get(status_url)).json()
+    assert job['status'] == 'done'
+    device = await db_session.get(Device, job['result']['device_id'])
+    assert device.name == 'WS-QUEUE-01'
+    assert job['result']['redirect_url'] == f'/edit/{device.id}?tab=components'
+
+
+async def test_invalid_report_is_rejected_before_queueing(
+    async_client: AsyncClient, db_session: AsyncSession, device: Device
+):
+    response = await async_client.post(
+        f'/{device.id}/components/upload', files=_file([{'type': 'cpu'}])
+    )
+    assert response.status_code == 422
+
+    response = await async_client.post(f'/{device.id + 1000}/components/upload', files=_file(COMPONENTS))
+    assert response.status_code == 404
+
+    assert await db_session.scalar(select(func.count()).select_from(IngestionJob)) == 0
+
+
+async def test_batch_isolates_failed_job(
+    db_session: AsyncSession, device: Device, test_data: dict
+):
+    user_id = test_data['user'].id
+    first = await IngestionService.enqueue(db_session, 'components', COMPONENTS, user_id, device.id)
+    # Валидный отчет, но серийный номер платы уже занят другим устройством
+    broken = await IngestionService.enqueue(
+        db_session,
+        'import',
+        {'hostname': 'dup', 'components': [{'type': 'motherboard', 'name': 'X', 'serial_number': 'DUP-1'}]},
+        user_id,
+    )
+    db_session.add(Device(
+        name='Existing',
+        inventory_number='DUP-INV',
+        serial_number='DUP-1',
+        asset_type_id=test_data['asset_type'].id,
+        device_model_id=test_data['device_model'].id,
+        status_id=test_data['status'].id,
+    ))
+    unknown = await IngestionService.enqueue(db_session, 'unknown', {}, user_id)
+    last = await IngestionService.enqueue(
+        db_session, 'components', COMPONENTS[:1], user_id, device.id
+    )
+    await db_session.flush()
+
+    # Все задания обрабатываются одним пакетом (одной транзакцией)
+    assert await IngestionService.process_batch(db_session, batch_size=10) == 4
+    assert await IngestionService.process_batch(db_session, batch_size=10) == 0
+
+    assert (first.status, last.status) == ('done', 'done')
+    assert broken.status == 'failed'
+    assert 'DUP-1' in broken.error
+    assert unknown.status == 'failed'
+    assert [c['type'] for c in last.result['removed']] == ['ram']
+    assert all(job.attempts == 1 and job.finished_at for job in (first, broken, unknown, last))
+
+    dup_devices = select(func.count()).select_from(Device).where(Device.name == 'dup')
+    assert await db_session.scalar(dup_devices) == 0
+
+
+async def test_failed_job_keeps_attempt(db_session: AsyncSession, test_data: dict, monkeypatch):
+    async def failing_handler(session: AsyncSession, job: IngestionJob):
+        # Запрос внутри SAVEPOINT вызывает autoflush, затем обработчик падает
+        await session.scalar(select(func.count()).select_from(Device))
+        raise ValueError('boom')
+
+    monkeypatch.setitem(ingestion_service._HANDLERS, 'failing', failing_handler)
+    job = await IngestionService.enqueue(db_session, 'failing', {}, test_data['user'].id)
+    job_id = job.id
+
+    assert await IngestionService.process_batch(db_session, batch_size=10) == 1
+
+    # Значения перечитываются из БД, а не берутся из объекта в сессии
+    db_session.expire_all()
+    stored = await db_session.get(IngestionJob, job_id)
+    assert (stored.status, stored.error, stored.attempts) == ('failed', 'boom', 1)
+
+
+async def test_job_status_not_found(async_client: AsyncClient):
+    response = await async_client.get('/ingestion/jobs/999999')
+    assert response.status_code == 404
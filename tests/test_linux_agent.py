@@ -0,0 +1,91 @@
+import importlib
+from pathlib import Path
+
+import pytest
+
+from app.schemas.component import ComponentUploadRequest
+
+AGENT_SRC = Path(__file__).resolve().parents[1] / 'agent_builder' / 'src'
+
+CPUINFO = '\n\n'.join(
+    f'processor\t: {n}\nvendor_id\t: AuthenticAMD\nmodel name\t: AMD Ryzen 5 5600\n'
+    f'physical id\t: 0\nsiblings\t: 12\ncpu cores\t: 6\ncpu MHz\t\t: 3500.000'
+    for n in range(12)
+)
+
+FAKE_FS = {
+    'proc/cpuinfo': CPUINFO,
+    'sys/devices/system/cpu/cpu0/cpufreq/cpuinfo_max_freq': '3500000\n',
+    'proc/meminfo': 'MemTotal:       16303428 kB\nMemFree:         1000000 kB\n',
+    'sys/class/dmi/id/board_name': 'B550M PRO\n',
+    'sys/class/dmi/id/board_vendor': 'ASUSTeK COMPUTER INC.\n',
+    'sys/block/nvme0n1/size': str(500 * 1024**3 // 512),
+    'sys/block/nvme0n1/queue/rotational': '0',
+    'sys/block/nvme0n1/device/model': 'Samsung SSD 980 500GB',
+    'sys/block/nvme0n1/device/serial': 'S64DNX0R',
+    'sys/block/sda/size': str(1000 * 1024**3 // 512),
+    'sys/block/sda/queue/rotational': '1',
+    'sys/block/sda/device/model': 'WDC WD10EZEX',
+    'sys/block/sda/device/vendor': 'ATA',
+    'sys/block/loop0/size': '1000',
+    'sys/class/drm/card0/device/vendor': '0x1002',
+    'sys/class/drm/card0/device/device': '0x73ff',
+    'sys/class/drm/card0/device/mem_info_vram_total': str(8 * 1024**3),
+    'sys/class/drm/card0-HDMI-A-1/status': 'connected',
+}
+
+
+@pytest.fixture
+def linux_agent(monkeypatch):
+    monkeypatch.syspath_prepend(str(AGENT_SRC))
+    return importlib.import_module('linux_agent')
+
+
+@pytest.fixture
+def fake_root(tmp_path: Path) -> Path:
+    for relative, content in FAKE_FS.items():
+        path = tmp_path / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    return tmp_path
+
+
+def test_collects_components_from_proc_and_sys(linux_agent, fake_root: Path):
+    inventory = linux_agent.collect_inventory(str(fake_root))
+    report = ComponentUploadRequest(**inventory)
+    by_type = {}
+    for item in report.components:
+        by_type.setdefault(item.type, []).append(item)
+
+    assert by_type['motherboard'][0].manufacturer == 'ASUSTeK COMPUTER INC.'
+    cpu = by_type['cpu'][0]
+    assert (cpu.cores, cpu.threads, cpu.base_clock_mhz) == (6, 12, 3500)
+    assert by_type['ram'][0].size_mb == 16384
+    storage = {item.name: item for item in by_type['storage']}
+    assert set(storage) == {'Samsung SSD 980 500GB', 'WDC WD10EZEX'}
+    assert (storage['Samsung SSD 980 500GB'].type_label, storage['Samsung SSD 980 500GB'].interface) == ('SSD', 'NVMe')
+    assert storage['WDC WD10EZEX'].type_label == 'HDD'
+    assert [gpu.memory_mb for gpu in by_type['gpu']] == [8192]
+
+
+@pytest.mark.parametrize(
+    ('model_name', 'expected'),
+    [('Intel(R) Core(TM) i5-2400 CPU @ 3.10GHz', 3100), ('AMD Ryzen 5 5600', None)],
+)
+def test_cpu_clock_without_cpufreq_ignores_current_frequency(
+    linux_agent, tmp_path: Path, model_name: str, expected: int | None
+):
+    # В ВМ нет cpufreq, а "cpu MHz" меняется между запусками
+    for mhz in ('1200.000', '3392.118'):
+        (tmp_path / 'proc').mkdir(exist_ok=True)
+        (tmp_path / 'proc' / 'cpuinfo').write_text(
+            f'processor\t: 0\nmodel name\t: {model_name}\ncpu cores\t: 4\ncpu MHz\t\t: {mhz}'
+        )
+        [cpu] = linux_agent.collect_cpu(str(tmp_path))
+        assert cpu['base_clock_mhz'] == expected
+
+
+def test_missing_sources_are_skipped(linux_agent, tmp_path: Path):
+    inventory = linux_agent.collect_inventory(str(tmp_path))
+    assert inventory['components'] == []
+    assert inventory['protocol_version'] == 1
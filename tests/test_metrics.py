@@ -0,0 +1,83 @@
+import pytest
+from httpx import AsyncClient
+from prometheus_client import REGISTRY
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.config import settings
+from app.db.upsert import get_or_create_id, resolved_id_cache
+from app.metrics import InstrumentedPool, instrument_engine
+from app.models import Manufacturer
+from tests.conftest import TEST_DATABASE_URL
+
+pytestmark = pytest.mark.asyncio
+
+
+def _sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+async def test_metrics_endpoint(async_client: AsyncClient):
+    health = {'method': 'GET', 'route': '/api/health/health', 'status': '200'}
+    before = _sample('http_request_duration_seconds_count', **health)
+
+    await async_client.get('/api/health/health')
+    await async_client.get('/no-such-page')
+    response = await async_client.get('/metrics')
+
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('text/plain')
+    assert _sample('http_request_duration_seconds_count', **health) == before + 1
+    assert 'route="<unmatched>",status="404"' in response.text
+    assert 'ingestion_queue_depth 0.0' in response.text
+    assert 'db_pool_wait_seconds_bucket' in response.text
+
+
+async def test_metrics_token(async_client: AsyncClient, monkeypatch):
+    monkeypatch.setattr(settings, 'METRICS_TOKEN', 'scrape-secret')
+
+    assert (await async_client.get('/metrics')).status_code == 401
+    response = await async_client.get('/metrics', headers={'Authorization': 'Bearer scrape-secret'})
+    assert response.status_code == 200
+
+
+async def test_pool_metrics():
+    engine = create_async_engine(
+        TEST_DATABASE_URL, poolclass=InstrumentedPool, pool_size=1, max_overflow=1, pool_timeout=0.05
+    )
+    instrument_engine(engine, 'test')
+    pool = {'pool': 'test'}
+    waits = _sample('db_pool_wait_seconds_count', **pool)
+    timeouts = _sample('db_pool_timeouts_total', **pool)
+    try:
+        assert _sample('db_pool_max', **pool) == 2
+        async with engine.connect(), engine.connect():
+            assert _sample('db_pool_checked_out', **pool) == 2
+            assert _sample('db_pool_overflow', **pool) == 1
+            with pytest.raises(exc.TimeoutError):
+                async with engine.connect():
+                    pass
+        assert _sample('db_pool_checked_out', **pool) == 0
+        assert _sample('db_pool_wait_seconds_count', **pool) == waits + 3
+        assert _sample('db_pool_timeouts_total', **pool) == timeouts + 1
+
+        # dispose() пересоздает пул, метка сохраняется
+        await engine.dispose()
+        assert engine.sync_engine.pool.metrics_name == 'test'
+    finally:
+        await engine.dispose()
+
+
+async def test_resolved_id_cache_hits(db_session: AsyncSession):
+    resolved_id_cache.invalidate()
+    labels = {'cache': 'resolved_ids'}
+    hits, misses = _sample('cache_requests_total', result='hit', **labels), _sample(
+        'cache_requests_total', result='miss', **labels
+    )
+
+    for _ in range(3):
+        await get_or_create_id(db_session, Manufacturer, {'name': 'Metrics Corp'})
+
+    assert _sample('cache_requests_total', result='miss', **labels) == misses + 1
+    assert _sample('cache_requests_total', result='hit', **labels) == hits + 2
+    resolved_id_cache.invalidate()
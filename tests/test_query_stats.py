@@ -0,0 +1,107 @@
+import re
+
+import pytest
+from fastapi import FastAPI, Request
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.db.instrumentation import track_queries
+from app.models import Device
+
+pytestmark = pytest.mark.asyncio
+
+SERVER_TIMING_PATTERN = r'^db;dur=\d+\.\d;desc="\d+ SQL"$'
+
+
+async def test_track_queries_collects_stats(db_session: AsyncSession):
+    with track_queries(slowest_limit=2) as outer:
+        await db_session.execute(text('SELECT 1'))
+        with track_queries() as inner:
+            await db_session.execute(text('SELECT pg_sleep(0.01)'))
+            await db_session.execute(text('SELECT 1'))
+            # SAVEPOINT / RELEASE SAVEPOINT - управление транзакцией, а не запросы
+            async with db_session.begin_nested():
+                pass
+
+    assert inner.count == 2
+    assert (outer.count, outer.repeated()) == (3, {'SELECT 1': 2})
+    assert outer.total_ms >= inner.total_ms >= 10
+    assert [statement for _, statement in outer.slowest] == ['SELECT pg_sleep(0.01)', 'SELECT 1']
+
+
+async def test_query_stats_in_request_state(test_app: FastAPI, async_client: AsyncClient, monkeypatch):
+    @test_app.get('/_query-stats')
+    async def query_stats(request: Request):
+        return {'count': request.state.query_stats.count}
+
+    response = await async_client.get('/audit-logs')
+    assert 'server-timing' not in response.headers
+
+    monkeypatch.setattr(settings, 'SQL_SERVER_TIMING', True)
+    response = await async_client.get('/audit-logs')
+    assert re.match(SERVER_TIMING_PATTERN, response.headers['server-timing'])
+    assert response.headers['server-timing'].endswith('desc="5 SQL"')
+
+    response = await async_client.get('/_query-stats')
+    assert response.json() == {'count': 0}
+
+
+async def test_query_budget_flags_overrun_and_repeats(db_session: AsyncSession, query_budget):
+    with pytest.raises(AssertionError, match='3 SQL-запросов при бюджете 2'), query_budget(2, max_repeats=3):
+        for _ in range(3):
+            await db_session.execute(text('SELECT 1'))
+
+    with pytest.raises(AssertionError, match='2 повторов: SELECT 1'), query_budget(5):
+        for _ in range(2):
+            await db_session.execute(text('SELECT 1'))
+
+
+# Бюджеты SQL-запросов горячих страниц (вместе с запросом пользователя
+# из тестовой авторизации). Рост числа запросов - повод искать N+1.
+@pytest.mark.parametrize(
+    'url, max_queries, max_repeats',
+    [
+        # asset_type грузится дважды: для устройства и для его модели.
+        # В формах с выбором из справочников еще запрос их версий (кэш фрагментов)
+        ('/assets-list', 21, 2),
+        # Фрагмент таблицы: без справочников фильтров
+        ('/assets-list/results', 11, 2),
+        ('/add', 11, 1),
+        ('/edit/{device_id}', 21, 1),
+        ('/audit-logs', 5, 1),
+        ('/api/analytics/dashboard', 5, 1),
+    ],
+)
+async def test_endpoint_query_budget(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+    test_data: dict,
+    query_budget,
+    url: str,
+    max_queries: int,
+    max_repeats: int,
+):
+    devices = [
+        Device(
+            name=f'Budget PC {number}',
+            inventory_number=f'BUDGET-{number}',
+            asset_type_id=test_data['asset_type'].id,
+            device_model_id=test_data['device_model'].id,
+            status_id=test_data['status'].id,
+            location_id=test_data['location'].id,
+            employee_id=test_data['employee'].id,
+            tags=[test_data['tag']],
+        )
+        for number in range(3)
+    ]
+    db_session.add_all(devices)
+    await db_session.flush()
+
+    url = url.format(device_id=devices[0].id)
+    # Первый запрос создает пользователя тестовой авторизации
+    await async_client.get(url)
+    with query_budget(max_queries, max_repeats):
+        response = await async_client.get(url)
+    assert response.status_code == 200
@@ -0,0 +1,82 @@
+import time
+from collections.abc import AsyncGenerator
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import delete, insert
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+import app.api.deps
+import app.main
+from app.config import settings
+from app.db.replicas import STICKY_COOKIE, ReplicaRouter
+from app.models import Manufacturer
+from tests.conftest import TEST_DATABASE_URL, ensure_database
+
+pytestmark = pytest.mark.asyncio
+
+# Роль реплики играет вторая локальная база с той же схемой
+REPLICA_DATABASE_URL = f'{TEST_DATABASE_URL}_replica'
+REPLICA_ONLY = 'Replica Only Corp'
+
+
+@pytest_asyncio.fixture
+async def replica_engine() -> AsyncGenerator[AsyncEngine, None]:
+    await ensure_database(f'{settings.POSTGRES_DB}_test_replica', REPLICA_DATABASE_URL)
+    engine = create_async_engine(REPLICA_DATABASE_URL)
+    async with engine.begin() as conn:
+        await conn.execute(delete(Manufacturer).where(Manufacturer.name == REPLICA_ONLY))
+        await conn.execute(insert(Manufacturer).values(name=REPLICA_ONLY))
+    yield engine
+    async with engine.begin() as conn:
+        await conn.execute(delete(Manufacturer).where(Manufacturer.name == REPLICA_ONLY))
+    await engine.dispose()
+
+
+@pytest.fixture
+def replica_router(replica_engine: AsyncEngine, monkeypatch) -> ReplicaRouter:
+    router = ReplicaRouter([replica_engine], sticky_seconds=30)
+    monkeypatch.setattr(app.api.deps, 'replica_router', router)
+    monkeypatch.setattr(app.main, 'replica_router', router)
+    return router
+
+
+async def _manufacturers(client: AsyncClient) -> set[str]:
+    response = await client.get('/api/dictionaries/manufacturers')
+    assert response.status_code == 200
+    return {item['name'] for item in response.json()}
+
+
+async def test_reads_go_to_replica_until_write(async_client: AsyncClient, replica_router: ReplicaRouter):
+    assert REPLICA_ONLY in await _manufacturers(async_client)
+
+    response = await async_client.post('/api/dictionaries/manufacturers', data={'name': 'Primary Corp'})
+    assert response.status_code == 201
+    assert STICKY_COOKIE in response.cookies
+
+    # Read-your-writes: клиент видит свою запись, хотя реплика о ней не знает
+    names = await _manufacturers(async_client)
+    assert 'Primary Corp' in names
+    assert REPLICA_ONLY not in names
+
+    async_client.cookies.clear()
+    assert REPLICA_ONLY in await _manufacturers(async_client)
+
+
+async def test_router_choice():
+    assert not ReplicaRouter([], sticky_seconds=10).use_replica('GET', {})
+
+    engines = [create_async_engine(f'{TEST_DATABASE_URL}_{n}') for n in range(2)]
+    router = ReplicaRouter(engines, sticky_seconds=10)
+    assert [router.session().bind for _ in range(3)] == [engines[0], engines[1], engines[0]]
+
+    assert router.use_replica('GET', {})
+    assert not router.use_replica('POST', {})
+    assert not router.use_replica('GET', {STICKY_COOKIE: str(int(time.time()) + 5)})
+    assert router.use_replica('GET', {STICKY_COOKIE: str(int(time.time()) - 1)})
+    assert router.use_replica('GET', {STICKY_COOKIE: 'garbage'})
+
+    name, value = router.sticky_cookie()
+    assert name == STICKY_COOKIE
+    assert not router.use_replica('GET', {name: value})
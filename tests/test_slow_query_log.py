@@ -0,0 +1,84 @@
+from collections.abc import AsyncGenerator
+from datetime import date
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from app.db.instrumentation import track_queries
+from app.db.slow_query_log import SlowQueryLog, redact_parameters, slow_query_log
+from tests.conftest import TEST_DATABASE_URL
+
+pytestmark = pytest.mark.asyncio
+
+SLOW_SELECT = text('SELECT pg_sleep(:delay), :secret AS secret')
+
+
+@pytest_asyncio.fixture
+async def engine() -> AsyncGenerator[AsyncEngine, None]:
+    # Журнал подписывается на движок навсегда: отдельный движок на тест
+    engine = create_async_engine(TEST_DATABASE_URL)
+    yield engine
+    await engine.dispose()
+
+
+def test_redact_parameters():
+    assert redact_parameters((1, 2.5, None, True, 'user@example.com', b'x', date(2026, 1, 2))) == [
+        1, 2.5, None, True, '***', '***', '2026-01-02',
+    ]
+    assert redact_parameters([{'token': 'abc', 'id': 7}]) == [{'token': '***', 'id': 7}]
+
+
+async def test_records_slow_queries_with_plan(engine: AsyncEngine):
+    log = SlowQueryLog(threshold_ms=20, size=2, explain_sample=1.0)
+    log.install(engine)
+
+    async with engine.connect() as conn:
+        await conn.execute(text('SELECT 1'))
+        with track_queries(label='GET /assets-list'):
+            await conn.execute(SLOW_SELECT, {'delay': 0.03, 'secret': 'p@ssw0rd'})
+        await log._explain_task
+
+    [entry] = log.entries()
+    assert entry.source == 'GET /assets-list'
+    assert entry.duration_ms >= 20
+    assert entry.parameters == [0.03, '***']
+    assert 'pg_sleep' in entry.statement
+    assert 'actual time' in entry.plan
+    assert 'Execution Time' in entry.plan
+    # Сам EXPLAIN ANALYZE тоже медленный, но в журнал не попадает
+    assert len(log.entries()) == 1
+
+
+async def test_ring_buffer_and_write_statements_not_explained(engine: AsyncEngine):
+    log = SlowQueryLog(threshold_ms=20, size=2, explain_sample=1.0)
+    log.install(engine)
+
+    async with engine.connect() as conn:
+        for delay in (0.02, 0.025, 0.03):
+            await conn.execute(text('DO $$ BEGIN PERFORM pg_sleep(' + str(delay) + '); END $$'))
+
+    assert [entry.id for entry in log.entries()] == [3, 2]
+    assert log._explain_task is None
+    assert all(entry.plan is None and entry.source is None for entry in log.entries())
+
+
+async def test_slow_queries_admin_page(async_client: AsyncClient):
+    slow_query_log.clear()
+    slow_query_log.record('SELECT * FROM devices WHERE name = $1', ('secret name',), 812.0)
+    try:
+        response = await async_client.get('/admin/slow-queries')
+        assert response.status_code == 200
+        assert 'SELECT * FROM devices WHERE name = $1' in response.text
+        assert 'secret name' not in response.text
+
+        data = (await async_client.get('/admin/slow-queries.json')).json()
+        assert [(entry['duration_ms'], entry['parameters']) for entry in data['entries']] == [(812.0, ['***'])]
+
+        response = await async_client.post('/admin/slow-queries/clear')
+        assert response.status_code == 303
+        assert slow_query_log.entries() == []
+    finally:
+        slow_query_log.clear()
@@ -0,0 +1,90 @@
+# tests/test_startup.py
+
+import json
+import subprocess
+import sys
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+from app.api.lazy import LazyRouter
+from app.main import create_app
+
+# Бюджет импорта app.main в отдельном процессе (с прогретым кэшем байт-кода)
+STARTUP_BUDGET_SECONDS = 3.0
+LAZY_MODULES = (
+    'yaml',
+    'app.api.endpoints.hardware',
+    'app.api.endpoints.agent',
+    'app.api.endpoints.ingestion',
+)
+
+IMPORT_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+import app.main
+print(json.dumps({'seconds': time.perf_counter() - started, 'modules': sorted(sys.modules)}))
+"""
+
+
+def _import_app() -> dict:
+    completed = subprocess.run(
+        [sys.executable, '-c', IMPORT_SCRIPT], capture_output=True, text=True, check=True
+    )
+    return json.loads(completed.stdout.splitlines()[-1])
+
+
+def _lazy_routers(app: FastAPI) -> list[LazyRouter]:
+    return [route for route in app.router.routes if isinstance(route, LazyRouter)]
+
+
+def test_import_skips_lazy_modules():
+    modules = set(_import_app()['modules'])
+    assert not modules & set(LAZY_MODULES)
+
+
+def test_startup_budget():
+    # Лучший из трех запусков: первый прогревает кэш байт-кода и файловой системы
+    seconds = min(_import_app()['seconds'] for _ in range(3))
+    assert seconds < STARTUP_BUDGET_SECONDS, f'Импорт app.main занял {seconds:.2f} с'
+
+
+@pytest.mark.asyncio
+async def test_lazy_router_loads_on_request(test_app: FastAPI, async_client: AsyncClient):
+    routers = _lazy_routers(test_app)
+    assert routers and not any(router.loaded for router in routers)
+
+    response = await async_client.get('/api/hardware/census/ram')
+    assert response.status_code == 200
+
+    # Загруженный роутер заменен своими маршрутами
+    assert {router.prefix for router in routers if router.loaded} == {'/api/hardware'}
+    assert {router.prefix for router in _lazy_routers(test_app)} == {'/ingestion', '/api/agent/v1'}
+    # Повторный запрос идет уже по настоящим маршрутам
+    assert (await async_client.get('/api/hardware/census/ram')).status_code == 200
+
+
+def test_url_for_loads_lazy_router():
+    app = create_app()
+    routers = _lazy_routers(app)
+    app.url_path_for('dashboard')
+    assert not any(router.loaded for router in routers)
+
+    assert app.url_path_for('ingestion_job_status', job_id=1) == '/ingestion/jobs/1'
+    assert {router.prefix for router in routers if router.loaded} == {'/ingestion'}
+
+
+@pytest.mark.asyncio
+async def test_openapi_includes_lazy_routers(async_client: AsyncClient):
+    paths = (await async_client.get('/openapi.json')).json()['paths']
+    assert '/api/hardware/census/{kind}' in paths
+    assert '/api/agent/v1/devices/{asset_id}/report' in paths
+    assert '/ingestion/jobs/{job_id}' in paths
+
+
+@pytest.mark.asyncio
+async def test_assets_openapi_spec(async_client: AsyncClient):
+    response = await async_client.get('/openapi-assets.json')
+    assert response.status_code == 200
+    assert 'paths' in response.json()
@@ -0,0 +1,48 @@
+# tests/test_templating.py
+
+import pytest
+from httpx import AsyncClient
+from prometheus_client import REGISTRY
+
+from app.config import settings
+from app.templating import create_environment, precompile_templates
+
+
+def _render_count(template: str) -> float:
+    return REGISTRY.get_sample_value('template_render_seconds_count', {'template': template}) or 0.0
+
+
+def test_precompiled_templates_load_from_bytecode_cache(tmp_path, monkeypatch):
+    templates_dir = str(settings.TEMPLATES_DIR)
+    compiled = precompile_templates(create_environment(templates_dir, auto_reload=False, cache_dir=str(tmp_path)))
+    assert compiled > 0
+    assert len(list(tmp_path.iterdir())) == compiled
+
+    # Другой воркер с тем же каталогом берет байт-код, не компилируя шаблоны
+    environment = create_environment(templates_dir, auto_reload=False, cache_dir=str(tmp_path))
+
+    def compile_forbidden(*args, **kwargs):
+        raise AssertionError('шаблон скомпилирован повторно')
+
+    monkeypatch.setattr(environment, 'compile', compile_forbidden)
+    assert precompile_templates(environment) == compiled
+
+
+def test_auto_reload_off_skips_file_checks(tmp_path):
+    (tmp_path / 'page.html').write_text('v1')
+    environment = create_environment(str(tmp_path), auto_reload=False)
+    assert environment.get_template('page.html').render() == 'v1'
+
+    (tmp_path / 'page.html').write_text('v2')
+    assert environment.get_template('page.html').render() == 'v1'
+    assert create_environment(str(tmp_path)).get_template('page.html').render() == 'v2'
+
+
+@pytest.mark.asyncio
+async def test_render_time_histogram(async_client: AsyncClient):
+    before = _render_count('assets_list.html')
+
+    response = await async_client.get('/assets-list')
+    assert response.status_code == 200
+
+    assert _render_count('assets_list.html') == before + 1
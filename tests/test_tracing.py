@@ -0,0 +1,87 @@
+import asyncio
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+from httpx import AsyncClient
+
+from app.tracing import KIND_DB, KIND_RENDER, Tracer, current_span, span, traced, tracer
+from trace_collector import format_trace, make_handler
+
+pytestmark = pytest.mark.asyncio
+
+
+@traced()
+async def _load(value: int) -> int:
+    with span('load.step', step=value):
+        return value * 2
+
+
+async def test_noop_outside_trace():
+    with span('outside') as s:
+        assert s is None
+    assert await _load(2) == 4
+    assert current_span() is None
+
+
+async def test_nested_spans_and_otlp():
+    local = Tracer(sample_rate=1.0, buffer_size=2)
+    for _ in range(3):
+        with local.start_trace('GET /x') as trace:
+            assert await _load(3) == 6
+
+    assert len(local.traces) == 2
+    data = local.recent()[0]
+    assert data['trace_id'] == trace.trace_id
+    [service] = data['root']['children']
+    assert service['name'] == '_load'
+    assert service['children'][0]['attributes'] == {'step': 3}
+
+    otlp_spans = trace.to_otlp()['resourceSpans'][0]['scopeSpans'][0]['spans']
+    assert [s['name'] for s in otlp_spans] == ['GET /x', '_load', 'load.step']
+    assert 'parentSpanId' not in otlp_spans[0]
+    assert otlp_spans[2]['parentSpanId'] == otlp_spans[1]['spanId']
+    assert {'key': 'step', 'value': {'intValue': '3'}} in otlp_spans[2]['attributes']
+    assert format_trace(trace.to_otlp())[0] == f'trace {trace.trace_id}'
+
+
+async def test_request_trace_has_db_and_render_spans(async_client: AsyncClient, monkeypatch):
+    monkeypatch.setattr(tracer, 'sample_rate', 1.0)
+    tracer.traces.clear()
+
+    response = await async_client.get('/assets-list')
+    assert response.status_code == 200
+    trace_id = response.headers['X-Trace-Id']
+
+    data = (await async_client.get('/admin/traces.json')).json()
+    trace = next(t for t in data['traces'] if t['trace_id'] == trace_id)
+    assert trace['name'] == 'GET /assets-list'
+    assert trace['root']['attributes']['http.status_code'] == 200
+    assert trace['by_kind_ms'].keys() == {KIND_DB, KIND_RENDER}
+
+    names = []
+
+    def walk(node):
+        names.append(node['name'])
+        for child in node['children']:
+            walk(child)
+
+    walk(trace['root'])
+    assert 'DeviceService.get_devices_with_filters' in names
+    assert 'db.query' in names
+    assert 'template.render' in names
+
+
+async def test_otlp_export_to_collector(tmp_path):
+    output = tmp_path / 'traces.jsonl'
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(str(output)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        local = Tracer(1.0, 10, f'http://127.0.0.1:{server.server_port}/v1/traces')
+        with local.start_trace('GET /x') as trace:
+            pass
+        await asyncio.gather(*local._exports)
+        assert trace.trace_id in output.read_text(encoding='utf-8')
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,101 @@
+import pytest
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import upsert
+from app.db.upsert import bulk_upsert, get_or_create_id, resolved_id_cache
+from app.models import Department, DeviceModel, Manufacturer
+from app.services.device_service import DeviceService
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture(autouse=True)
+def clear_id_cache():
+    # Тесты откатывают транзакцию, поэтому id из кэша не должны переживать тест
+    resolved_id_cache.invalidate()
+    yield
+    resolved_id_cache.invalidate()
+
+
+async def test_get_or_create_id_creates_once(db_session: AsyncSession):
+    first_id = await get_or_create_id(db_session, Manufacturer, {'name': 'Upsert Corp'})
+    second_id = await get_or_create_id(db_session, Manufacturer, {'name': 'Upsert Corp'})
+
+    assert first_id is not None
+    assert first_id == second_id
+    rows = (
+        await db_session.execute(select(Manufacturer).where(Manufacturer.name == 'Upsert Corp'))
+    ).scalars().all()
+    assert len(rows) == 1
+
+
+async def test_get_or_create_id_finds_existing(db_session: AsyncSession, test_data: dict):
+    manufacturer = test_data['manufacturer']
+    model_id = await get_or_create_id(
+        db_session,
+        DeviceModel,
+        {'name': 'TestModel 9000', 'manufacturer_id': manufacturer.id},
+        defaults={'asset_type_id': test_data['asset_type'].id},
+    )
+    assert model_id == test_data['device_model'].id
+
+
+async def test_cached_id_dropped_after_dictionary_change(db_session: AsyncSession):
+    lookup = {'name': 'Stale Corp'}
+    stale_id = await get_or_create_id(db_session, Manufacturer, lookup)
+    # Как после COMMIT: значение уходит в общий кэш, новая транзакция читает версии заново
+    upsert._promote_pending(db_session.sync_session)
+    assert await get_or_create_id(db_session, Manufacturer, lookup) == stale_id
+    upsert._promote_pending(db_session.sync_session)
+
+    # Другой воркер удаляет запись в обход ORM: триггер повышает версию справочника
+    await db_session.execute(delete(Manufacturer).where(Manufacturer.id == stale_id))
+    fresh_id = await get_or_create_id(db_session, Manufacturer, lookup)
+    assert fresh_id != stale_id
+    assert await db_session.get(Manufacturer, fresh_id) is not None
+
+
+async def test_cached_id_kept_while_dictionary_unchanged(db_session: AsyncSession):
+    lookup = {'name': 'Stable Corp'}
+    manufacturer_id = await get_or_create_id(db_session, Manufacturer, lookup)
+    # Вставка сама повышает версию: первое значение в кэше устаревает, второе - уже нет
+    for _ in range(2):
+        upsert._promote_pending(db_session.sync_session)
+        assert await get_or_create_id(db_session, Manufacturer, lookup) == manufacturer_id
+    upsert._promote_pending(db_session.sync_session)
+
+    # Изменение другого справочника не сбрасывает записи производителей
+    await db_session.execute(update(Department).where(Department.id == -1).values(name='x'))
+    await get_or_create_id(db_session, Department, {'slug': 'cache-dep', 'name': 'Cache Dep'})
+    upsert._promote_pending(db_session.sync_session)
+
+    cached = resolved_id_cache.get(
+        upsert._cache_key(Manufacturer, lookup, ('id',)),
+        (await upsert._dictionary_versions(db_session))['manufacturers'],
+    )
+    assert cached == (manufacturer_id,)
+
+
+async def test_asset_type_falls_back_to_prefix(db_session: AsyncSession, test_data: dict):
+    # В test_data уже есть тип с префиксом PC, но с другим именем
+    asset_type_id, prefix = await DeviceService()._get_or_create_asset_type(db_session)
+    assert asset_type_id == test_data['asset_type'].id
+    assert prefix == 'PC'
+
+
+async def test_bulk_upsert_counts(db_session: AsyncSession):
+    rows = [
+        {'slug': 'upsert-a', 'name': 'Upsert A', 'description': None},
+        {'slug': 'upsert-b', 'name': 'Upsert B', 'description': None},
+    ]
+    inserted, updated = await bulk_upsert(
+        db_session, Department, rows, index_elements=['slug'], update_columns=['name', 'description']
+    )
+    assert (inserted, updated) == (2, 0)
+
+    rows[0]['name'] = 'Upsert A (renamed)'
+    inserted, updated = await bulk_upsert(
+        db_session, Department, rows, index_elements=['slug'], update_columns=['name', 'description']
+    )
+    assert (inserted, updated) == (0, 1)
@@ -0,0 +1,92 @@
+# trace_collector.py
+"""
+Локальный приемник трасс вместо OTLP-коллектора: принимает OTLP/HTTP JSON
+и печатает дерево span'ов каждой трассы.
+
+Примеры:
+    python trace_collector.py
+    python trace_collector.py --port 4318 --output traces.jsonl
+
+В .env приложения: TRACE_SAMPLE_RATE=1, TRACE_OTLP_ENDPOINT=http://localhost:4318/v1/traces
+"""
+import argparse
+import json
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TRACES_PATH = "/v1/traces"
+
+
+def format_trace(body: dict) -> list[str]:
+    """Строки дерева span'ов из тела ExportTraceServiceRequest."""
+    spans = [
+        span
+        for resource_spans in body.get("resourceSpans", [])
+        for scope_spans in resource_spans.get("scopeSpans", [])
+        for span in scope_spans.get("spans", [])
+    ]
+    children = defaultdict(list)
+    for span in spans:
+        children[span.get("parentSpanId")].append(span)
+
+    lines = []
+
+    def walk(span: dict, depth: int) -> None:
+        duration_ms = (int(span["endTimeUnixNano"]) - int(span["startTimeUnixNano"])) / 1e6
+        attributes = {item["key"]: next(iter(item["value"].values())) for item in span.get("attributes", [])}
+        detail = attributes.get("db.statement") or attributes.get("template") or ""
+        lines.append(f"{'  ' * depth}{span['name']} {duration_ms:.1f} мс {detail[:100]}".rstrip())
+        for child in sorted(children[span["spanId"]], key=lambda item: int(item["startTimeUnixNano"])):
+            walk(child, depth + 1)
+
+    for root in children[None]:
+        lines.append(f"trace {root['traceId']}")
+        walk(root, 1)
+    return lines
+
+
+def make_handler(output: str | None) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self) -> None:
+            if self.path != TRACES_PATH:
+                self.send_error(404)
+                return
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            except ValueError:
+                self.send_error(400, "ожидается OTLP JSON")
+                return
+            print("\n".join(format_trace(body)), flush=True)
+            if output:
+                with open(output, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(body, ensure_ascii=False) + "\n")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+        def log_message(self, format: str, *args) -> None:
+            pass
+
+    return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Приемник трасс OTLP/HTTP JSON")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4318, help="стандартный порт OTLP/HTTP")
+    parser.add_argument("--output", help="дописывать принятые трассы в JSONL-файл")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args.output))
+    print(f"Прием трасс на http://{args.host}:{args.port}{TRACES_PATH}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()